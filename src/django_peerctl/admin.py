@@ -21,6 +21,7 @@ from django_peerctl.models import (
     PolicyPeerGroup,
     Port,
     PortInfo,
+    SiteStats,
     UserSession,
     Wish,
     ref_fallback,
@@ -300,6 +301,20 @@ class AuditLogAdmin(admin.ModelAdmin):
     form = status_form()
 
 
+@admin.register(SiteStats)
+class SiteStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        "created",
+        "users",
+        "ix",
+        "peers",
+        "peer_sessions",
+        "peer_sessions_ip4",
+        "peer_sessions_ip6",
+    )
+    readonly_fields = ("created", "updated", "version")
+
+
 class EmailLogRecipientInline(admin.TabularInline):
     model = EmailLogRecipient
     fields = ("email", "asn")
@@ -0,0 +1,226 @@
+"""
+HTTP client for remote autopeer apis
+
+One pooled `requests.Session` is kept per autopeer api url, so
+connections (and TLS sessions) are reused across requests and tasks
+running in the same process.
+
+Requests time out after `AUTOPEER_CONNECT_TIMEOUT` / `AUTOPEER_READ_TIMEOUT`
+seconds and are retried up to `AUTOPEER_RETRIES` times with jittered
+exponential backoff:
+
+- idempotent requests (GET, HEAD, OPTIONS, PUT, DELETE) are retried on
+  connection errors, timeouts and 5xx responses
+- other requests (e.g., POST `add_sessions`) may have been processed
+  by the remote api when they time out or fail with a 5xx response, so
+  they are only retried if the connection could not be established
+
+Request counts and latency are tracked per endpoint, see `stats()`.
+"""
+
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+__all__ = [
+    "AutopeerClient",
+    "AutopeerError",
+    "get_client",
+    "clear",
+    "stats",
+]
+
+# max number of connections kept open per autopeer api host
+POOL_SIZE = 10
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+_lock = threading.Lock()
+_clients = {}
+_stats = {}
+
+
+class AutopeerError(ValueError):
+    """
+    Raised when a remote autopeer api request fails after all retries
+    """
+
+    def __init__(self, message, response=None):
+        super().__init__(message)
+        self.response = response
+
+
+class AutopeerClient:
+    """
+    Client for a single remote autopeer api
+
+    Arguments:
+        - url <str>: autopeer api base url
+
+    Keyword Arguments:
+        - timeout <tuple>: (connect, read) timeout in seconds
+        - retries <int>: number of retries after the first attempt
+        - backoff <float>: base backoff in seconds, doubles with each retry
+    """
+
+    def __init__(self, url, timeout=None, retries=None, backoff=None):
+        self.url = url.rstrip("/")
+
+        if timeout is None:
+            timeout = (
+                settings.AUTOPEER_CONNECT_TIMEOUT,
+                settings.AUTOPEER_READ_TIMEOUT,
+            )
+
+        if retries is None:
+            retries = settings.AUTOPEER_RETRIES
+
+        if backoff is None:
+            backoff = settings.AUTOPEER_RETRY_BACKOFF
+
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, endpoint, params=None):
+        return self.request("get", endpoint, params=params)
+
+    def post(self, endpoint, json=None):
+        return self.request("post", endpoint, json=json)
+
+    def request(self, method, endpoint, **kwargs):
+        """
+        Sends a request to an endpoint of the autopeer api and
+        returns the decoded json response
+
+        Arguments:
+            - method <str>: http method
+            - endpoint <str>: endpoint path, e.g., "list_locations"
+
+        Keyword arguments are passed to `requests.Session.request`
+
+        Raises AutopeerError if the request fails after all retries or
+        the api responds with a non 2xx status
+        """
+
+        url = f"{self.url}/{endpoint.lstrip('/')}"
+        attempt = 0
+
+        while True:
+            t = time.monotonic()
+            response = None
+            error = None
+
+            try:
+                response = self.session.request(
+                    method, url, timeout=self.timeout, **kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = exc
+
+            _record(
+                endpoint, time.monotonic() - t, error or response.status_code >= 500
+            )
+
+            if not should_retry(method, error, response) or attempt >= self.retries:
+                break
+
+            # full jitter, so concurrent tasks don't retry in lockstep
+            time.sleep(random.uniform(0, self.backoff * 2**attempt))
+            attempt += 1
+
+        if error is not None:
+            raise AutopeerError(f"{method.upper()} {url} failed: {error}") from error
+
+        if not response.ok:
+            raise AutopeerError(
+                f"{method.upper()} {url} failed: {response.status_code} {response.text}",
+                response=response,
+            )
+
+        return response.json()
+
+
+def is_connect_error(exc):
+    """
+    Returns whether a request failed before a connection to the remote
+    api was established, i.e., the request was never sent
+    """
+
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+
+    if not isinstance(exc, requests.ConnectionError) or not exc.args:
+        return False
+
+    return isinstance(getattr(exc.args[0], "reason", None), NewConnectionError)
+
+
+def should_retry(method, error, response):
+    """
+    Returns whether a failed request can be retried without risking
+    that the remote api processes it twice
+    """
+
+    if method.upper() in IDEMPOTENT_METHODS:
+        return error is not None or response.status_code >= 500
+
+    return error is not None and is_connect_error(error)
+
+
+def get_client(url):
+    """
+    Returns the pooled client for an autopeer api url
+    """
+
+    with _lock:
+        if url not in _clients:
+            _clients[url] = AutopeerClient(url)
+        return _clients[url]
+
+
+def _record(endpoint, duration, failed):
+    with _lock:
+        entry = _stats.setdefault(
+            endpoint, {"count": 0, "errors": 0, "total": 0.0, "max": 0.0}
+        )
+        entry["count"] += 1
+        entry["errors"] += int(bool(failed))
+        entry["total"] += duration
+        entry["max"] = max(entry["max"], duration)
+
+
+def clear():
+    with _lock:
+        for client in _clients.values():
+            client.session.close()
+        _clients.clear()
+        _stats.clear()
+
+
+def stats():
+    """
+    Returns request count, error count and average / max latency
+    in seconds per endpoint for the current process
+    """
+
+    with _lock:
+        return {
+            endpoint: {
+                "count": entry["count"],
+                "errors": entry["errors"],
+                "avg": entry["total"] / entry["count"],
+                "max": entry["max"],
+            }
+            for endpoint, entry in _stats.items()
+        }
@@ -8,6 +8,7 @@ from django_peerctl.autopeer.workflow import AutopeerWorkflow
 
 __all__ = [
     "AutopeerRequest",
+    "AutopeerPollStatus",
 ]
 
 
@@ -88,3 +89,70 @@ class AutopeerRequest(Task):
             self.peer_request.locations.all().update(status="failed")
             self.peer_request.notes = "Task failed"
             self.peer_request.save()
+
+
+@register
+class AutopeerPollStatus(Task):
+
+    """
+    Polls the remote autopeer api once for the status of an
+    autopeer request and reschedules itself until the sessions
+    are ready
+
+    Expected arguments during create task:
+
+    - peer_request_id (int)
+    """
+
+    class Meta:
+        proxy = True
+
+    class TaskMeta:
+        limit = 1
+
+    class HandleRef:
+        tag = "task_autopeer_poll_status"
+
+    @property
+    def generate_limit_id(self):
+        return str(self.param["args"][0])
+
+    @property
+    def peer_request(self):
+        if hasattr(self, "_peer_request"):
+            return self._peer_request
+
+        try:
+            self._peer_request = models.PeerRequest.objects.get(
+                id=self.param["args"][0]
+            )
+        except models.PeerRequest.DoesNotExist:
+            self._peer_request = None
+
+        return self._peer_request
+
+    def run(self, peer_request_id, *args, **kwargs):
+        peer_request = self.peer_request
+
+        if not peer_request or peer_request.status != "pending":
+            return json.dumps({"completed": False})
+
+        workflow = AutopeerWorkflow(
+            peer_request.net.asn,
+            peer_request.peer_asn,
+            peer_request.task,
+            peer_request=peer_request,
+        )
+
+        return json.dumps(
+            {"completed": workflow.poll(), "poll_count": peer_request.poll_count}
+        )
+
+    def _fail(self, error):
+        super()._fail(error)
+
+        if self.peer_request:
+            self.peer_request.status = "failed"
+            self.peer_request.locations.all().update(status="failed")
+            self.peer_request.notes = "Autopeer status poll failed"
+            self.peer_request.save()
@@ -1,12 +1,16 @@
-import time
+import datetime
+import logging
 import uuid
 
 import fullctl.service_bridge.pdbctl as pdbctl
 import fullctl.service_bridge.sot as sot
-import requests
+from django.conf import settings
+from django.utils import timezone
+from fullctl.django.models.concrete.tasks import TaskSchedule
 
 import django_peerctl.autopeer.schema as schema
 from django_peerctl.autopeer import autopeer_url
+from django_peerctl.autopeer.client import AutopeerError, get_client
 from django_peerctl.models.peerctl import (
     Network,
     PeerPort,
@@ -20,6 +24,8 @@ __all__ = [
     "AutopeerWorkflow",
 ]
 
+log = logging.getLogger(__name__)
+
 
 class AutopeerWorkflow(PeerSessionWorkflow):
 
@@ -52,6 +58,13 @@ class AutopeerWorkflow(PeerSessionWorkflow):
         """
         return autopeer_url(self.to_asn)
 
+    @property
+    def client(self):
+        """
+        pooled http client for the target network's autopeer api
+        """
+        return get_client(self.autopeer_url)
+
     def request(self, *args, **kwargs):
         if not self.peer_request:
             self.peer_request = PeerRequest.objects.create(
@@ -60,19 +73,27 @@ class AutopeerWorkflow(PeerSessionWorkflow):
 
         locations = self.request_list_locations()
 
-        peerctl_sessions, autopeer_sessions = self.request_add_sessions(locations)
+        (
+            peerctl_sessions,
+            autopeer_sessions,
+            request_id,
+        ) = self.request_add_sessions(locations)
 
-        print("request", peerctl_sessions)
+        log.debug("autopeer request sessions: %s", peerctl_sessions)
 
-        self.peer_request.status = "completed"
+        # sessions are configured by the remote side asynchronously, store
+        # the request id and poll for its status from a scheduled task
+        # instead of blocking the worker
+
+        self.peer_request.autopeer_request_id = request_id
+        self.peer_request.autopeer_requested = timezone.now()
+        self.peer_request.poll_count = 0
         self.peer_request.save()
 
-        for location in self.peer_request.locations.all():
-            # TODO: mockup for now just assume session for location completed successfully
-            location.status = "completed"
-            location.save()
+        self.schedule_poll()
 
         return {
+            "request_id": request_id,
             "autopeer_sessions": [
                 autopeer_session.dict() for autopeer_session in autopeer_sessions
             ],
@@ -85,6 +106,93 @@ class AutopeerWorkflow(PeerSessionWorkflow):
             ),
         }
 
+    def schedule_poll(self):
+        """
+        Schedules the next status poll for the peer request
+
+        The poll interval starts at `AUTOPEER_POLL_INTERVAL` seconds and
+        doubles with every poll up to `AUTOPEER_POLL_INTERVAL_MAX` seconds
+        """
+
+        delay = min(
+            settings.AUTOPEER_POLL_INTERVAL * 2**self.peer_request.poll_count,
+            settings.AUTOPEER_POLL_INTERVAL_MAX,
+        )
+
+        return TaskSchedule.objects.create(
+            org=self.net.org,
+            interval=delay,
+            repeat=False,
+            schedule=timezone.now() + datetime.timedelta(seconds=delay),
+            description=f"Autopeer status poll for peer request {self.peer_request.id}",
+            task_config={
+                "tasks": [
+                    {
+                        "op": "task_autopeer_poll_status",
+                        "param": {"args": [self.peer_request.id], "kwargs": {}},
+                    }
+                ]
+            },
+        )
+
+    def poll(self):
+        """
+        Polls the remote autopeer api once for the status of the
+        peer request's sessions
+
+        Completes the peer request if the sessions are ready, otherwise
+        schedules the next poll. Raises an exception if the sessions
+        are not ready within `AUTOPEER_POLL_TIMEOUT` seconds.
+
+        Returns True if the peer request was completed
+        """
+
+        peer_request = self.peer_request
+
+        if peer_request.status != "pending":
+            return peer_request.status == "completed"
+
+        if not peer_request.autopeer_request_id:
+            raise ValueError("Peer request has no autopeer request id")
+
+        try:
+            session_status = self.request_get_status(peer_request.autopeer_request_id)
+        except (AutopeerError, KeyError) as exc:
+            # treat remote errors as not ready yet, the timeout
+            # below still applies
+            log.warning(
+                "autopeer status poll failed for peer request %s: %s",
+                peer_request.id,
+                exc,
+            )
+            session_status = None
+
+        if session_status:
+            self.complete()
+            return True
+
+        deadline = peer_request.autopeer_requested + datetime.timedelta(
+            seconds=settings.AUTOPEER_POLL_TIMEOUT
+        )
+
+        if timezone.now() >= deadline:
+            raise Exception("never got session status")
+
+        peer_request.poll_count += 1
+        peer_request.save()
+
+        self.schedule_poll()
+        return False
+
+    def complete(self):
+        self.peer_request.status = "completed"
+        self.peer_request.save()
+
+        for location in self.peer_request.locations.all():
+            # TODO: mockup for now just assume session for location completed successfully
+            location.status = "completed"
+            location.save()
+
     def progress(self, *args, **kwargs):
         return
 
@@ -117,7 +225,7 @@ class AutopeerWorkflow(PeerSessionWorkflow):
         locations = []
 
         _locations = schema.Locations(
-            **requests.get(f"{self.autopeer_url}/list_locations?asn={self.asn}").json()
+            **self.client.get("list_locations", params={"asn": self.asn})
         )
 
         for location in _locations.items:
@@ -130,7 +238,7 @@ class AutopeerWorkflow(PeerSessionWorkflow):
 
             locations.append(int(ix_id))
 
-        print("request_locations", locations)
+        log.debug("autopeer request locations: %s", locations)
 
         return locations
 
@@ -194,31 +302,19 @@ class AutopeerWorkflow(PeerSessionWorkflow):
             if autopeer_session6:
                 autopeer_sessions.append(autopeer_session6)
 
-        response = requests.post(
-            f"{self.autopeer_url}/add_sessions",
-            json=[autopeer_session.dict() for autopeer_session in autopeer_sessions],
-        )
-
-        request_id = response.json()["requestId"]
-
-        if response.status_code != 200:
-            raise ValueError(f"Error adding sessions: {response.json()}")
-
-        # request /get_status for each session until OK
-        loops = 0
-        while True:
-            session_status = self.request_get_status(request_id)
-
-            if session_status:
-                break
+        try:
+            response = self.client.post(
+                "add_sessions",
+                json=[
+                    autopeer_session.dict() for autopeer_session in autopeer_sessions
+                ],
+            )
+        except AutopeerError as exc:
+            raise ValueError(f"Error adding sessions: {exc}")
 
-            # high sleep time to simulate long running request
-            time.sleep(3)
-            loops += 1
-            if loops > 300:
-                raise Exception("never got session status")
+        request_id = response["requestId"]
 
-        return sessions, autopeer_sessions
+        return sessions, autopeer_sessions, request_id
 
     def request_get_status(self, request_id, *args, **kwargs):
         """
@@ -227,14 +323,15 @@ class AutopeerWorkflow(PeerSessionWorkflow):
 
         # TODO: mockup for now, just assume configured and return
 
-        url = f"{self.autopeer_url}/get_status?request_id={request_id}&asn={self.asn}"
-        print("request_get_status", url)
+        log.debug("autopeer get_status for request %s", request_id)
 
-        response = requests.get(url)
+        response = self.client.get(
+            "get_status", params={"request_id": request_id, "asn": self.asn}
+        )
 
-        print(response.json())
+        log.debug("autopeer get_status response: %s", response)
 
-        return response.json()["sessions"]
+        return response["sessions"]
 
     def _ensure_peerctl_sessions(self, members, pdb_ix_id):
         sessions = []
@@ -259,11 +356,11 @@ class AutopeerWorkflow(PeerSessionWorkflow):
         for portinfo in self.portinfos:
             ref_source, ref_ix_id = portinfo.ref_ix_id.split(":")
 
-            print(
-                "REF SOURCE",
+            log.debug(
+                "autopeer matching port info %s (ix %s) to member %s (ix %s)",
                 portinfo.ref.ipaddr4,
-                member.ipaddr4,
                 ref_ix_id,
+                member.ipaddr4,
                 member.ix_id,
             )
 
@@ -274,7 +371,11 @@ class AutopeerWorkflow(PeerSessionWorkflow):
             if not port:
                 continue
 
-            print("ensuring session", port.port_info_object.ref.ipaddr4, member.ipaddr4)
+            log.debug(
+                "autopeer ensuring session %s -> %s",
+                port.port_info_object.ref.ipaddr4,
+                member.ipaddr4,
+            )
 
             peer_port = PeerPort.get_or_create_from_members(
                 port.port_info_object.ref, member
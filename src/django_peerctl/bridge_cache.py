@@ -0,0 +1,181 @@
+"""
+Cache for service bridge (pdbctl, ixctl, devicectl) lookups
+
+Results are stored in the django cache backend specified by
+`BRIDGE_CACHE_ALIAS`, keyed by the bridge class and the filter
+arguments of the request.
+
+Each bridge class has its own ttl (`BRIDGE_CACHE_TTL`, falling back
+to `BRIDGE_CACHE_TTL_DEFAULT`) and its own generation counter, which
+is part of the cache key, so all cached results of a bridge class can be
+invalidated at once by calling `invalidate`.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+
+__all__ = [
+    "cached_first",
+    "cached_object",
+    "cached_objects",
+    "invalidate",
+    "stats",
+]
+
+KEY_PREFIX = "peerctl:bridge_cache"
+
+# sentinel to distinguish cache misses from cached None values
+MISSING = object()
+
+
+def get_cache():
+    return caches[getattr(settings, "BRIDGE_CACHE_ALIAS", "default")]
+
+
+def bridge_name(bridge):
+    """
+    Returns the cache name for a bridge instance or class
+
+    e.g., `pdbctl.Network`
+    """
+
+    if isinstance(bridge, str):
+        return bridge
+
+    if not isinstance(bridge, type):
+        bridge = bridge.__class__
+
+    return f"{bridge.__module__.split('.')[-1]}.{bridge.__name__}"
+
+
+def get_ttl(name):
+    if not getattr(settings, "BRIDGE_CACHE_ENABLED", False):
+        return 0
+
+    return getattr(settings, "BRIDGE_CACHE_TTL", {}).get(
+        name, getattr(settings, "BRIDGE_CACHE_TTL_DEFAULT", 0)
+    )
+
+
+def generation(name):
+    return get_cache().get(f"{KEY_PREFIX}:{name}:generation", 0)
+
+
+def make_key(name, method, *args, **filters):
+    params = json.dumps([args, filters], sort_keys=True, default=str)
+    digest = hashlib.md5(params.encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}:{name}:{generation(name)}:{method}:{digest}"
+
+
+def count(name, result):
+    """
+    Increments the hit or miss counter for a bridge
+    """
+
+    cache = get_cache()
+    key = f"{KEY_PREFIX}:stats:{name}:{result}"
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        # counter does not exist yet
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def fetch(bridge, method, fn, *args, **filters):
+    """
+    Returns the cached result for a bridge request, calling `fn`
+    and caching its result on a miss
+    """
+
+    name = bridge_name(bridge)
+    ttl = get_ttl(name)
+
+    if not ttl:
+        return fn(*args, **filters)
+
+    cache = get_cache()
+    key = make_key(name, method, *args, **filters)
+    result = cache.get(key, MISSING)
+
+    if result is not MISSING:
+        count(name, "hit")
+        return result
+
+    count(name, "miss")
+    result = fn(*args, **filters)
+    cache.set(key, result, timeout=ttl)
+    return result
+
+
+def cached_first(bridge, **filters):
+    """
+    Cached `bridge.first(**filters)`
+    """
+
+    return fetch(bridge, "first", bridge.first, **filters)
+
+
+def cached_objects(bridge, **filters):
+    """
+    Cached `bridge.objects(**filters)`, returns a list
+    """
+
+    return fetch(
+        bridge, "objects", lambda **kwargs: list(bridge.objects(**kwargs)), **filters
+    )
+
+
+def cached_object(bridge, pk, **filters):
+    """
+    Cached `bridge.object(pk, **filters)`
+    """
+
+    return fetch(bridge, "object", bridge.object, pk, **filters)
+
+
+def invalidate(*bridges):
+    """
+    Invalidates all cached results for the specified bridge classes,
+    instances or names
+    """
+
+    cache = get_cache()
+
+    for bridge in bridges:
+        key = f"{KEY_PREFIX}:{bridge_name(bridge)}:generation"
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def stats(names=None):
+    """
+    Returns hit and miss counters for the specified bridge names
+
+    If no names are specified, counters for all bridges with a
+    configured ttl are returned
+
+    Returns:
+
+        dict: {name: {"hit": int, "miss": int}}
+    """
+
+    cache = get_cache()
+
+    if names is None:
+        names = sorted(getattr(settings, "BRIDGE_CACHE_TTL", {}).keys())
+
+    return {
+        name: {
+            "hit": cache.get(f"{KEY_PREFIX}:stats:{name}:hit", 0),
+            "miss": cache.get(f"{KEY_PREFIX}:stats:{name}:miss", 0),
+        }
+        for name in names
+    }
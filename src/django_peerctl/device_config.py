@@ -0,0 +1,263 @@
+"""
+Bulk device configuration rendering
+
+Renders device configurations for all devices (or all devices at a
+facility) of a network's organization in one job:
+
+- peer sessions, policies and port references are prefetched once
+  for all devices
+- rendering is fanned out across a process pool
+- the rendered configs are written to a tar or zip archive with one
+  file per device
+"""
+
+import io
+import multiprocessing
+import re
+import tarfile
+import time
+import zipfile
+
+from django.db import connections
+from django.db.models import Q
+
+from django_peerctl import const
+from django_peerctl.models import (
+    Device,
+    DeviceTemplate,
+    PeerSession,
+    PolicyResolver,
+)
+
+__all__ = [
+    "ARCHIVE_FORMATS",
+    "get_devices",
+    "prefetch",
+    "render_configs",
+    "write_archive",
+]
+
+ARCHIVE_FORMATS = ("tar", "zip")
+
+# render job inherited by forked pool workers
+_job = None
+
+
+def get_devices(net, facility=None):
+    """
+    Returns the devices of the network's organization with ports loaded
+
+    Arguments:
+        - net <Network>
+
+    Keyword Arguments:
+        - facility <str>: only return devices at the facility with this slug
+    """
+
+    filters = {"org": net.org.permission_id}
+
+    if facility:
+        filters["facility_slug"] = facility
+
+    devices = list(Device().objects(**filters))
+    Device.load_references(devices, org=net.org.slug)
+    return devices
+
+
+def prefetch(net, devices):
+    """
+    Loads the active peer sessions of the network for all specified
+    devices at once and primes the peer session and policy resolver
+    caches of the devices with them
+
+    Arguments:
+        - net <Network>
+        - devices <list<DeviceObject>>: devices with ports loaded
+    """
+
+    device_ids = [device.id for device in devices]
+    devices_by_port = {
+        port.id: device.id for device in devices for port in device.ports
+    }
+
+    sessions = list(
+        PeerSession.objects.filter(
+            Q(port__in=list(devices_by_port.keys())) | Q(device__in=device_ids),
+            peer_port__peer_net__net=net,
+            status="ok",
+        ).select_related(
+            "peer_port",
+            "peer_port__port_info",
+            "peer_port__peer_net",
+            "peer_port__peer_net__net",
+            "peer_port__peer_net__peer",
+        )
+    )
+
+    PeerSession.load_references(sessions)
+
+    resolver = PolicyResolver(sessions)
+    sessions_by_device = {device_id: [] for device_id in device_ids}
+
+    for session in sessions:
+        # same matching as DeviceObject.peer_session_qs, a session
+        # belongs to a device through its port or its device field
+        matched = set()
+
+        if session.port and session.port.id:
+            matched.add(devices_by_port.get(int(session.port.id)))
+
+        if session.device and session.device.id:
+            matched.add(int(session.device.id))
+
+        for device_id in matched:
+            if device_id in sessions_by_device:
+                sessions_by_device[device_id].append(session)
+
+    for device in devices:
+        device._peer_sessions = {net.id: sessions_by_device[device.id]}
+        device._policy_resolvers = {net.id: resolver}
+
+
+def get_device_template(net, device, template=None, template_type=None):
+    """
+    Returns the device template to render for a device
+
+    If neither `template` nor `template_type` is specified, the network's
+    default template for the device type is used, falling back to
+    the netom template for the device type.
+
+    Arguments:
+        - net <Network>
+        - device <DeviceObject>
+
+    Keyword Arguments:
+        - template <DeviceTemplate>
+        - template_type <str>
+    """
+
+    if template:
+        return template
+
+    if not template_type:
+        template_type = f"{device.type}-bgp-neighbors"
+        if template_type not in const.DEVICE_TEMPLATES:
+            template_type = "junos-bgp-neighbors"
+
+    default = DeviceTemplate.objects.filter(
+        net=net, type=template_type, default=True, status="ok"
+    ).first()
+
+    if default:
+        return default
+
+    return DeviceTemplate(name="Default", net=net, body="", type=template_type)
+
+
+def config_filename(device, device_template):
+    name = re.sub(r"[^\w.-]+", "_", device.name or "device")
+    return f"{name}.{device.id}.{device_template.type}.txt"
+
+
+def render_device(net, device, template=None, template_type=None):
+    """
+    Renders the configuration for a single device
+
+    Returns:
+        - tuple(<str> filename, <str> content)
+    """
+
+    device_template = get_device_template(
+        net, device, template=template, template_type=template_type
+    )
+    device_template.context["net"] = net
+    device_template.context["device"] = device
+
+    return config_filename(device, device_template), device_template.render()
+
+
+def _render_job(index):
+    net, devices, template, template_type = _job
+    return render_device(net, devices[index], template, template_type)
+
+
+def render_configs(
+    net, devices, template=None, template_type=None, processes=None, log=None
+):
+    """
+    Renders configurations for the specified devices
+
+    Yields (filename, content) tuples in the order the renders finish.
+
+    Arguments:
+        - net <Network>
+        - devices <list<DeviceObject>>
+
+    Keyword Arguments:
+        - template <DeviceTemplate>: render this template for all devices
+        - template_type <str>: render this template type for all devices
+        - processes <int>: size of the process pool, renders in
+            the current process if 1
+        - log <callable>: called with progress messages
+    """
+
+    global _job
+
+    t = time.time()
+    prefetch(net, devices)
+
+    if log:
+        log(f"Prefetched sessions for {len(devices)} devices in {time.time() - t:.2f}s")
+
+    if processes == 1 or len(devices) < 2:
+        for device in devices:
+            yield render_device(net, device, template, template_type)
+        return
+
+    # workers are forked and inherit the prefetched job, database
+    # connections must not be shared with them
+    connections.close_all()
+    _job = (net, devices, template, template_type)
+
+    try:
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            yield from pool.imap_unordered(_render_job, range(len(devices)))
+    finally:
+        _job = None
+
+
+def write_archive(fileobj, configs, archive_format="tar"):
+    """
+    Writes rendered configurations to an archive
+
+    Arguments:
+        - fileobj <file>: binary file object to write to
+        - configs <iterable>: (filename, content) tuples
+        - archive_format <str>: "tar" (gzipped) or "zip"
+
+    Returns:
+        - <int> number of files written
+    """
+
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Invalid archive format: {archive_format}")
+
+    count = 0
+
+    if archive_format == "zip":
+        with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for filename, content in configs:
+                zf.writestr(filename, content)
+                count += 1
+        return count
+
+    with tarfile.open(fileobj=fileobj, mode="w:gz") as tf:
+        for filename, content in configs:
+            data = content.encode("utf-8")
+            info = tarfile.TarInfo(filename)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            tf.addfile(info, io.BytesIO(data))
+            count += 1
+
+    return count
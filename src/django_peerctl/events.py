@@ -0,0 +1,168 @@
+"""
+Change events of a network's peer sessions and peer requests
+
+Saving a peer session or peer request publishes an event
+(`NetworkEvent`) once the transaction commits, see
+`django_peerctl.signals`. Clients poll the `events` endpoint with the
+id of the last event they received (`since`) and get the events after
+it, so they do not need to poll the session list to notice workflow
+transitions (requested -> configured -> ok) or autopeer request
+completion. A poll is one indexed query, so it does not tie up a
+worker the way a long-lived stream would.
+
+Events are kept in the database rather than in process memory, so
+events published by other worker processes and by task workers reach
+every client.
+
+Event ids are assigned on insert but become visible on commit, so a
+lower id can become visible after a higher one. Events are only
+returned once they are `EVENTS_COMMIT_LAG` seconds old, so a client
+advancing past an id never skips an event that was still being
+committed.
+
+Events older than `EVENTS_TTL` seconds are removed.
+"""
+
+import datetime
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from django_peerctl.models import Network, NetworkEvent
+
+__all__ = [
+    "latest_id",
+    "peer_request_event",
+    "peer_session_event",
+    "poll",
+    "publish",
+    "read",
+]
+
+# max number of events returned per poll
+BATCH_SIZE = 100
+
+# remove expired events every n-th published event
+CLEANUP_INTERVAL = 100
+
+
+def peer_session_event(session):
+    """
+    Returns the event data for a peer session
+    """
+
+    return {
+        "id": session.id,
+        "status": session.status,
+        "peer_session_type": session.peer_session_type,
+        "peer_asn": session.peer_port.peer_net.peer.asn,
+        "port": int(session.port) if session.port else None,
+        "device": int(session.device) if session.device else None,
+    }
+
+
+def peer_request_event(peer_request):
+    """
+    Returns the event data for a peer request
+    """
+
+    return {
+        "id": peer_request.id,
+        "status": peer_request.status,
+        "type": peer_request.type,
+        "peer_asn": peer_request.peer_asn,
+    }
+
+
+def publish(net_id, type, action, object_id, data):
+    """
+    Publishes an event once the current transaction commits, events
+    of rolled back writes are never published
+
+    Arguments:
+        - net_id <int>
+        - type <str>: object type, e.g., "peer_session"
+        - action <str>: "created", "updated" or "deleted"
+        - object_id <int>
+        - data <dict>
+    """
+
+    def create():
+        # the network itself may have been deleted along with the object
+
+        if action == "deleted" and not Network.objects.filter(id=net_id).exists():
+            return
+
+        event = NetworkEvent.objects.create(
+            net_id=net_id,
+            type=type,
+            action=action,
+            object_id=object_id,
+            data=json.loads(json.dumps(data, cls=DjangoJSONEncoder)),
+        )
+
+        if event.id % CLEANUP_INTERVAL == 0:
+            expired = timezone.now() - datetime.timedelta(seconds=settings.EVENTS_TTL)
+            NetworkEvent.objects.filter(created__lt=expired).delete()
+
+    transaction.on_commit(create)
+
+
+def visible(net):
+    """
+    Returns a queryset of the network's events that are old enough to
+    be returned, see `EVENTS_COMMIT_LAG`
+    """
+
+    cutoff = timezone.now() - datetime.timedelta(seconds=settings.EVENTS_COMMIT_LAG)
+    return NetworkEvent.objects.filter(net=net, created__lte=cutoff)
+
+
+def latest_id(net):
+    """
+    Returns the id of the network's most recent visible event (0 if none)
+    """
+
+    return visible(net).order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def read(net, since):
+    """
+    Returns the network's visible events published after the event
+    with id `since`
+
+    Returns:
+        - list<NetworkEvent>: at most `BATCH_SIZE` events, ordered by id
+    """
+
+    return list(visible(net).filter(id__gt=since).order_by("id")[:BATCH_SIZE])
+
+
+def poll(net, since=None):
+    """
+    Returns the network's events published after the event with id
+    `since`
+
+    Keyword Arguments:
+        - since <int>: id of the last event the client received, if
+          not specified no events are returned, only the id to poll
+          from
+
+    Returns:
+        - dict: {"last_id": <int>, "events": list<NetworkEvent>},
+          clients pass `last_id` as `since` on their next poll and
+          poll again right away if `BATCH_SIZE` events were returned
+    """
+
+    if since is None:
+        return {"last_id": latest_id(net), "events": []}
+
+    events = read(net, since)
+
+    return {
+        "last_id": events[-1].id if events else since,
+        "events": events,
+    }
@@ -1,10 +1,13 @@
 from fullctl.service_bridge.pdbctl import NetworkContact
 
+from django_peerctl import bridge_cache
 from django_peerctl.exceptions import PolicyMissingError
 
 
 def get_peer_contact_email(asn):
-    poc = NetworkContact().first(asn=asn, role="Policy", require_email=True)
+    poc = bridge_cache.cached_first(
+        NetworkContact(), asn=asn, role="Policy", require_email=True
+    )
     if poc:
         return poc.email
     return None
@@ -0,0 +1,62 @@
+import reversion
+from fullctl.django.management.commands.base import CommandInterface
+
+from django_peerctl.models.peerctl import PeerSession
+
+
+class Command(CommandInterface):
+    """
+    Sets the created_by field on PeerSessions that don't have it set
+    yet, using the user of the first revision of each session
+    """
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="number of sessions to update per query",
+        )
+
+    def run(self, *args, **kwargs):
+        batch_size = kwargs.get("batch_size")
+
+        session_ids = {
+            str(session_id)
+            for session_id in PeerSession.objects.filter(
+                created_by__isnull=True
+            ).values_list("id", flat=True)
+        }
+
+        if not session_ids:
+            self.log_info("No PeerSessions without creator")
+            return
+
+        # scan all peer session versions once, oldest first, and keep
+        # the user of the first version that has one
+
+        creators = {}
+
+        for object_id, user_id in (
+            reversion.models.Version.objects.get_for_model(PeerSession)
+            .filter(revision__user__isnull=False)
+            .order_by("pk")
+            .values_list("object_id", "revision__user_id")
+            .iterator(chunk_size=batch_size)
+        ):
+            if object_id in session_ids:
+                creators.setdefault(object_id, user_id)
+
+        sessions = []
+
+        for object_id, user_id in creators.items():
+            session = PeerSession(id=int(object_id))
+            session.created_by_id = user_id
+            sessions.append(session)
+
+        PeerSession.objects.bulk_update(sessions, ["created_by"], batch_size=batch_size)
+
+        self.log_info(
+            f"Set creator on {len(sessions)} of {len(session_ids)} PeerSessions"
+        )
@@ -0,0 +1,29 @@
+from fullctl.django.management.commands.base import CommandInterface
+
+from django_peerctl import bridge_cache
+
+
+class Command(CommandInterface):
+    """
+    Shows service bridge cache hit / miss counters
+
+    Pass bridge names (e.g., `pdbctl.Network`) with --invalidate to
+    invalidate their cached results.
+    """
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--invalidate",
+            nargs="+",
+            metavar="BRIDGE",
+            help="invalidate cached results for these bridges",
+        )
+
+    def run(self, *args, **kwargs):
+        for name in kwargs.get("invalidate") or []:
+            bridge_cache.invalidate(name)
+            self.log_info(f"Invalidated {name}")
+
+        for name, counters in bridge_cache.stats().items():
+            self.log_info(f"{name}: {counters['hit']} hits, {counters['miss']} misses")
@@ -0,0 +1,56 @@
+import sys
+
+from fullctl.django.management.commands.base import CommandInterface
+
+from django_peerctl.models import Network
+from django_peerctl.session_export import CHUNK_SIZE, FORMATS, export, get_sessions
+
+
+class Command(CommandInterface):
+    """
+    Exports the peer sessions of a network as ndjson or csv
+
+    Sessions are streamed to the output file (stdout if not
+    specified) in chunks, see `django_peerctl.session_export`
+    """
+
+    always_commit = True
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("asn", type=int, help="network to export sessions of")
+        parser.add_argument(
+            "--format", dest="export_format", choices=FORMATS, default="ndjson"
+        )
+        parser.add_argument("--output", help="file to write to, stdout if not set")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="number of sessions to fetch and load references for at a time",
+        )
+
+    def run(self, *args, **kwargs):
+        net = Network.objects.get(asn=kwargs.get("asn"))
+        sessions = get_sessions(net)
+        output = kwargs.get("output")
+
+        lines = export(
+            sessions,
+            kwargs.get("export_format"),
+            chunk_size=kwargs.get("chunk_size"),
+        )
+
+        if not output:
+            for line in lines:
+                sys.stdout.write(line)
+            return
+
+        count = 0
+
+        with open(output, "w", newline="") as fh:
+            for line in lines:
+                fh.write(line)
+                count += 1
+
+        self.log_info(f"Exported AS{net.asn} sessions to {output} ({count} lines)")
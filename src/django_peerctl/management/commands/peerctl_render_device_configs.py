@@ -0,0 +1,63 @@
+import os
+
+from fullctl.django.management.commands.base import CommandInterface
+
+from django_peerctl import device_config
+from django_peerctl.models import DeviceTemplate, Network
+
+
+class Command(CommandInterface):
+    """
+    Renders device configurations for all devices of a network's
+    organization and writes them to a tar or zip archive
+    """
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument("asn", type=int, help="network asn")
+        parser.add_argument("output", help="archive file path")
+        parser.add_argument(
+            "--format",
+            choices=device_config.ARCHIVE_FORMATS,
+            default="tar",
+            help="archive format (tar is gzipped)",
+        )
+        parser.add_argument(
+            "--facility", help="only render devices at the facility with this slug"
+        )
+        parser.add_argument(
+            "--template", type=int, help="render this device template for all devices"
+        )
+        parser.add_argument(
+            "--type", help="render this device template type for all devices"
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count(),
+            help="size of the render process pool",
+        )
+
+    def run(self, *args, **kwargs):
+        net = Network.objects.get(asn=kwargs["asn"])
+
+        template = None
+        if kwargs.get("template"):
+            template = DeviceTemplate.objects.get(id=kwargs["template"], net=net)
+
+        devices = device_config.get_devices(net, facility=kwargs.get("facility"))
+        self.log_info(f"Rendering configs for {len(devices)} devices")
+
+        configs = device_config.render_configs(
+            net,
+            devices,
+            template=template,
+            template_type=kwargs.get("type"),
+            processes=kwargs.get("processes"),
+            log=self.log_info,
+        )
+
+        with open(kwargs["output"], "wb") as fileobj:
+            count = device_config.write_archive(fileobj, configs, kwargs["format"])
+
+        self.log_info(f"Wrote {count} configs to {kwargs['output']}")
@@ -0,0 +1,51 @@
+from django.utils import timezone
+from fullctl.django.management.commands.base import CommandInterface
+from fullctl.django.models.concrete.tasks import TaskSchedule
+
+from django_peerctl.models.tasks import UpdateSiteStats
+from django_peerctl.stats import create_snapshot
+
+
+class Command(CommandInterface):
+    """
+    Creates a site stats snapshot
+
+    Pass --schedule to instead set up (or update) the task schedule
+    that creates snapshots periodically.
+    """
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--schedule",
+            type=int,
+            metavar="SECONDS",
+            help="create snapshots periodically at this interval",
+        )
+
+    def run(self, *args, **kwargs):
+        interval = kwargs.get("schedule")
+
+        if not interval:
+            snapshot = create_snapshot()
+            self.log_info(f"Created site stats snapshot {snapshot.id}")
+            return
+
+        op = UpdateSiteStats.HandleRef.tag
+        description = "Update site stats"
+
+        schedule = TaskSchedule.objects.filter(description=description).first()
+
+        if not schedule:
+            schedule = TaskSchedule(
+                description=description,
+                task_config={"tasks": [{"op": op}]},
+                repeat=True,
+                schedule=timezone.now(),
+            )
+
+        schedule.interval = interval
+        schedule.status = "ok"
+        schedule.save()
+
+        self.log_info(f"Scheduled {op} every {interval} seconds")
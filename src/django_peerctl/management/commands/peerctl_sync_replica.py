@@ -0,0 +1,59 @@
+from django.utils import timezone
+from fullctl.django.management.commands.base import CommandInterface
+from fullctl.django.models.concrete.tasks import TaskSchedule
+
+from django_peerctl.models.tasks import SyncReplica
+from django_peerctl.replica import sync
+
+
+class Command(CommandInterface):
+    """
+    Syncs the local replicas of pdbctl and ixctl data
+
+    Pass --schedule to instead set up (or update) the task schedule
+    that syncs it periodically.
+    """
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="refresh all replicated objects instead of only the ones updated since the last sync",
+        )
+        parser.add_argument(
+            "--schedule",
+            type=int,
+            metavar="SECONDS",
+            help="sync periodically at this interval",
+        )
+
+    def run(self, *args, **kwargs):
+        interval = kwargs.get("schedule")
+
+        if not interval:
+            result = sync(full=kwargs.get("full"))
+            self.log_info(
+                f"Synced {result['networks']} networks, "
+                f"{result['members']} exchange member changes"
+            )
+            return
+
+        op = SyncReplica.HandleRef.tag
+        description = "Sync pdbctl replica"
+
+        schedule = TaskSchedule.objects.filter(description=description).first()
+
+        if not schedule:
+            schedule = TaskSchedule(
+                description=description,
+                task_config={"tasks": [{"op": op}]},
+                repeat=True,
+                schedule=timezone.now(),
+            )
+
+        schedule.interval = interval
+        schedule.status = "ok"
+        schedule.save()
+
+        self.log_info(f"Scheduled {op} every {interval} seconds")
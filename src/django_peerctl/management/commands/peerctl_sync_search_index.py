@@ -0,0 +1,55 @@
+from django.utils import timezone
+from fullctl.django.management.commands.base import CommandInterface
+from fullctl.django.models.concrete.tasks import TaskSchedule
+
+from django_peerctl.models.tasks import SyncSearchIndex
+from django_peerctl.search import sync
+
+
+class Command(CommandInterface):
+    """
+    Syncs the search columns of networks and port infos from pdbctl
+    and ixctl
+
+    Pass --schedule to instead set up (or update) the task schedule
+    that syncs them periodically.
+    """
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--schedule",
+            type=int,
+            metavar="SECONDS",
+            help="sync periodically at this interval",
+        )
+
+    def run(self, *args, **kwargs):
+        interval = kwargs.get("schedule")
+
+        if not interval:
+            result = sync()
+            self.log_info(
+                f"Updated {result['networks']} networks "
+                f"and {result['port_infos']} port infos"
+            )
+            return
+
+        op = SyncSearchIndex.HandleRef.tag
+        description = "Sync search index"
+
+        schedule = TaskSchedule.objects.filter(description=description).first()
+
+        if not schedule:
+            schedule = TaskSchedule(
+                description=description,
+                task_config={"tasks": [{"op": op}]},
+                repeat=True,
+                schedule=timezone.now(),
+            )
+
+        schedule.interval = interval
+        schedule.status = "ok"
+        schedule.save()
+
+        self.log_info(f"Scheduled {op} every {interval} seconds")
@@ -0,0 +1,63 @@
+# Generated by Django 3.2.20 on 2026-10-18 12:00
+
+import django.db.models.manager
+import django_handleref.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_peerctl", "0045_auto_20231206_1445"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SiteStats",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                (
+                    "created",
+                    django_handleref.models.CreatedDateTimeField(
+                        auto_now_add=True, verbose_name="Created"
+                    ),
+                ),
+                (
+                    "updated",
+                    django_handleref.models.UpdatedDateTimeField(
+                        auto_now=True, verbose_name="Updated"
+                    ),
+                ),
+                ("version", models.IntegerField(default=0)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("ok", "Ok"),
+                            ("pending", "Pending"),
+                            ("deactivated", "Deactivated"),
+                            ("failed", "Failed"),
+                            ("expired", "Expired"),
+                        ],
+                        default="ok",
+                        max_length=12,
+                    ),
+                ),
+                ("users", models.PositiveIntegerField(default=0)),
+                ("ix", models.PositiveIntegerField(default=0)),
+                ("peers", models.PositiveIntegerField(default=0)),
+                ("peer_sessions", models.PositiveIntegerField(default=0)),
+                ("peer_sessions_ip4", models.PositiveIntegerField(default=0)),
+                ("peer_sessions_ip6", models.PositiveIntegerField(default=0)),
+                ("peers_by_scope", models.JSONField(default=list)),
+                ("peers_by_type", models.JSONField(default=list)),
+            ],
+            options={
+                "verbose_name": "Site Stats",
+                "verbose_name_plural": "Site Stats",
+                "db_table": "peerctl_site_stats",
+            },
+            managers=[
+                ("handleref", django.db.models.manager.Manager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.20 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_peerctl", "0046_site_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="peerrequest",
+            name="autopeer_request_id",
+            field=models.CharField(
+                blank=True,
+                help_text="Request id returned by the remote autopeer api",
+                max_length=255,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="peerrequest",
+            name="autopeer_requested",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Sessions were requested from the remote autopeer api at",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="peerrequest",
+            name="poll_count",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Number of autopeer status polls"
+            ),
+        ),
+    ]
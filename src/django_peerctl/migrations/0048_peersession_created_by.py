@@ -0,0 +1,27 @@
+# Generated by Django 3.2.20 on 2026-10-18 13:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("django_peerctl", "0047_peerrequest_autopeer_state"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="peersession",
+            name="created_by",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="User that created this session",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 3.2.20 on 2026-10-18 13:50
+
+import django.contrib.postgres.indexes
+import netfields.fields
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_peerctl", "0048_peersession_created_by"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="network",
+            name="search_name",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Network name (synced from pdbctl for search)",
+                max_length=255,
+            ),
+        ),
+        migrations.AddField(
+            model_name="portinfo",
+            name="search_ipaddr4",
+            field=netfields.fields.InetAddressField(
+                blank=True,
+                help_text="IPv4 address (synced for search)",
+                max_length=39,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="portinfo",
+            name="search_ipaddr6",
+            field=netfields.fields.InetAddressField(
+                blank=True,
+                help_text="IPv6 address (synced for search)",
+                max_length=39,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="portinfo",
+            name="search_ix_name",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Exchange name (synced for search)",
+                max_length=255,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="network",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_name"],
+                name="peerctl_net_search_name_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="portinfo",
+            index=django.contrib.postgres.indexes.GistIndex(
+                fields=["search_ipaddr4"],
+                name="peerctl_portinfo_search_ip4",
+                opclasses=["inet_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="portinfo",
+            index=django.contrib.postgres.indexes.GistIndex(
+                fields=["search_ipaddr6"],
+                name="peerctl_portinfo_search_ip6",
+                opclasses=["inet_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="portinfo",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_ix_name"],
+                name="peerctl_portinfo_ix_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
@@ -0,0 +1,111 @@
+# Generated by Django 3.2.20 on 2026-10-18 14:30
+
+import django.db.models.manager
+import django_handleref.models
+import django_inet.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_peerctl", "0049_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PeeringDBNetwork",
+            fields=[
+                (
+                    "created",
+                    django_handleref.models.CreatedDateTimeField(
+                        auto_now_add=True, verbose_name="Created"
+                    ),
+                ),
+                (
+                    "updated",
+                    django_handleref.models.UpdatedDateTimeField(
+                        auto_now=True, verbose_name="Updated"
+                    ),
+                ),
+                ("version", models.IntegerField(default=0)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("ok", "Ok"),
+                            ("pending", "Pending"),
+                            ("deactivated", "Deactivated"),
+                            ("failed", "Failed"),
+                            ("expired", "Expired"),
+                        ],
+                        default="ok",
+                        max_length=12,
+                    ),
+                ),
+                (
+                    "id",
+                    models.PositiveIntegerField(primary_key=True, serialize=False),
+                ),
+                ("asn", django_inet.models.ASNField(unique=True)),
+                ("name", models.CharField(blank=True, default="", max_length=255)),
+                (
+                    "website",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                (
+                    "irr_as_set",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                (
+                    "policy_general",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                (
+                    "info_type",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                (
+                    "info_prefixes4",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                (
+                    "info_prefixes6",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                (
+                    "info_ratio",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                (
+                    "info_scope",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                (
+                    "info_traffic",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                ("info_unicast", models.BooleanField(default=False)),
+                ("info_multicast", models.BooleanField(default=False)),
+                (
+                    "info_never_via_route_servers",
+                    models.BooleanField(default=False),
+                ),
+                (
+                    "pdb_updated",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Last update of the network in peeringdb",
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "PeeringDB Network",
+                "verbose_name_plural": "PeeringDB Networks",
+                "db_table": "peerctl_pdb_net",
+            },
+            managers=[
+                ("handleref", django.db.models.manager.Manager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 3.2.20 on 2026-10-18 15:10
+
+import django.db.models.manager
+import django_handleref.models
+import django_inet.models
+import netfields.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_peerctl", "0050_peeringdbnetwork"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="network",
+            name="ix_members_synced",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Last sync of the network's exchange members",
+                null=True,
+            ),
+        ),
+        migrations.CreateModel(
+            name="ExchangeMember",
+            fields=[
+                ("id", models.AutoField(primary_key=True, serialize=False)),
+                (
+                    "created",
+                    django_handleref.models.CreatedDateTimeField(
+                        auto_now_add=True, verbose_name="Created"
+                    ),
+                ),
+                (
+                    "updated",
+                    django_handleref.models.UpdatedDateTimeField(
+                        auto_now=True, verbose_name="Updated"
+                    ),
+                ),
+                ("version", models.IntegerField(default=0)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("ok", "Ok"),
+                            ("pending", "Pending"),
+                            ("deactivated", "Deactivated"),
+                            ("failed", "Failed"),
+                            ("expired", "Expired"),
+                        ],
+                        default="ok",
+                        max_length=12,
+                    ),
+                ),
+                ("ref_id", models.CharField(max_length=64, unique=True)),
+                ("source", models.CharField(max_length=32)),
+                ("member_id", models.PositiveIntegerField()),
+                ("asn", django_inet.models.ASNField(db_index=True)),
+                ("ix_id", models.PositiveIntegerField()),
+                (
+                    "ix_name",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                (
+                    "ipaddr4",
+                    netfields.fields.InetAddressField(
+                        blank=True, db_index=True, max_length=39, null=True
+                    ),
+                ),
+                (
+                    "ipaddr6",
+                    netfields.fields.InetAddressField(
+                        blank=True, db_index=True, max_length=39, null=True
+                    ),
+                ),
+                ("speed", models.PositiveIntegerField(default=0)),
+                ("is_rs_peer", models.BooleanField(default=False)),
+                ("data", models.JSONField(default=dict)),
+            ],
+            options={
+                "verbose_name": "Exchange Member",
+                "verbose_name_plural": "Exchange Members",
+                "db_table": "peerctl_ix_member",
+            },
+            managers=[
+                ("handleref", django.db.models.manager.Manager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="exchangemember",
+            index=models.Index(fields=["source", "ix_id"], name="peerctl_ix_member_ix"),
+        ),
+    ]
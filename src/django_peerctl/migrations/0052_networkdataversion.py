@@ -0,0 +1,34 @@
+# Generated by Django 3.2.20 on 2026-10-18 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_peerctl", "0051_exchangemember"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NetworkDataVersion",
+            fields=[
+                (
+                    "net",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="data_version",
+                        serialize=False,
+                        to="django_peerctl.network",
+                    ),
+                ),
+                ("version", models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Network Data Version",
+                "verbose_name_plural": "Network Data Versions",
+                "db_table": "peerctl_net_data_version",
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.20 on 2026-10-18 17:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_peerctl", "0052_networkdataversion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NetworkEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("type", models.CharField(max_length=32)),
+                ("action", models.CharField(max_length=32)),
+                ("object_id", models.PositiveIntegerField()),
+                ("data", models.JSONField(default=dict)),
+                ("created", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "net",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="django_peerctl.network",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Network Event",
+                "verbose_name_plural": "Network Events",
+                "db_table": "peerctl_net_event",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="networkevent",
+            index=models.Index(fields=["net", "id"], name="peerctl_net_event_net"),
+        ),
+    ]
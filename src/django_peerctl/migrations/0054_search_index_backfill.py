@@ -0,0 +1,82 @@
+# Generated by Django 3.2.20 on 2026-10-18 17:10
+
+import ipaddress
+
+from django.db import migrations
+
+BATCH_SIZE = 250
+
+
+def host(ip):
+    if not ip:
+        return None
+    return str(ipaddress.ip_interface(str(ip)).ip)
+
+
+def backfill_search_index(apps, schema_editor):
+    """
+    Fills the search columns from the local pdbctl network and
+    exchange member replicas and the port infos' own ip addresses
+
+    No service bridge requests are made, rows whose references are
+    not in the replicas yet are synced when they are next saved or
+    filtered on (see `django_peerctl.search.sync_sessions`) and by
+    the `task_sync_search_index` task.
+    """
+
+    Network = apps.get_model("django_peerctl", "Network")
+    PeeringDBNetwork = apps.get_model("django_peerctl", "PeeringDBNetwork")
+    PortInfo = apps.get_model("django_peerctl", "PortInfo")
+    ExchangeMember = apps.get_model("django_peerctl", "ExchangeMember")
+
+    names = dict(PeeringDBNetwork.objects.values_list("asn", "name"))
+
+    networks = []
+
+    for net in Network.objects.filter(search_name="").only("id", "asn"):
+        if names.get(net.asn):
+            net.search_name = names[net.asn][:255]
+            networks.append(net)
+
+    Network.objects.bulk_update(networks, ["search_name"], batch_size=BATCH_SIZE)
+
+    members = {
+        member.ref_id: member
+        for member in ExchangeMember.objects.only(
+            "ref_id", "ipaddr4", "ipaddr6", "ix_name"
+        )
+    }
+
+    port_infos = []
+
+    for port_info in PortInfo.objects.filter(
+        search_ipaddr4__isnull=True, search_ipaddr6__isnull=True
+    ):
+        member = members.get(port_info.ref_id)
+
+        ip4 = host(port_info.ip_address_4 or getattr(member, "ipaddr4", None))
+        ip6 = host(port_info.ip_address_6 or getattr(member, "ipaddr6", None))
+
+        if not ip4 and not ip6:
+            continue
+
+        port_info.search_ipaddr4 = ip4
+        port_info.search_ipaddr6 = ip6
+        port_info.search_ix_name = getattr(member, "ix_name", "")[:255]
+        port_infos.append(port_info)
+
+    PortInfo.objects.bulk_update(
+        port_infos,
+        ["search_ipaddr4", "search_ipaddr6", "search_ix_name"],
+        batch_size=BATCH_SIZE,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_peerctl", "0053_networkevent"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 3.2.20 on 2026-10-18 17:40
+
+import django_inet.models
+from django.db import migrations, models
+
+
+def copy_network_sync(apps, schema_editor):
+    """
+    Carries the sync state of the networks' exchange members over
+    """
+
+    Network = apps.get_model("django_peerctl", "Network")
+    ExchangeMemberSync = apps.get_model("django_peerctl", "ExchangeMemberSync")
+
+    ExchangeMemberSync.objects.bulk_create(
+        [
+            ExchangeMemberSync(asn=asn, synced=synced)
+            for asn, synced in Network.objects.filter(
+                ix_members_synced__isnull=False
+            ).values_list("asn", "ix_members_synced")
+        ],
+        batch_size=250,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_peerctl", "0054_search_index_backfill"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExchangeMemberSync",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("asn", django_inet.models.ASNField(unique=True)),
+                ("synced", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Exchange Member Sync",
+                "verbose_name_plural": "Exchange Member Syncs",
+                "db_table": "peerctl_ix_member_sync",
+            },
+        ),
+        migrations.RunPython(copy_network_sync, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="network",
+            name="ix_members_synced",
+        ),
+    ]
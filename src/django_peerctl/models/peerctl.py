@@ -12,9 +12,12 @@ import fullctl.service_bridge.sot as sot
 import reversion
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex, GistIndex
 from django.contrib.sessions.models import Session
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.utils.html import strip_tags
 from django.utils.translation import gettext as _
 from django_countries.fields import CountryField
@@ -24,11 +27,11 @@ from fullctl.django.fields.service_bridge import ReferencedObjectField
 from fullctl.django.models.abstract import HandleRefModel, meta
 from fullctl.django.models.concrete import Instance, Organization, Task  # noqa
 from fullctl.django.validators import ip_address_string
-from fullctl.service_bridge.data import Relationships
+from fullctl.service_bridge.data import DataObject, Relationships
 from jinja2 import DictLoader, Environment, FileSystemLoader
 from netfields import InetAddressField, MACAddressField, NetManager
 
-from django_peerctl import const
+from django_peerctl import bridge_cache, const, subnet_index, template_cache
 from django_peerctl.email import send_mail_from_default
 from django_peerctl.exceptions import (
     ASNClaimed,
@@ -41,6 +44,8 @@ from django_peerctl.meta import PeerSessionSchema
 from django_peerctl.models.tasks import SyncIsRsPeer, SyncMacAddress, SyncRouteServerMD5
 from django_peerctl.templating import ip_version, make_variable_name
 
+log = logging.getLogger(__name__)
+
 # naming::
 # handleref tag $model_$model
 # matching fks should use the tag (even tho it would usually be done as _)
@@ -216,6 +221,62 @@ class Policy(Base):
     def is_global6(self):
         return self.net.policy6_id == self.id
 
+    @classmethod
+    def count_peers_for_net(cls, net):
+        """
+        Counts the number of peers using each policy of a network
+
+        Sessions that have both their ipv4 and ipv6 policy explicitly assigned
+        are counted with an aggregate query, the remaining sessions inherit
+        at least one of their policies and are resolved in a single pass.
+
+        Arguments:
+            net (Network): network to count policy usage for
+
+        Returns:
+            dict: {policy_id: count}
+        """
+
+        counts = collections.Counter()
+
+        peer_sessions = PeerSession.objects.filter(
+            peer_port__peer_net__net=net, status="ok"
+        ).order_by()
+
+        # explicitly assigned policies
+
+        explicit = (
+            peer_sessions.filter(policy4__isnull=False, policy6__isnull=False)
+            .values("policy4_id", "policy6_id")
+            .annotate(count=models.Count("id"))
+        )
+
+        for row in explicit:
+            counts[row["policy4_id"]] += row["count"]
+            if row["policy6_id"] != row["policy4_id"]:
+                counts[row["policy6_id"]] += row["count"]
+
+        # inherited policies
+
+        inherited = list(
+            peer_sessions.filter(
+                models.Q(policy4__isnull=True) | models.Q(policy6__isnull=True)
+            )
+        )
+
+        resolver = PolicyResolver(inherited)
+
+        for peer_session in inherited:
+            policy_ids = {
+                resolver.get_policy_id(peer_session, 4),
+                resolver.get_policy_id(peer_session, 6),
+            }
+            policy_ids.discard(None)
+            for policy_id in policy_ids:
+                counts[policy_id] += 1
+
+        return dict(counts)
+
     def count_peers(self, peer_sessions=None):
         """
         Counts the number of peers using this policy
@@ -232,22 +293,16 @@ class Policy(Base):
 
             peer_sessions = self.net.peer_session_at_ix(ix_id=None).filter(status="ok")
 
-            # batch load port references from devicectl
-
-            Port.load_references(peer_sessions)
-
         # count peers using this policy by checking if the best policy for each peer
         # session is this policy
 
+        resolver = PolicyResolver(peer_sessions)
+
         for peer_session in peer_sessions:
-            try:
-                if get_best_policy(peer_session, 4) == self:
-                    count += 1
-                elif get_best_policy(peer_session, 6) == self:
-                    count += 1
-            except PolicyMissingError:
-                # no policy could be determined (no global policy set either)
-                pass
+            if resolver.get_policy_id(peer_session, 4) == self.id:
+                count += 1
+            elif resolver.get_policy_id(peer_session, 6) == self.id:
+                count += 1
         return count
 
     def __str__(self):
@@ -327,6 +382,382 @@ class UsageLimitMixin(models.Model):
         abstract = True
 
 
+# pdbctl network fields mirrored into `PeeringDBNetwork`
+PDB_NETWORK_FIELDS = [
+    "name",
+    "website",
+    "irr_as_set",
+    "policy_general",
+    "info_type",
+    "info_prefixes4",
+    "info_prefixes6",
+    "info_ratio",
+    "info_scope",
+    "info_traffic",
+    "info_unicast",
+    "info_multicast",
+    "info_never_via_route_servers",
+]
+
+# number of asns to request pdbctl networks for per service bridge
+# request when filling in networks missing from the replica
+PDB_NETWORK_BATCH_SIZE = 250
+
+
+class PeeringDBNetwork(HandleRefModel):
+    """
+    Local replica of the pdbctl network fields peerctl uses
+
+    Rows are attribute compatible with pdbctl network objects (the
+    primary key is the peeringdb network id), so they stand in as
+    `Network.ref`.
+
+    Networks missing from the replica are requested from pdbctl and
+    written through on lookup (see `refs`), replicated networks are
+    kept up to date by `django_peerctl.replica.sync`
+    """
+
+    id = models.PositiveIntegerField(primary_key=True)
+    asn = ASNField(unique=True)
+
+    name = models.CharField(max_length=255, blank=True, default="")
+    website = models.CharField(max_length=255, blank=True, default="")
+    irr_as_set = models.CharField(max_length=255, blank=True, default="")
+    policy_general = models.CharField(max_length=255, blank=True, default="")
+    info_type = models.CharField(max_length=255, blank=True, default="")
+    info_prefixes4 = models.PositiveIntegerField(null=True, blank=True)
+    info_prefixes6 = models.PositiveIntegerField(null=True, blank=True)
+    info_ratio = models.CharField(max_length=255, blank=True, default="")
+    info_scope = models.CharField(max_length=255, blank=True, default="")
+    info_traffic = models.CharField(max_length=255, blank=True, default="")
+    info_unicast = models.BooleanField(default=False)
+    info_multicast = models.BooleanField(default=False)
+    info_never_via_route_servers = models.BooleanField(default=False)
+
+    pdb_updated = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("Last update of the network in peeringdb"),
+    )
+
+    class HandleRef:
+        tag = "pdb_net"
+
+    class Meta:
+        db_table = "peerctl_pdb_net"
+        verbose_name = _("PeeringDB Network")
+        verbose_name_plural = _("PeeringDB Networks")
+
+    def __str__(self):
+        return f"{self.name} (AS{self.asn})"
+
+    @classmethod
+    def upsert(cls, refs):
+        """
+        Creates or updates replica rows from pdbctl network objects
+
+        Arguments:
+            - refs <iterable<pdbctl.NetworkObject>>
+
+        Returns:
+            - list<PeeringDBNetwork>
+        """
+
+        rows = {}
+
+        for ref in refs:
+            # networks deleted in peeringdb are kept as deactivated rows
+            # so they are not requested again on every lookup
+
+            status = getattr(ref, "status", None) or "ok"
+
+            row = cls(
+                id=ref.id,
+                asn=ref.asn,
+                status="ok" if status == "ok" else "deactivated",
+                pdb_updated=parse_datetime(str(getattr(ref, "updated", ""))),
+            )
+
+            for field_name in PDB_NETWORK_FIELDS:
+                value = getattr(ref, field_name, None)
+                field = cls._meta.get_field(field_name)
+                if value is None and not field.null:
+                    value = field.get_default()
+                setattr(row, field_name, value)
+
+            rows[row.id] = row
+
+        if not rows:
+            return []
+
+        existing = set(
+            cls.objects.filter(id__in=rows.keys()).values_list("id", flat=True)
+        )
+
+        now = timezone.now()
+        new = [row for row in rows.values() if row.id not in existing]
+        changed = [row for row in rows.values() if row.id in existing]
+
+        for row in changed:
+            row.updated = now
+
+        # rows may be written through by concurrent requests
+
+        cls.objects.bulk_create(new, ignore_conflicts=True)
+        cls.objects.bulk_update(
+            changed,
+            PDB_NETWORK_FIELDS + ["asn", "status", "pdb_updated", "updated"],
+            batch_size=PDB_NETWORK_BATCH_SIZE,
+        )
+
+        return list(rows.values())
+
+    @classmethod
+    def refs(cls, asns):
+        """
+        Returns the replicated networks for the specified asns
+
+        Networks missing from the replica are requested from pdbctl
+        in batches of `PDB_NETWORK_BATCH_SIZE` asns and written through
+
+        Arguments:
+            - asns <iterable<int>>
+
+        Returns:
+            - dict: asn -> PeeringDBNetwork, networks that do not exist
+              in peeringdb (or were deleted) are omitted
+        """
+
+        asns = {int(asn) for asn in asns if asn}
+        if not asns:
+            return {}
+
+        rows = list(cls.objects.filter(asn__in=asns))
+        missing = sorted(asns - {row.asn for row in rows})
+
+        for i in range(0, len(missing), PDB_NETWORK_BATCH_SIZE):
+            rows.extend(
+                cls.upsert(
+                    bridge_cache.cached_objects(
+                        pdbctl.Network(),
+                        asns=missing[i : i + PDB_NETWORK_BATCH_SIZE],
+                    )
+                )
+            )
+
+        return {row.asn: row for row in rows if row.status == "ok"}
+
+
+# number of asns to request exchange members for per service bridge
+# request when filling in asns missing from the replica
+IX_MEMBER_BATCH_SIZE = 250
+
+# `ExchangeMember` fields that are compared to detect changes
+IX_MEMBER_FIELDS = [
+    "source",
+    "member_id",
+    "asn",
+    "ix_id",
+    "ix_name",
+    "ipaddr4",
+    "ipaddr6",
+    "speed",
+    "is_rs_peer",
+    "data",
+]
+
+
+def member_data(member):
+    """
+    Returns the attributes of a service bridge member object as a
+    json serializable dict, joined objects are included as dicts
+    """
+
+    data = {}
+
+    for key, value in vars(member).items():
+        if key.startswith("_"):
+            continue
+        if isinstance(value, DataObject):
+            value = {k: v for k, v in vars(value).items() if not k.startswith("_")}
+        data[key] = value
+
+    return json.loads(json.dumps(data, default=str))
+
+
+class ExchangeMember(HandleRefModel):
+    """
+    Local replica of exchange members (pdbctl netixlans and ixctl
+    members as resolved by `sot.InternetExchangeMember`)
+
+    The columns hold what peerctl filters on, `data` holds the full
+    member object so `ref` can rebuild a service bridge object that is
+    interchangeable with the ones the bridge returns.
+
+    Memberships of an asn are read from the replica once they have
+    been synced (`ExchangeMemberSync`), other asns are requested from
+    the bridge and written through (see `refs`).
+
+    The replica is refreshed by `django_peerctl.replica.sync`, which
+    sends `exchange_members_changed` for every change it detects.
+    """
+
+    ref_id = models.CharField(max_length=64, unique=True)
+    source = models.CharField(max_length=32)
+    member_id = models.PositiveIntegerField()
+    asn = ASNField(db_index=True)
+    ix_id = models.PositiveIntegerField()
+    ix_name = models.CharField(max_length=255, blank=True, default="")
+    ipaddr4 = InetAddressField(null=True, blank=True, db_index=True)
+    ipaddr6 = InetAddressField(null=True, blank=True, db_index=True)
+    speed = models.PositiveIntegerField(default=0)
+    is_rs_peer = models.BooleanField(default=False)
+    data = models.JSONField(default=dict)
+
+    objects = NetManager()
+
+    class HandleRef:
+        tag = "ix_member"
+
+    class Meta:
+        db_table = "peerctl_ix_member"
+        verbose_name = _("Exchange Member")
+        verbose_name_plural = _("Exchange Members")
+        indexes = [
+            models.Index(fields=["source", "ix_id"], name="peerctl_ix_member_ix"),
+        ]
+
+    def __str__(self):
+        return f"{self.ref_id} (AS{self.asn})"
+
+    @classmethod
+    def from_ref(cls, member):
+        """
+        Returns an unsaved replica row for a service bridge member object
+        """
+
+        attrs = vars(member)
+        ix_name = attrs.get("ix_name") or getattr(attrs.get("ix"), "name", None)
+
+        return cls(
+            ref_id=member.ref_id,
+            source=member.source,
+            member_id=member.id,
+            asn=member.asn,
+            ix_id=member.ix_id,
+            ix_name=(ix_name or "")[:255],
+            ipaddr4=ip_address_string(attrs.get("ipaddr4")) or None,
+            ipaddr6=ip_address_string(attrs.get("ipaddr6")) or None,
+            speed=attrs.get("speed") or 0,
+            is_rs_peer=bool(attrs.get("is_rs_peer")),
+            data=member_data(member),
+            status="ok",
+        )
+
+    @classmethod
+    def refs(cls, asns):
+        """
+        Returns the exchange members of the specified asns
+
+        Asns whose members have not been synced yet are requested from
+        the bridge in batches of `IX_MEMBER_BATCH_SIZE` and written
+        through
+
+        Arguments:
+            - asns <iterable<int>>
+
+        Returns:
+            - dict: asn -> list<DataObject>
+        """
+
+        from django_peerctl.replica import fetch_members, update_members
+
+        asns = {int(asn) for asn in asns if asn}
+        members = {asn: [] for asn in asns}
+
+        if not asns:
+            return members
+
+        synced = set(
+            ExchangeMemberSync.objects.filter(asn__in=asns).values_list(
+                "asn", flat=True
+            )
+        )
+
+        for row in cls.objects.filter(asn__in=synced, status="ok").order_by("id"):
+            members[row.asn].append(row.ref)
+
+        missing = asns - synced
+
+        if missing:
+            fetched, complete = fetch_members(missing)
+            update_members(missing, fetched, complete=complete)
+
+            for member in fetched:
+                members.setdefault(member.asn, []).append(member)
+
+        return members
+
+    @property
+    def ix_ref_id(self):
+        return f"{self.source}:{self.ix_id}"
+
+    @property
+    def ref(self):
+        """
+        Returns the service bridge member object rebuilt from `data`
+        """
+
+        if not hasattr(self, "_ref"):
+            bridge = sot.SOURCE_MAP["member"][self.source]
+            data = dict(self.data)
+            data.setdefault("ref_tag", bridge.Meta.ref_tag)
+            data.setdefault("ix_name", self.ix_name)
+            self._ref = bridge.Meta.data_object_cls(**data)
+        return self._ref
+
+
+class ExchangeMemberSync(models.Model):
+    """
+    Last complete sync of an asn's exchange members to the
+    `ExchangeMember` replica
+
+    Tracked per asn rather than on `Network`, so peers that do not
+    have a local network are read from the replica as well.
+    """
+
+    asn = ASNField(unique=True)
+    synced = models.DateTimeField()
+
+    class Meta:
+        db_table = "peerctl_ix_member_sync"
+        verbose_name = _("Exchange Member Sync")
+        verbose_name_plural = _("Exchange Member Syncs")
+
+    def __str__(self):
+        return f"AS{self.asn}: {self.synced}"
+
+    @classmethod
+    def mark(cls, asns, synced):
+        """
+        Marks the exchange members of the specified asns as synced
+
+        Arguments:
+            - asns <iterable<int>>
+            - synced <datetime>
+        """
+
+        asns = set(asns)
+
+        if not asns:
+            return
+
+        cls.objects.bulk_create(
+            [cls(asn=asn, synced=synced) for asn in asns], ignore_conflicts=True
+        )
+        cls.objects.filter(asn__in=asns).update(synced=synced)
+
+
 @grainy_model(
     namespace="verified.asn", namespace_instance="{namespace}.{instance.asn}.?"
 )
@@ -384,11 +815,27 @@ class Network(PolicyHolderMixin, UsageLimitMixin, Base):
         ),
     )
 
+    # denormalized from pdbctl for search, see django_peerctl.search
+
+    search_name = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        help_text=_("Network name (synced from pdbctl for search)"),
+    )
+
     class HandleRef:
         tag = "net"
 
     class Meta:
         db_table = "peerctl_net"
+        indexes = [
+            GinIndex(
+                fields=["search_name"],
+                name="peerctl_net_search_name_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
 
     def __str__(self):
         return f"AS{self.asn}"
@@ -460,34 +907,89 @@ class Network(PolicyHolderMixin, UsageLimitMixin, Base):
         self.policy6 = global_policy
         self.save()
 
+    @property
+    def memberships(self):
+        """
+        Returns this network's exchange memberships
+
+        Cached on the instance, so repeated mutual location lookups
+        during a request only fetch them once
+        """
+
+        if not hasattr(self, "_memberships"):
+            self._memberships = ExchangeMember.refs([self.asn])[self.asn]
+        return self._memberships
+
     def get_mutual_locations(self, other_asn, exclude=None):
-        asns = [self.asn, other_asn]
+        mutual = self.get_mutual_locations_bulk([other_asn], exclude=exclude)
 
-        exchanges = {}
+        for members in mutual.values():
+            members.setdefault(other_asn, [])
 
-        for member in sot.InternetExchangeMember().objects(asns=asns):
-            source = member.source
-            ix_ref_id = f"{source}:{member.ix_id}"
+        return mutual
 
-            if exclude and ix_ref_id in exclude:
-                continue
+    def get_mutual_locations_bulk(self, asns, exclude=None):
+        """
+        Returns the mutual locations between this network and
+        many other networks at once
+
+        Our memberships are fetched once (see `memberships`) and the
+        memberships of all other networks are read from the exchange
+        member replica at once (see `ExchangeMember.refs`)
+
+        Arguments:
+            - asns <list<int>>: other networks
+
+        Keyword Arguments:
+            - exclude <list<str>>: exchange ref ids (`{source}:{ix_id}`) to skip
+
+        Returns:
+            - dict: exchange ref id -> {asn: list<InternetExchangeMember>},
+              only exchanges where this network and at least one of the
+              other networks are present, includes this network's members
+              under its own asn. If this network's own asn is passed
+              all of its exchanges are returned.
+        """
 
-            if ix_ref_id not in exchanges:
-                exchanges[ix_ref_id] = {self.asn: [], other_asn: []}
+        exclude = set(exclude or [])
+        asns = {int(asn) for asn in asns}
+        include_own = self.asn in asns
+        asns = sorted(asns - {self.asn})
 
-            exchanges[ix_ref_id][member.asn].append(member)
+        exchanges = {}
+
+        for member in self.memberships:
+            ix_ref_id = f"{member.source}:{member.ix_id}"
+            if ix_ref_id in exclude:
+                continue
+            exchanges.setdefault(ix_ref_id, {self.asn: []})[self.asn].append(member)
 
         mutual = {}
 
-        for ix_id, members in list(exchanges.items()):
-            if members[self.asn] and members[other_asn]:
-                mutual[ix_id] = members
+        # a network shares all of its exchanges with itself
+
+        if include_own:
+            for ix_ref_id, members in exchanges.items():
+                mutual[ix_ref_id] = {self.asn: members[self.asn]}
+
+        for other_members in ExchangeMember.refs(asns).values():
+            for member in other_members:
+                ix_ref_id = f"{member.source}:{member.ix_id}"
+
+                if ix_ref_id not in exchanges:
+                    continue
+
+                members = mutual.setdefault(
+                    ix_ref_id, {self.asn: exchanges[ix_ref_id][self.asn]}
+                )
+                members.setdefault(member.asn, []).append(member)
+
         return mutual
 
     @property
     def ref(self):
         if not hasattr(self, "_ref"):
-            self._ref = pdbctl.Network().first(asn=self.asn)
+            self._ref = PeeringDBNetwork.refs([self.asn]).get(self.asn)
         return self._ref
 
     @property
@@ -520,7 +1022,7 @@ class Network(PolicyHolderMixin, UsageLimitMixin, Base):
     @ref_fallback({})
     def contacts(self):
         contacts = {}
-        for poc in pdbctl.NetworkContact().objects(asn=self.asn):
+        for poc in bridge_cache.cached_objects(pdbctl.NetworkContact(), asn=self.asn):
             role = poc.role.lower()
             if poc.email and role not in contacts:
                 contacts[role] = poc.email
@@ -607,7 +1109,9 @@ class Network(PolicyHolderMixin, UsageLimitMixin, Base):
     @property
     def devices(self):
         try:
-            return devicectl.Device().objects(org=self.org.permission_id)
+            return bridge_cache.cached_objects(
+                devicectl.Device(), org=self.org.permission_id
+            )
         except AttributeError:
             return []
 
@@ -757,6 +1261,94 @@ class OrganizationDefaultNetwork(models.Model):
         return f"{self.org.name} -> {self.network.name}"
 
 
+class NetworkDataVersion(models.Model):
+    """
+    Version stamp of the data a network's port, session, peer and
+    policy endpoints return
+
+    Bumped whenever a peer session, peer network, peer port, port
+    info, policy, policy peer group or port policy of the network
+    changes (see `django_peerctl.signals`) and used for ETags and as
+    part of the response cache key (see `django_peerctl.response_cache`)
+
+    Kept out of the `Network` table so saving a stale network instance
+    can never roll the version back.
+    """
+
+    net = models.OneToOneField(
+        Network,
+        related_name="data_version",
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        db_table = "peerctl_net_data_version"
+        verbose_name = _("Network Data Version")
+        verbose_name_plural = _("Network Data Versions")
+
+    def __str__(self):
+        return f"{self.net_id}: {self.version}"
+
+    @classmethod
+    def bump(cls, net_ids):
+        """
+        Increments the version of the specified networks
+
+        Arguments:
+            - net_ids <iterable<int>>
+        """
+
+        net_ids = {net_id for net_id in net_ids if net_id}
+
+        if not net_ids:
+            return
+
+        cls.objects.bulk_create(
+            [cls(net_id=net_id) for net_id in net_ids], ignore_conflicts=True
+        )
+        cls.objects.filter(net_id__in=net_ids).update(version=models.F("version") + 1)
+
+    @classmethod
+    def get(cls, asn):
+        """
+        Returns the version of the network with the specified asn
+        """
+
+        return (
+            cls.objects.filter(net__asn=asn).values_list("version", flat=True).first()
+            or 0
+        )
+
+
+class NetworkEvent(models.Model):
+    """
+    Change event of a network's peer sessions and peer requests
+
+    Written when sessions and peer requests are saved and polled
+    through the network's events endpoint, see `django_peerctl.events`
+    """
+
+    net = models.ForeignKey(Network, on_delete=models.CASCADE, related_name="+")
+    type = models.CharField(max_length=32)
+    action = models.CharField(max_length=32)
+    object_id = models.PositiveIntegerField()
+    data = models.JSONField(default=dict)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        db_table = "peerctl_net_event"
+        verbose_name = _("Network Event")
+        verbose_name_plural = _("Network Events")
+        indexes = [
+            models.Index(fields=["net", "id"], name="peerctl_net_event_net"),
+        ]
+
+    def __str__(self):
+        return f"{self.type}.{self.action} {self.object_id}"
+
+
 @reversion.register
 class PeerNetwork(PolicyHolderMixin, Base):
     """preferences and policy for specific peer network"""
@@ -867,7 +1459,7 @@ class InternetExchange(sot.ReferenceMixin, Base):
     @reversion.create_revision()
     def get_or_create(cls, ix, source):
         if isinstance(ix, int):
-            ix = cls.ref_bridge(source).object(ix)
+            ix = bridge_cache.cached_object(cls.ref_bridge(source), ix)
 
         try:
             obj = cls.objects.get(ref_id=ix.ref_id)
@@ -987,10 +1579,8 @@ class MutualLocation:
 
         members = {}
 
-        for member in sot.InternetExchangeMember().objects(
-            asn=self.net.asn, join=["ix"]
-        ):
-            members[f"{member.source}:{member.id}"] = member
+        for member in ExchangeMember.refs([self.net.asn])[self.net.asn]:
+            members[member.ref_id] = member
 
         for port_info in _portinfos:
             if not port_info.ref_id:
@@ -1058,7 +1648,9 @@ class PortObject(devicectl.DeviceCtlEntity, PolicyHolderMixin):
         if self.device:
             return [self.device]
         if not hasattr(self, "_devices"):
-            self._devices = [devicectl.Device().object(self.device_id)]
+            self._devices = [
+                bridge_cache.cached_object(devicectl.Device(), self.device_id)
+            ]
         return self._devices
 
     @ref_fallback([])
@@ -1107,6 +1699,7 @@ class PortObject(devicectl.DeviceCtlEntity, PolicyHolderMixin):
                 "peer_port__port_info",
                 "peer_port__peer_net",
                 "peer_port__peer_net__peer",
+                "created_by",
             ).exclude(status="deleted")
         return self._peer_session_qs_prefetched
 
@@ -1175,6 +1768,7 @@ class PortObject(devicectl.DeviceCtlEntity, PolicyHolderMixin):
     def set_mac_address(self, mac_address):
         self.port_info_object.mac_address = mac_address
         self.port_info_object.save()
+        subnet_index.invalidate()
 
         if self.asn:
             SyncMacAddress.create_task(
@@ -1326,37 +1920,19 @@ class Port(devicectl.Port):
     class Meta(devicectl.Port.Meta):
         data_object_cls = PortObject
 
-    @classmethod
-    def in_same_subnet(cls, org, device, ip):
-        """
-        Will return all ports on the device that are in the same subnet as the given ip
-        """
-
-        ports = cls().objects(device=device, org_slug=org.slug)
-
-        ip = ip.split("/")[0]
-
-        candidates = []
-
-        for port in ports:
-            peer_ip = ipaddress.ip_address(ip)
-
-            if peer_ip.version == 6 and not port.ip_address_6:
-                continue
-            if peer_ip.version == 4 and not port.ip_address_4:
-                continue
-            port_ip = ipaddress.ip_interface(
-                port.ip_address_4 if peer_ip.version == 4 else port.ip_address_6
-            )
-
-            peer_ip = ipaddress.ip_interface(f"{ip}/{port_ip.network.prefixlen}")
+    @classmethod
+    def in_same_subnet(cls, org, device, ip):
+        """
+        Will return all ports on the device that are in the same subnet as the given ip
 
-            # check if peer_ip and port_ip4 are in the same subnet
-            # with prefix length specified in prefixlen
-            if peer_ip.network.network_address == port_ip.network.network_address:
-                candidates.append(port)
+        Lookups go through a cached prefix index of the device's port networks
+        (see `subnet_index`)
+        """
 
-        return candidates
+        index = subnet_index.get_index(
+            org, device, lambda: cls().objects(device=device, org_slug=org.slug)
+        )
+        return index.ports_for(ip)
 
     @classmethod
     def preload(
@@ -1378,6 +1954,8 @@ class Port(devicectl.Port):
             port_ids: list of port ids - only include ports with these ids
             filter_device: device id to filter on, will ignore port_ids if set
             load_policies: load policies for ports
+            port_infos: dict of port id -> PortInfo, port infos of the
+                ports if already loaded, queried if not set
 
         Returns:
 
@@ -1391,10 +1969,12 @@ class Port(devicectl.Port):
         if port_ids:
             filters["ids"] = port_ids
 
+        port_id_set = set(port_ids or [])
+
         instances = [
             port
             for port in Port().objects(**filters)
-            if (filter_device or port.id in port_ids)
+            if (filter_device or port.id in port_id_set)
             and (not filter_device or port.device_id == int(filter_device))
             # and (not port.name or not port.name.startswith("peerctl:"))
         ]
@@ -1412,31 +1992,39 @@ class Port(devicectl.Port):
             port._port_info = port_infos.get(int(port.id))
             port._port_info.port._object = port
 
-        # prefetch netixlans/ixctl members
+        # PNI ports may not have a port_info_object yet and can be skipped
 
-        for member in sot.InternetExchangeMember().objects(asn=asn):
-            for port in instances:
-                # PNI ports may not have a port_info_object yet and can be skipped
+        port_infos_by_ref_id = {}
 
-                if not hasattr(port, "port_info_object") or not port.port_info_object:
-                    continue
+        for port in instances:
+            if port.port_info_object and port.port_info_object.ref_id:
+                port_infos_by_ref_id.setdefault(
+                    port.port_info_object.ref_id, []
+                ).append(port.port_info_object)
+
+        # prefetch netixlans/ixctl members
 
-                if port.port_info_object.ref_id == member.ref_id:
-                    port.port_info_object._ref = member
+        for member in ExchangeMember.refs([asn]).get(int(asn), []):
+            for port_info in port_infos_by_ref_id.get(member.ref_id, []):
+                port_info._ref = member
 
         # prefetch networks
 
-        networks = Network.objects.filter(
-            port_info_qs__port__in=[port.id for port in instances]
-        )
+        networks = {
+            net.id: net
+            for net in Network.objects.filter(
+                port_info_qs__port__in=[port.id for port in instances]
+            )
+        }
 
         for port in instances:
-            if not hasattr(port, "port_info_object") or not port.port_info_object:
+            if not port.port_info_object:
                 continue
 
-            for net in networks:
-                if port.port_info_object.net_id == net.id:
-                    port.port_info_object.net = net
+            net = networks.get(port.port_info_object.net_id)
+
+            if net:
+                port.port_info_object.net = net
 
         # prefetch policies
 
@@ -1547,7 +2135,9 @@ class Port(devicectl.Port):
         # now get ixctl internet exchange objects
 
         if ixctl_ix:
-            ix_ix = ixctl.InternetExchange().objects(ids=list(ixctl_ix.keys()))
+            ix_ix = bridge_cache.cached_objects(
+                ixctl.InternetExchange(), ids=list(ixctl_ix.keys())
+            )
             for ix in ix_ix:
                 ixctl_ix[ix.id] = ix
 
@@ -1560,7 +2150,9 @@ class Port(devicectl.Port):
         # now get pdbctl internet exchange objects
 
         if pdbctl_ix:
-            pdb_ix = pdbctl.InternetExchange().objects(ids=list(pdbctl_ix.keys()))
+            pdb_ix = bridge_cache.cached_objects(
+                pdbctl.InternetExchange(), ids=list(pdbctl_ix.keys())
+            )
             for ix in pdb_ix:
                 pdbctl_ix[ix.id] = ix
 
@@ -1635,6 +2227,21 @@ class PortInfo(sot.ReferenceMixin, Base):
 
     mac_address = MACAddressField(null=True, blank=True)
 
+    # denormalized from ixctl / pdbctl for search, see django_peerctl.search
+
+    search_ipaddr4 = InetAddressField(
+        null=True, blank=True, help_text=_("IPv4 address (synced for search)")
+    )
+    search_ipaddr6 = InetAddressField(
+        null=True, blank=True, help_text=_("IPv6 address (synced for search)")
+    )
+    search_ix_name = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        help_text=_("Exchange name (synced for search)"),
+    )
+
     objects = NetManager()
 
     class HandleRef:
@@ -1644,6 +2251,23 @@ class PortInfo(sot.ReferenceMixin, Base):
         db_table = "peerctl_port_info"
         verbose_name = "Port Information"
         verbose_name_plural = "Port Information"
+        indexes = [
+            GistIndex(
+                fields=["search_ipaddr4"],
+                name="peerctl_portinfo_search_ip4",
+                opclasses=["inet_ops"],
+            ),
+            GistIndex(
+                fields=["search_ipaddr6"],
+                name="peerctl_portinfo_search_ip6",
+                opclasses=["inet_ops"],
+            ),
+            GinIndex(
+                fields=["search_ix_name"],
+                name="peerctl_portinfo_ix_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
 
     @classmethod
     def require_for_pdb_netixlan(cls, network, port_id, member):
@@ -1724,15 +2348,24 @@ class PortInfo(sot.ReferenceMixin, Base):
         if not reassign and cls.objects.filter(port=to_port).exists():
             raise ValueError("Port is already assigned")
 
+        NetworkDataVersion.bump(
+            cls.objects.filter(port__in=[from_port, to_port]).values_list(
+                "net_id", flat=True
+            )
+        )
+
         cls.objects.filter(port=from_port).update(port=to_port)
         PeerSession.objects.filter(port=from_port).update(port=to_port)
 
+        subnet_index.invalidate()
+
     @classmethod
     def load_references(self, objects):
         """
         loads ixctl/pdbctl references for port info objects
 
-        This will do a batched request to ixctl/pdbctl to fetch all at once
+        References are read from the exchange member replica, the ones
+        missing from it are fetched with a batched request to ixctl/pdbctl
         """
 
         ixctl_ref_ids = set()
@@ -1740,12 +2373,24 @@ class PortInfo(sot.ReferenceMixin, Base):
         ixctl_members = {}
         pdbctl_members = {}
 
+        replicated = {
+            row.ref_id: row.ref
+            for row in ExchangeMember.objects.filter(
+                ref_id__in=[obj.ref_id for obj in objects if obj.ref_id],
+                status="ok",
+            )
+        }
+
         # collect all ref ids and categorize ixctl or pdbctl
 
         for obj in objects:
             if not obj.ref_id:
                 continue
 
+            if obj.ref_id in replicated:
+                obj._ref = replicated[obj.ref_id]
+                continue
+
             if obj.ref_source == "pdbctl":
                 pdbctl_ref_ids.add(int(obj.ref_id.split(":")[1]))
             elif obj.ref_source == "ixctl":
@@ -1767,7 +2412,7 @@ class PortInfo(sot.ReferenceMixin, Base):
         # set references according to ref id
 
         for obj in objects:
-            if not obj.ref_id:
+            if not obj.ref_id or obj.ref_id in replicated:
                 continue
 
             if obj.ref_source == "pdbctl":
@@ -1824,7 +2469,9 @@ class PortInfo(sot.ReferenceMixin, Base):
     @property
     @ref_fallback("")
     def ix_name(self):
-        return InternetExchange.ref_bridge(self.ref_source).object(self.ref.ix_id).name
+        return bridge_cache.cached_object(
+            InternetExchange.ref_bridge(self.ref_source), self.ref.ix_id
+        ).name
 
     @property
     @ref_fallback(None)
@@ -1911,15 +2558,52 @@ class DeviceObject(devicectl.DeviceCtlEntity):
             self._ports = Port().objects(device=self.id)
         return self._ports
 
+    def peer_sessions(self, net):
+        """
+        Returns a cached list of active peer sessions for the
+        specified network on this device
+        """
+
+        if not hasattr(self, "_peer_sessions"):
+            self._peer_sessions = {}
+
+        if net.id not in self._peer_sessions:
+            self._peer_sessions[net.id] = list(
+                self.peer_session_qs.filter(
+                    peer_port__peer_net__net=net, status="ok"
+                ).select_related(
+                    "peer_port",
+                    "peer_port__port_info",
+                    "peer_port__peer_net",
+                    "peer_port__peer_net__net",
+                    "peer_port__peer_net__peer",
+                )
+            )
+
+        return self._peer_sessions[net.id]
+
+    def policy_resolver(self, net):
+        """
+        Returns a cached PolicyResolver for the peer sessions of the
+        specified network on this device
+        """
+
+        if not hasattr(self, "_policy_resolvers"):
+            self._policy_resolvers = {}
+
+        if net.id not in self._policy_resolvers:
+            self._policy_resolvers[net.id] = PolicyResolver(self.peer_sessions(net))
+
+        return self._policy_resolvers[net.id]
+
     def peer_groups(self, net, ip_version):
         """return collection of peer groups"""
 
         groups = {}
+        resolver = self.policy_resolver(net)
 
-        for peer_session in self.peer_session_qs.filter(
-            peer_port__peer_net__net=net, status="ok"
-        ):
-            policy = get_best_policy(peer_session, ip_version)
+        for peer_session in self.peer_sessions(net):
+            policy = resolver.get_best_policy(peer_session, ip_version)
             name = policy.peer_group
             if name not in groups:
                 groups[name] = [peer_session]
@@ -1928,6 +2612,44 @@ class DeviceObject(devicectl.DeviceCtlEntity):
 
         return groups
 
+    def netom0_peer(self, net, peer_session, ip_version, members=None):
+        """
+        Returns the netom0 peering object literal for a peer session
+        and ip version
+
+        Returns None if the peer session has no address for the ip version
+        or is not contained in `members`
+
+        Arguments:
+            - net <Network>
+            - peer_session <PeerSession>
+            - ip_version <int>: 4 or 6
+            - members <list>: if specified only return data for peer sessions
+                on these member ref ids
+        """
+
+        addr = peer_session.peer_port.port_info.ipaddr(ip_version)
+
+        if not addr:
+            return None
+
+        if members and peer_session.peer_port.port_info.ref_id not in members:
+            return None
+
+        policy = self.policy_resolver(net).get_best_policy(peer_session, ip_version)
+
+        return {
+            "name": peer_session.peer_port.peer_net.peer.name,
+            "peer_as": peer_session.peer_port.peer_net.peer.asn,
+            "peer_type": "external",
+            "neighbor_address": addr,
+            "local_as": peer_session.peer_port.peer_net.net.asn,
+            "auth_password": peer_session.peer_port.peer_net.md5,
+            "max_prefixes": peer_session.peer_port.peer_net.info_prefixes(ip_version),
+            "import_policy": policy.import_policy,
+            "export_policy": policy.export_policy,
+        }
+
     def _peer_groups_netom0_data(self, net, ip_version, peer_groups, **kwargs):
         """
         Fills the dict passed in `peer_groups` with groups and netom0
@@ -1942,38 +2664,31 @@ class DeviceObject(devicectl.DeviceCtlEntity):
             - peer_groups <dict>: this dictionary will be updated
 
                 { peer_group_name : [netom0_data, ...] }
+
+        Keyword Arguments:
+            - members <list>
+            - stream <bool>: if True, groups are `PeerGroupRows` instances
+                that generate the netom0 data as they are iterated
         """
 
         members = kwargs.get("members")
+        stream = kwargs.get("stream")
 
         for name, peer_session_set in list(self.peer_groups(net, ip_version).items()):
             if name not in peer_groups:
-                peer_groups[name] = []
+                if stream:
+                    peer_groups[name] = PeerGroupRows(self, net, members=members)
+                else:
+                    peer_groups[name] = []
 
             for peer_session in peer_session_set:
-                policy = get_best_policy(peer_session, ip_version)
-                addr = peer_session.peer_port.port_info.ipaddr(ip_version)
-
-                if not addr:
-                    continue
-
-                if members and peer_session.peer_port.port_info.ref_id not in members:
+                if stream:
+                    peer_groups[name].add(peer_session, ip_version)
                     continue
 
-                peer = {
-                    "name": peer_session.peer_port.peer_net.peer.name,
-                    "peer_as": peer_session.peer_port.peer_net.peer.asn,
-                    "peer_type": "external",
-                    "neighbor_address": addr,
-                    "local_as": peer_session.peer_port.peer_net.net.asn,
-                    "auth_password": peer_session.peer_port.peer_net.md5,
-                    "max_prefixes": peer_session.peer_port.peer_net.info_prefixes(
-                        ip_version
-                    ),
-                    "import_policy": policy.import_policy,
-                    "export_policy": policy.export_policy,
-                }
-                peer_groups[name].append(peer)
+                peer = self.netom0_peer(net, peer_session, ip_version, members)
+                if peer:
+                    peer_groups[name].append(peer)
 
     def peer_groups_netom0_data(self, net, **kwargs):
         """
@@ -1982,6 +2697,11 @@ class DeviceObject(devicectl.DeviceCtlEntity):
 
         Arguments:
             - net <Network>
+
+        Keyword Arguments:
+            - members <list>
+            - stream <bool>: generate netom0 data lazily during
+                iteration of the peer groups
         """
         peer_groups = {}
         self._peer_groups_netom0_data(net, 4, peer_groups, **kwargs)
@@ -1990,6 +2710,40 @@ class DeviceObject(devicectl.DeviceCtlEntity):
         return r
 
 
+class PeerGroupRows:
+    """
+    Peer sessions of a peer group for streaming template rendering
+
+    Netom0 peer data is generated while the group is iterated instead
+    of being built up front, can be iterated multiple times.
+    """
+
+    def __init__(self, device, net, members=None):
+        self.device = device
+        self.net = net
+        self.members = members
+        self.entries = []
+
+    def add(self, peer_session, ip_version):
+        self.entries.append((peer_session, ip_version))
+
+    def __iter__(self):
+        for peer_session, version in self.entries:
+            peer = self.device.netom0_peer(
+                self.net, peer_session, version, self.members
+            )
+            if peer:
+                yield peer
+
+    def __len__(self):
+        # sessions without address for the ip version are skipped
+        # during iteration, so they need to be counted the same way
+        return sum(1 for _ in self)
+
+    def __bool__(self):
+        return any(True for _ in self)
+
+
 class Device(devicectl.Device):
     DoesNotExist = Exception
 
@@ -2134,6 +2888,15 @@ class PeerSession(PolicyHolderMixin, meta.DataMixin, Base):
         help_text=_("Session is running on this device"),
     )
 
+    created_by = models.ForeignKey(
+        get_user_model(),
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        help_text=_("User that created this session"),
+    )
+
     class Meta:
         unique_together = ("port", "peer_port")
         db_table = "peerctl_peer_session"
@@ -2195,37 +2958,29 @@ class PeerSession(PolicyHolderMixin, meta.DataMixin, Base):
 
         # Resolve the port to a PortObject instance
 
-        peer_ports = PeerPort.objects.filter(
-            peer_net=peer_net, peer_sessions__device=int(device)
+        peer_ports = list(
+            PeerPort.objects.filter(
+                peer_net=peer_net, peer_sessions__device=int(device)
+            ).select_related("port_info")
         )
 
-        # loop through the peer ports to look for an ip match
+        # load port info references in one batch and index the peer ports
+        # by their ip addresses
 
-        peer_port = None
-        session = None
-        peer_ip = ipaddress.ip_interface(peer_ip)
+        PortInfo.load_references([_peer_port.port_info for _peer_port in peer_ports])
 
-        for _peer_port in peer_ports:
-            if peer_ip.version == 4 and not _peer_port.port_info.ipaddr4:
-                continue
+        peer_ports_by_ip = {}
 
-            if peer_ip.version == 6 and not _peer_port.port_info.ipaddr6:
-                continue
+        for _peer_port in peer_ports:
+            port_info = _peer_port.port_info
+            for addr in (port_info.ipaddr4, port_info.ipaddr6):
+                if addr:
+                    ip = ipaddress.ip_interface(addr).ip
+                    peer_ports_by_ip.setdefault(ip, _peer_port)
 
-            if (
-                peer_ip.version == 4
-                and ipaddress.ip_interface(_peer_port.port_info.ipaddr4).ip
-                == peer_ip.ip
-            ):
-                peer_port = _peer_port
-                break
-            elif (
-                peer_ip.version == 6
-                and ipaddress.ip_interface(_peer_port.port_info.ipaddr6).ip
-                == peer_ip.ip
-            ):
-                peer_port = _peer_port
-                break
+        session = None
+        peer_ip = ipaddress.ip_interface(peer_ip)
+        peer_port = peer_ports_by_ip.get(peer_ip.ip)
 
         # we got all pieces now to query the session
 
@@ -2263,11 +3018,20 @@ class PeerSession(PolicyHolderMixin, meta.DataMixin, Base):
         ).first()
 
     @classmethod
-    def load_references(cls, sessions):
+    def load_references(
+        cls, sessions, networks=True, ports=True, devices=True, policies=True
+    ):
         """
         Prefetches relations for the sessions
 
         This will batch several service bridge requests
+
+        Keyword Arguments:
+            - networks <bool=True>: load peer networks
+            - ports <bool=True>: load ports and port infos
+            - devices <bool=True>: join devices when loading ports
+            - policies <bool=True>: resolve policies, policies are
+              resolved through ports so ports are loaded as well
         """
 
         peers_asns = []
@@ -2277,29 +3041,30 @@ class PeerSession(PolicyHolderMixin, meta.DataMixin, Base):
             peers_asns.append(session.peer_port.peer_net.peer.asn)
             port_infos.append(session.peer_port.port_info)
 
-        if peers_asns:
-            networks = {
-                net.asn: net
-                for net in pdbctl.Network().objects(asns=list(set(peers_asns)))
-            }
-        else:
-            networks = {}
+        refs = PeeringDBNetwork.refs(peers_asns) if networks else {}
 
-        Port.load_references(port_infos + sessions, join="device")
+        if ports or policies:
+            Port.load_references(
+                port_infos + sessions, join="device" if devices else None
+            )
 
-        for session in sessions:
-            if not session.port or not session.port.id:
-                continue
+        if policies:
+            PolicyResolver(sessions).apply()
+
+        if ports:
+            for session in sessions:
+                if not session.port or not session.port.id:
+                    continue
 
-            port_infos.append(session.port.object.port_info_object)
+                port_infos.append(session.port.object.port_info_object)
 
-        PortInfo.load_references(port_infos)
+            PortInfo.load_references(port_infos)
 
-        if not networks:
+        if not refs:
             return sessions
 
         for session in sessions:
-            session.peer_port.peer_net.peer._ref = networks.get(
+            session.peer_port.peer_net.peer._ref = refs.get(
                 session.peer_port.peer_net.peer.asn
             )
 
@@ -2333,13 +3098,12 @@ class PeerSession(PolicyHolderMixin, meta.DataMixin, Base):
     def user(self):
         """
         Returns the user that created this peer session
-        using historic revision data
+
+        Set when the session is created, existing sessions are
+        backfilled from revision data by the
+        `peerctl_backfill_session_creators` command
         """
-        versions = reversion.models.Version.objects.get_for_object(self)
-        first_version = versions.first()
-        if first_version:
-            return first_version.revision.user
-        return None
+        return self.created_by
 
     @property
     def devices(self):
@@ -2375,6 +3139,186 @@ class PeerSession(PolicyHolderMixin, meta.DataMixin, Base):
         )
 
 
+class PolicyResolver:
+
+    """
+    Resolves the best ipv4 and ipv6 policies for a batch of peer sessions
+
+    Follows the same inheritance chain as `helpers.get_best_policy`
+
+        session -> peer network -> port policy -> port network
+
+    but loads the policy references of all policy holders in the chain
+    with a handful of bulk queries and memoizes the resolved policy for
+    each parent, instead of querying for every session and ip version.
+    """
+
+    def __init__(self, sessions):
+        """
+        Arguments:
+
+            sessions (list): list or queryset of PeerSession objects
+        """
+
+        self.sessions = {}
+
+        # policy holder -> {ip_version: policy_id}
+
+        self.peer_nets = {}
+        self.session_peer_nets = {}
+        self.port_policies = {}
+        self.port_nets = {}
+
+        # resolved policy id, keyed by (parent, ip_version)
+
+        self.memo = {}
+
+        self.policies = {}
+
+        self.load(sessions)
+
+    def load(self, sessions):
+        """
+        Batch loads the policy references for all policy holders
+        in the inheritance chain of the specified sessions
+        """
+
+        port_ids = set()
+
+        for session in sessions:
+            if not session.id:
+                continue
+            self.sessions[session.id] = session
+            if session.port and session.port.id:
+                port_ids.add(int(session.port.id))
+
+        if not self.sessions:
+            return
+
+        # peer network policies
+
+        for (
+            session_id,
+            peer_net_id,
+            policy4_id,
+            policy6_id,
+        ) in PeerSession.objects.filter(id__in=list(self.sessions.keys())).values_list(
+            "id",
+            "peer_port__peer_net_id",
+            "peer_port__peer_net__policy4_id",
+            "peer_port__peer_net__policy6_id",
+        ):
+            self.session_peer_nets[session_id] = peer_net_id
+            self.peer_nets[peer_net_id] = {4: policy4_id, 6: policy6_id}
+
+        if port_ids:
+            # port policies
+
+            for port_id, policy4_id, policy6_id in PortPolicy.objects.filter(
+                port__in=port_ids
+            ).values_list("port", "policy4_id", "policy6_id"):
+                self.port_policies[int(port_id)] = {4: policy4_id, 6: policy6_id}
+
+            # network policies of the port owners, `PortObject.port_info_object`
+            # uses the first port info for a port
+
+            for port_id, policy4_id, policy6_id in (
+                PortInfo.objects.filter(port__in=port_ids)
+                .order_by("id")
+                .values_list("port", "net__policy4_id", "net__policy6_id")
+            ):
+                self.port_nets.setdefault(int(port_id), {4: policy4_id, 6: policy6_id})
+
+        # resolve and load all policies at once
+
+        policy_ids = set()
+
+        for session in self.sessions.values():
+            for version in (4, 6):
+                policy_ids.add(self.get_policy_id(session, version))
+
+        policy_ids.discard(None)
+
+        if policy_ids:
+            self.policies = {
+                policy.id: policy
+                for policy in Policy.objects.filter(id__in=policy_ids).select_related(
+                    "peer_group_managed"
+                )
+            }
+
+    def parents(self, session):
+        """
+        Returns the policy parents of a session as a list
+        of (holder type, holder id) tuples
+        """
+
+        parents = [("peer_net", self.session_peer_nets.get(session.id))]
+        if session.port and session.port.id:
+            parents.append(("port", int(session.port.id)))
+        return parents
+
+    def resolve_parent(self, parent, version):
+        typ, pk = parent
+
+        if typ == "peer_net":
+            return self.peer_nets.get(pk, {}).get(version)
+
+        return self.port_policies.get(pk, {}).get(version) or self.port_nets.get(
+            pk, {}
+        ).get(version)
+
+    def get_policy_id(self, session, version):
+        """
+        Returns the id of the best policy for the session, or None
+        if no policy could be determined
+        """
+
+        policy_id = getattr(session, f"policy{int(version)}_id")
+
+        if policy_id:
+            return policy_id
+
+        for parent in self.parents(session):
+            key = (parent, int(version))
+            if key not in self.memo:
+                self.memo[key] = self.resolve_parent(parent, int(version))
+            if self.memo[key]:
+                return self.memo[key]
+
+        return None
+
+    def get_best_policy(self, session, version, raise_error=True):
+        """
+        Returns the best policy for the session
+
+        Sessions that were not part of the batch fall back to
+        `helpers.get_best_policy`
+        """
+
+        if session.id not in self.sessions:
+            return get_best_policy(session, version, raise_error=raise_error)
+
+        policy = self.policies.get(self.get_policy_id(session, version))
+
+        if not policy and raise_error:
+            raise PolicyMissingError(session)
+
+        return policy
+
+    def apply(self):
+        """
+        Caches the resolved policies on the session objects, where
+        they are picked up by the `PeerSession` serializer
+        """
+
+        for session in self.sessions.values():
+            session._policy4 = self.get_best_policy(session, 4, raise_error=False)
+            session._policy6 = self.get_best_policy(session, 6, raise_error=False)
+
+        return self
+
+
 @grainy_model(
     namespace="verified.asn", namespace_instance="{namespace}.{instance.net.asn}.?"
 )
@@ -2419,6 +3363,26 @@ class PeerRequest(HandleRefModel):
         ),
     )
 
+    # autopeer state, set once sessions have been requested from
+    # the remote autopeer api and polled until they are ready
+
+    autopeer_request_id = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        help_text=_("Request id returned by the remote autopeer api"),
+    )
+
+    autopeer_requested = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_("Sessions were requested from the remote autopeer api at"),
+    )
+
+    poll_count = models.PositiveIntegerField(
+        default=0, help_text=_("Number of autopeer status polls")
+    )
+
     class Meta:
         db_table = "peerctl_peerrequest"
         verbose_name = _("Peer Request")
@@ -2529,13 +3493,17 @@ class PeerRequestLocation(HandleRefModel):
             return self._name
 
         if self.pdb_ix_id:
-            pdb_ix = pdbctl.first(id=self.pdb_ix_id)
+            pdb_ix = bridge_cache.cached_first(
+                pdbctl.InternetExchange(), id=self.pdb_ix_id
+            )
             if pdb_ix:
                 self._name = pdb_ix.name
                 return self._name
 
         if self.ixctl_ix_id:
-            ixctl_ix = ixctl.first(id=self.ixctl_ix_id)
+            ixctl_ix = bridge_cache.cached_first(
+                ixctl.InternetExchange(), id=self.ixctl_ix_id
+            )
             if ixctl_ix:
                 self._name = ixctl_ix.name
                 return self._name
@@ -2627,13 +3595,41 @@ class TemplateBase(models.Model):
             # templates/peerctl/<handle_ref_tag>
             loader = FileSystemLoader(self.template_loader_paths)
 
-        env = Environment(trim_blocks=True, loader=loader, autoescape=True)
+        env = Environment(
+            trim_blocks=True,
+            loader=loader,
+            autoescape=True,
+            bytecode_cache=template_cache.bytecode_cache(),
+        )
 
         env.filters["make_variable_name"] = make_variable_name
         env.filters["ip_version"] = ip_version
 
         return env
 
+    @property
+    def template_cache_key(self):
+        """
+        Returns the key for the compiled template in the template cache
+        """
+        return (
+            self.HandleRef.tag,
+            self.id,
+            template_cache.body_hash(self.body),
+            self.template_path,
+            template_cache.netom_version(),
+        )
+
+    def get_template(self):
+        """
+        Returns the compiled jinja template, from the process-wide
+        template cache if possible
+        """
+        return template_cache.get_template(
+            self.template_cache_key,
+            lambda: self.get_env().get_template(self.template_path),
+        )
+
     def render(self):
         """
         renders a template to UTF-8
@@ -2644,16 +3640,49 @@ class TemplateBase(models.Model):
         if self.content_override:
             return self.content_override
 
-        env = self.get_env()
-        template = env.get_template(self.template_path)
+        template = self.get_template()
         try:
             return strip_tags(template.render(**self.get_data()))
         except Exception as exc:
-            import traceback
+            log.error("template render failed", exc_info=True)
+            raise TemplateRenderError(exc)
+
+    def render_stream(self, chunk_size=8192):
+        """
+        renders a template and yields the output in chunks
+
+        Output is generated incrementally through jinja's `generate`,
+        chunks are split at line ends so `strip_tags` never sees
+        a partial line.
+
+        Arguments:
+            - chunk_size <int>: minimum size of a chunk before it is yielded
+        """
+
+        if self.content_override:
+            yield self.content_override
+            return
 
-            print(traceback.format_exc())
+        template = self.get_template()
+        buffer = []
+        size = 0
+        try:
+            for part in template.generate(**self.get_data()):
+                buffer.append(part)
+                size += len(part)
+                if size < chunk_size or "\n" not in part:
+                    continue
+                content, remainder = "".join(buffer).rsplit("\n", 1)
+                buffer = [remainder]
+                size = len(remainder)
+                yield strip_tags(content + "\n")
+        except Exception as exc:
+            log.error("template render failed", exc_info=True)
             raise TemplateRenderError(exc)
 
+        if buffer:
+            yield strip_tags("".join(buffer))
+
 
 @reversion.register
 @grainy_model(
@@ -2684,6 +3713,16 @@ class DeviceTemplate(Base, TemplateBase):
             return "There were no active sessions to generate configuration output for."
         return r
 
+    def render_stream(self, chunk_size=8192):
+        self.context["stream"] = True
+        empty = True
+        for chunk in super().render_stream(chunk_size=chunk_size):
+            if chunk:
+                empty = False
+                yield chunk
+        if empty:
+            yield "There were no active sessions to generate configuration output for."
+
     def get_data(self):
         data = super().get_data()
         ctx = self.context
@@ -2693,7 +3732,11 @@ class DeviceTemplate(Base, TemplateBase):
         if member:
             member = [member]
 
-        data.update(**device.peer_groups_netom0_data(net, members=member))
+        data.update(
+            **device.peer_groups_netom0_data(
+                net, members=member, stream=ctx.get("stream", False)
+            )
+        )
         if len(data["peer_groups"]) == 0:
             data["peer_groups"] = get_dummy_peer_data(net)
         data["device"] = {"type": device.type}
@@ -2730,7 +3773,7 @@ class EmailTemplate(Base, TemplateBase):
 
         ix_ids = []
 
-        for member in sot.InternetExchangeMember().objects(asn=self.net.asn):
+        for member in self.net.memberships:
             ref_ix_id = member.ref_rel_id("ix_id")
             if ref_ix_id not in ix_ids:
                 ix_ids.append(ref_ix_id)
@@ -2778,7 +3821,7 @@ class EmailTemplate(Base, TemplateBase):
 
             # if the asn is set try to retrieve network infromation from it
 
-            other_net = pdbctl.Network().first(asn=asn)
+            other_net = PeeringDBNetwork.refs([asn]).get(asn) if asn else None
             if other_net:
                 company_name = other_net.name
             elif asn:
@@ -2906,6 +3949,58 @@ class AuditLog(HandleRefModel):
         self.recent_log = msg
 
 
+class SiteStats(HandleRefModel):
+    """
+    Snapshot of site wide statistics
+
+    Snapshots are created periodically by the `task_update_site_stats`
+    task, the most recent one is what `stats.site_stats` returns.
+    """
+
+    users = models.PositiveIntegerField(default=0)
+    ix = models.PositiveIntegerField(default=0)
+    peers = models.PositiveIntegerField(default=0)
+    peer_sessions = models.PositiveIntegerField(default=0)
+    peer_sessions_ip4 = models.PositiveIntegerField(default=0)
+    peer_sessions_ip6 = models.PositiveIntegerField(default=0)
+
+    # [(scope, count), ...]
+    peers_by_scope = models.JSONField(default=list)
+
+    # [(type, count), ...]
+    peers_by_type = models.JSONField(default=list)
+
+    class HandleRef:
+        tag = "site_stats"
+
+    class Meta:
+        db_table = "peerctl_site_stats"
+        verbose_name = _("Site Stats")
+        verbose_name_plural = _("Site Stats")
+
+    @classmethod
+    def latest(cls):
+        return cls.objects.order_by("-id").first()
+
+    @property
+    def data(self):
+        return {
+            "user": self.users,
+            "ix": self.ix,
+            "peers": {
+                "all": self.peers,
+                "scope": [tuple(row) for row in self.peers_by_scope],
+                "type": [tuple(row) for row in self.peers_by_type],
+            },
+            "peer_session": {
+                "all": self.peer_sessions,
+                "ip4": self.peer_sessions_ip4,
+                "ip6": self.peer_sessions_ip6,
+            },
+            "created": self.created,
+        }
+
+
 @grainy_model(
     namespace="peerctl.net", namespace_instance="{namespace}.{instance.net.asn}"
 )
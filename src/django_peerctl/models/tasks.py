@@ -2,6 +2,8 @@ import fullctl.service_bridge.ixctl as ixctl
 from fullctl.django.models.concrete import Task
 from fullctl.django.tasks import register
 
+from django_peerctl import bridge_cache
+
 
 @register
 class SyncMacAddress(Task):
@@ -17,9 +19,13 @@ class SyncMacAddress(Task):
         tag = "task_sync_mac_address"
 
     def run(self, asn, ip4, mac_address, *args, **kwargs):
+        from django_peerctl.replica import sync_members
+
         ixctl.InternetExchangeMember().set_mac_address(
             asn, ip4, mac_address, source="peerctl"
         )
+        bridge_cache.invalidate(ixctl.InternetExchangeMember)
+        sync_members([asn])
 
 
 @register
@@ -36,9 +42,18 @@ class SyncASSet(Task):
         tag = "task_sync_asset"
 
     def run(self, member_id, as_macro, *args, **kwargs):
+        from django_peerctl.models import ExchangeMember
+        from django_peerctl.replica import sync_members
+
         ixctl.InternetExchangeMember().set_as_macro(
             member_id, as_macro, source="peerctl"
         )
+        bridge_cache.invalidate(ixctl.InternetExchangeMember)
+        sync_members(
+            ExchangeMember.objects.filter(ref_id=f"ixctl:{member_id}").values_list(
+                "asn", flat=True
+            )
+        )
 
 
 @register
@@ -55,9 +70,13 @@ class SyncRouteServerMD5(Task):
         tag = "task_sync_md5"
 
     def run(self, asn, md5, member_ip, router_ip, *args, **kwargs):
+        from django_peerctl.replica import sync_members
+
         ixctl.InternetExchangeMember().set_route_server_md5(
             asn, md5, member_ip, router_ip, source="peerctl"
         )
+        bridge_cache.invalidate(ixctl.InternetExchangeMember)
+        sync_members([asn])
 
 
 @register
@@ -74,6 +93,8 @@ class SyncIsRsPeer(Task):
         tag = "task_sync_is_rs_peer"
 
     def run(self, asn, ip4, is_rs_peer, *args, **kwargs):
+        from django_peerctl.replica import sync_members
+
         # get the member object
 
         member = ixctl.InternetExchangeMember().first(ip=ip4, asn=asn, ix_verified=True)
@@ -87,6 +108,8 @@ class SyncIsRsPeer(Task):
         ixctl.InternetExchangeMember().partial_update(
             member, {"is_rs_peer": is_rs_peer}
         )
+        bridge_cache.invalidate(ixctl.InternetExchangeMember)
+        sync_members([asn])
 
         return f"updated {member.id} is_rs_peer to {is_rs_peer}"
 
@@ -117,3 +140,118 @@ class SyncDevicePorts(Task):
 
     def generate_limit_id(self):
         return self.org_id
+
+
+@register
+class UpdateSiteStats(Task):
+
+    """
+    Creates a new site stats snapshot
+
+    Meant to be run periodically through a task schedule
+    """
+
+    class Meta:
+        proxy = True
+
+    class TaskMeta:
+        limit = 1
+
+    class HandleRef:
+        tag = "task_update_site_stats"
+
+    def run(self, *args, **kwargs):
+        from django_peerctl.stats import create_snapshot
+
+        snapshot = create_snapshot()
+        return f"created site stats snapshot {snapshot.id}"
+
+
+@register
+class UpdatePeeringOpportunities(Task):
+
+    """
+    Computes and caches the peering opportunity report for a network
+
+    Expected arguments during create task:
+
+    - asn (int)
+    """
+
+    class Meta:
+        proxy = True
+
+    class TaskMeta:
+        limit = 1
+
+    class HandleRef:
+        tag = "task_update_peering_opportunities"
+
+    @property
+    def generate_limit_id(self):
+        return str(self.param["args"][0])
+
+    def run(self, asn, *args, **kwargs):
+        from django_peerctl.models import Network
+        from django_peerctl.peering_opportunities import update
+
+        report = update(Network.objects.get(asn=asn))
+        return f"found {len(report['results'])} peering opportunities for AS{asn}"
+
+
+@register
+class SyncSearchIndex(Task):
+
+    """
+    Syncs the denormalized search columns of networks and port
+    infos from pdbctl and ixctl
+
+    Meant to be run periodically through a task schedule
+    """
+
+    class Meta:
+        proxy = True
+
+    class TaskMeta:
+        limit = 1
+
+    class HandleRef:
+        tag = "task_sync_search_index"
+
+    def run(self, *args, **kwargs):
+        from django_peerctl.search import sync
+
+        result = sync()
+        return (
+            f"updated {result['networks']} networks "
+            f"and {result['port_infos']} port infos"
+        )
+
+
+@register
+class SyncReplica(Task):
+
+    """
+    Syncs the local replicas of pdbctl and ixctl data, see
+    `django_peerctl.replica`
+
+    Meant to be run periodically through a task schedule
+    """
+
+    class Meta:
+        proxy = True
+
+    class TaskMeta:
+        limit = 1
+
+    class HandleRef:
+        tag = "task_sync_replica"
+
+    def run(self, *args, **kwargs):
+        from django_peerctl.replica import sync
+
+        result = sync()
+        return (
+            f"synced {result['networks']} networks, "
+            f"{result['members']} exchange member changes"
+        )
@@ -0,0 +1,704 @@
+"""
+Bulk create / update of peer sessions
+
+Set based version of the `UpdatePeerSession` create / update logic:
+all rows are validated up front, networks, peer networks, ports and
+port infos are resolved with one query (or devicectl request) per
+object type, and the writes happen through `bulk_create` /
+`bulk_update` in a single transaction.
+
+Rows that fail validation are reported with their errors and are not
+written, valid rows are.
+"""
+
+import ipaddress
+import re
+
+import reversion
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+import django_peerctl.models as models
+from django_peerctl import events, search, subnet_index
+from django_peerctl.rest.serializers.peerctl import Serializers
+
+__all__ = [
+    "PortLookup",
+    "PeerSessionBulkUpsert",
+]
+
+PNI_REGEX = re.compile(r"\bPNI\b", re.IGNORECASE)
+
+
+def host(addr):
+    """
+    Returns the host ip of an ip address or interface string
+    """
+    return ipaddress.ip_interface(addr).ip
+
+
+class PortLookup:
+    """
+    Loads all devicectl ports of an organization with one request
+    and looks them up by id, ip address or device subnet
+    """
+
+    def __init__(self, org):
+        self.by_id = {}
+        self.by_ip = {}
+        self.indexes = {}
+
+        for port in models.Port().objects(org_slug=org.slug):
+            self.by_id[int(port.id)] = port
+            for addr in (port.ip_address_4, port.ip_address_6):
+                if addr:
+                    self.by_ip.setdefault(host(addr), port)
+
+    def first(self, id=None, ip=None):
+        if id is not None:
+            return self.by_id.get(int(id))
+        if ip is not None:
+            return self.by_ip.get(host(ip))
+        return None
+
+    def in_same_subnet(self, device, ip):
+        """
+        Same as `Port.in_same_subnet` for the loaded ports
+        """
+
+        device = int(device)
+
+        if device not in self.indexes:
+            self.indexes[device] = subnet_index.SubnetIndex(
+                [port for port in self.by_id.values() if port.device_id == device]
+            )
+
+        return self.indexes[device].ports_for(ip)
+
+
+class Row:
+    """
+    State of a single row during a bulk upsert
+    """
+
+    def __init__(self, index, payload):
+        self.index = index
+        self.payload = payload
+        self.data = None
+        self.session = None
+        self.port = None
+        self.peer_net = None
+        self.peer_port_info = None
+        self.created = False
+        self.errors = None
+
+    @property
+    def peer_ip(self):
+        return self.data.get("peer_ip4") or self.data.get("peer_ip6")
+
+    @property
+    def result(self):
+        if self.errors:
+            return {"index": self.index, "status": "error", "errors": self.errors}
+
+        return {
+            "index": self.index,
+            "status": "created" if self.created else "updated",
+            "id": self.session.id,
+        }
+
+
+class PeerSessionBulkUpsert:
+    """
+    Creates or updates many peer sessions of a network at once
+
+    Each row takes the same payload as the `UpdatePeerSession` endpoint.
+
+    Arguments:
+        - net <Network>
+        - rows <list<dict>>
+
+    Keyword Arguments:
+        - user <User>: set as revision user
+    """
+
+    def __init__(self, net, rows, user=None):
+        self.net = net
+        self.user = user
+        self.rows = [
+            Row(index, dict(payload) if isinstance(payload, dict) else payload)
+            for index, payload in enumerate(rows)
+        ]
+        self.ports = PortLookup(net.org)
+        self.policies = {
+            name.lower(): policy_id
+            for policy_id, name in models.Policy.objects.filter(net=net).values_list(
+                "id", "name"
+            )
+        }
+        self.context = {
+            "asn": net.asn,
+            "net": net,
+            "ports": self.ports,
+            "policy_ids": set(self.policies.values()),
+        }
+
+    @property
+    def valid_rows(self):
+        return [row for row in self.rows if not row.errors]
+
+    def normalize(self, payload):
+        """
+        Same clean up the `UpdatePeerSession` endpoint applies to its
+        payload, policies can be specified by name
+        """
+
+        for field in ["peer_maxprefix4", "peer_maxprefix6", "id"]:
+            if field in payload and not payload[field]:
+                payload.pop(field)
+
+        for field in ["policy4", "policy6"]:
+            if field not in payload:
+                continue
+
+            if not payload[field] or payload[field] == "0":
+                payload[field] = None
+            elif isinstance(payload[field], str) and not payload[field].isdigit():
+                policy_id = self.policies.get(payload[field].lower())
+                if not policy_id:
+                    raise serializers.ValidationError({field: f"Invalid {field}"})
+                payload[field] = policy_id
+
+        return payload
+
+    def validate(self, row, instance=None):
+        serializer = Serializers.update_peer_session(
+            instance=instance, data=row.payload, context=self.context
+        )
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data
+
+    def session_index(self):
+        """
+        Indexes the active sessions on the devices of all rows like
+        `PeerSession.get_unique` looks them up
+
+        Returns:
+            - exact <dict>: (device, peer_asn, peer ip) -> session
+            - other <dict>: (device, peer_asn, ip version) -> session for
+                sessions that only have an address of the other ip version
+        """
+
+        devices = {int(row.data["device"]) for row in self.valid_rows}
+
+        sessions = list(
+            models.PeerSession.objects.filter(
+                peer_port__peer_net__net=self.net, device__in=devices, status="ok"
+            ).select_related("peer_port__port_info", "peer_port__peer_net__peer")
+        )
+
+        models.PortInfo.load_references(
+            [session.peer_port.port_info for session in sessions]
+        )
+
+        exact = {}
+        other = {}
+
+        for session in sessions:
+            device = int(session.device.id)
+            peer_asn = session.peer_port.peer_net.peer.asn
+            ip4 = session.peer_port.port_info.ipaddr4
+            ip6 = session.peer_port.port_info.ipaddr6
+
+            for addr in (ip4, ip6):
+                if addr:
+                    exact.setdefault((device, peer_asn, host(addr)), session)
+
+            if ip6 and not ip4:
+                other.setdefault((device, peer_asn, 4), session)
+            if ip4 and not ip6:
+                other.setdefault((device, peer_asn, 6), session)
+
+        return exact, other
+
+    def resolve_sessions(self):
+        """
+        Finds the existing session for each row, by id or by device,
+        peer asn and peer ip
+        """
+
+        ids = [row.data["id"] for row in self.valid_rows if row.data.get("id")]
+
+        by_id = {
+            session.id: session
+            for session in models.PeerSession.objects.filter(
+                id__in=ids, peer_port__peer_net__net=self.net
+            ).select_related("peer_port__port_info", "peer_port__peer_net")
+        }
+
+        exact, other = self.session_index()
+        claimed = {}
+
+        for row in self.valid_rows:
+            peer_ip = host(row.peer_ip)
+            key = (int(row.data["device"]), row.data["peer_asn"], peer_ip)
+            unique = exact.get(key) or other.get(key[:2] + (peer_ip.version,))
+
+            if row.data.get("id"):
+                row.session = by_id.get(row.data["id"])
+                if not row.session:
+                    row.errors = {"id": ["Peer session does not exist"]}
+                    continue
+                if unique and unique.id != row.session.id:
+                    row.errors = {
+                        "non_field_errors": [
+                            "A session with the same device, peer asn, and peer ip already exists"
+                        ]
+                    }
+                    continue
+            else:
+                row.session = unique
+
+            # a session can only be written by one row
+
+            claim = row.session.id if row.session else key
+
+            if claim in claimed:
+                row.errors = {
+                    "non_field_errors": [
+                        f"Duplicate of row {claimed[claim]} in request"
+                    ]
+                }
+                continue
+
+            claimed[claim] = row.index
+
+    def resolve_ports(self):
+        """
+        Determines the port for each row, same as `UpdatePeerSession`
+        create and update do
+        """
+
+        for row in self.valid_rows:
+            data = row.data
+            session = row.session
+
+            if not session:
+                port = self.ports.first(id=data["port"]) if data.get("port") else None
+                device = data.get("device")
+
+                if not port and device:
+                    candidates = self.ports.in_same_subnet(device, row.peer_ip)
+                    if candidates:
+                        port = candidates[0]
+
+                if (
+                    port
+                    and port.device_id
+                    and device
+                    and int(port.device_id) != int(device)
+                ):
+                    row.errors = {
+                        "non_field_errors": [
+                            "The device you provided does not match the device for the port specifierd"
+                        ]
+                    }
+                    continue
+
+                row.port = port
+                continue
+
+            if "port" in data:
+                session.port = data["port"]
+
+            if "device" in data and not session.port:
+                session.device = data["device"]
+
+            if not session.port and session.device:
+                candidates = self.ports.in_same_subnet(session.device.id, row.peer_ip)
+                if candidates:
+                    session.port = candidates[0].id
+
+            if session.port:
+                row.port = self.ports.first(id=int(session.port))
+
+    def peer_interfaces(self, row):
+        """
+        Returns the peer ip4 and ip6 interfaces for a row, using the prefix
+        length of the port's addresses if possible
+        """
+
+        peer_ip4 = row.data.get("peer_ip4")
+        peer_ip6 = row.data.get("peer_ip6")
+
+        peer_ip4 = ipaddress.ip_interface(peer_ip4) if peer_ip4 else None
+        peer_ip6 = ipaddress.ip_interface(peer_ip6) if peer_ip6 else None
+
+        # updates only adjust the prefix length if the port was passed
+
+        if row.session and not row.data.get("port"):
+            return peer_ip4, peer_ip6
+
+        port = row.port
+
+        if port and peer_ip4 and port.ip_address_4:
+            prefixlen = ipaddress.ip_interface(port.ip_address_4).network.prefixlen
+            peer_ip4 = ipaddress.ip_interface(f"{peer_ip4.ip}/{prefixlen}")
+
+        if port and peer_ip6 and port.ip_address_6:
+            prefixlen = ipaddress.ip_interface(port.ip_address_6).network.prefixlen
+            peer_ip6 = ipaddress.ip_interface(f"{peer_ip6.ip}/{prefixlen}")
+
+        return peer_ip4, peer_ip6
+
+    def write_peer_nets(self, now):
+        rows = self.valid_rows
+        peer_asns = {row.data["peer_asn"] for row in rows}
+
+        peers = {
+            peer.asn: peer for peer in models.Network.objects.filter(asn__in=peer_asns)
+        }
+
+        for asn in peer_asns - set(peers.keys()):
+            peers[asn] = models.Network.get_or_create(asn=asn, org=None)
+
+        peer_nets = {
+            peer_net.peer_id: peer_net
+            for peer_net in models.PeerNetwork.objects.filter(
+                net=self.net, peer__in=list(peers.values())
+            )
+        }
+
+        new_peer_nets = [
+            models.PeerNetwork(status="ok", net=self.net, peer=peer)
+            for peer in peers.values()
+            if peer.id not in peer_nets
+        ]
+        models.PeerNetwork.objects.bulk_create(new_peer_nets)
+
+        for peer_net in new_peer_nets:
+            peer_nets[peer_net.peer_id] = peer_net
+
+        old_md5 = {peer_net.id: peer_net.md5 for peer_net in peer_nets.values()}
+        changed = {}
+
+        for row in rows:
+            peer_net = row.peer_net = peer_nets[peers[row.data["peer_asn"]].id]
+
+            if "md5" in row.data:
+                peer_net.md5 = row.data["md5"]
+                changed[peer_net.id] = peer_net
+
+            for version in [4, 6]:
+                if f"peer_maxprefix{version}" in row.data:
+                    setattr(
+                        peer_net,
+                        f"info_prefixes{version}",
+                        row.data[f"peer_maxprefix{version}"],
+                    )
+                    changed[peer_net.id] = peer_net
+
+        for peer_net in changed.values():
+            peer_net.updated = now
+
+        models.PeerNetwork.objects.bulk_update(
+            list(changed.values()),
+            ["md5", "info_prefixes4", "info_prefixes6", "updated"],
+        )
+
+        return [
+            peer_net
+            for peer_net in changed.values()
+            if peer_net.md5 != old_md5[peer_net.id]
+        ]
+
+    def write_peer_port_infos(self, now):
+        rows = self.valid_rows
+        interfaces = {row.index: self.peer_interfaces(row) for row in rows}
+
+        # existing peer side port infos of the network by host ip,
+        # the oldest one wins if an ip is used more than once
+
+        by_ip = {}
+
+        for port_info in models.PortInfo.objects.filter(port=0, net=self.net).order_by(
+            "id"
+        ):
+            for addr in (port_info.ip_address_4, port_info.ip_address_6):
+                if addr:
+                    by_ip.setdefault(host(addr), port_info)
+
+        new = []
+        changed = {}
+
+        for row in rows:
+            peer_ip4, peer_ip6 = interfaces[row.index]
+
+            if row.session:
+                port_info = row.session.peer_port.port_info
+            else:
+                port_info = (peer_ip4 and by_ip.get(peer_ip4.ip)) or (
+                    peer_ip6 and by_ip.get(peer_ip6.ip)
+                )
+
+            if not port_info:
+                port_info = models.PortInfo(
+                    port=0, net=self.net, ip_address_4=peer_ip4, ip_address_6=peer_ip6
+                )
+                new.append(port_info)
+            else:
+                port_info.ip_address_4 = peer_ip4 or port_info.ip_address_4
+                port_info.ip_address_6 = peer_ip6 or port_info.ip_address_6
+                port_info.updated = now
+                if port_info.id:
+                    changed[port_info.id] = port_info
+
+            # rows later in the request reuse port infos created for
+            # earlier rows
+
+            for iface in (peer_ip4, peer_ip6):
+                if iface:
+                    by_ip[iface.ip] = port_info
+
+            row.peer_port_info = port_info
+
+        models.PortInfo.objects.bulk_create(new)
+        models.PortInfo.objects.bulk_update(
+            list(changed.values()), ["ip_address_4", "ip_address_6", "updated"]
+        )
+
+    def sync_search_index(self):
+        """
+        Fills the search columns of the peers and peer port infos from
+        the local replicas, they are written in bulk, which skips the
+        signals that do this
+        """
+
+        search.fill_network_names(
+            models.Network.objects.filter(
+                asn__in={row.data["peer_asn"] for row in self.valid_rows},
+                search_name="",
+            )
+        )
+        search.fill_port_infos([row.peer_port_info for row in self.valid_rows])
+
+    def write_port_infos(self):
+        """
+        Creates missing port infos for the sessions' (own side) ports
+        """
+
+        ports = {int(row.port.id): row.port for row in self.valid_rows if row.port}
+
+        existing = {}
+        for port_info in models.PortInfo.objects.filter(port__in=list(ports.keys())):
+            existing.setdefault(int(port_info.port), port_info)
+
+        new = {
+            port_id: models.PortInfo(port=port_id, net=self.net)
+            for port_id in ports.keys()
+            if port_id not in existing
+        }
+        models.PortInfo.objects.bulk_create(list(new.values()))
+
+        for port_id, port in ports.items():
+            port._port_info = existing.get(port_id) or new[port_id]
+
+    def write_peer_ports(self, now):
+        rows = self.valid_rows
+
+        peer_ports = {
+            (peer_port.port_info_id, peer_port.peer_net_id): peer_port
+            for peer_port in models.PeerPort.objects.filter(
+                port_info__in=[row.peer_port_info for row in rows if not row.session],
+                peer_net__net=self.net,
+            ).order_by("-id")
+        }
+
+        new = []
+        changed = {}
+
+        for row in rows:
+            if row.session:
+                peer_port = row.session.peer_port
+                peer_port.peer_net = row.peer_net
+                peer_port.port_info = row.peer_port_info
+            else:
+                key = (row.peer_port_info.id, row.peer_net.id)
+                peer_port = peer_ports.get(key)
+                if not peer_port:
+                    peer_port = peer_ports[key] = models.PeerPort(
+                        port_info=row.peer_port_info, peer_net=row.peer_net
+                    )
+                    new.append(peer_port)
+
+            if "peer_interface" in row.data:
+                peer_port.interface_name = row.data["peer_interface"]
+
+            if peer_port.id:
+                peer_port.updated = now
+                changed[peer_port.id] = peer_port
+
+            row.peer_port = peer_port
+
+        models.PeerPort.objects.bulk_create(new)
+        models.PeerPort.objects.bulk_update(
+            list(changed.values()),
+            ["peer_net", "port_info", "interface_name", "updated"],
+        )
+
+    def default_peer_session_type(self, row):
+        port = row.port
+
+        if row.peer_net.peer.asn == self.net.asn:
+            return "core"
+        elif port and port.is_ixi:
+            return "ixp"
+        elif (
+            port
+            and port.virtual_port_description
+            and PNI_REGEX.search(port.virtual_port_description)
+        ):
+            return "pni"
+        return "transit"
+
+    def write_sessions(self, now):
+        new = []
+        changed = []
+
+        for row in self.valid_rows:
+            data = row.data
+            session = row.session
+
+            if not session:
+                session = row.session = models.PeerSession(
+                    port=row.port.id if row.port else None,
+                    device=data.get("device"),
+                    peer_port=row.peer_port,
+                    policy4_id=data.get("policy4") or None,
+                    policy6_id=data.get("policy6") or None,
+                    status=data.get("status") or "ok",
+                    peer_session_type=data.get("peer_session_type")
+                    or self.default_peer_session_type(row),
+                    meta4=data.get("meta4") or None,
+                    meta6=data.get("meta6") or None,
+                    created_by=self.user,
+                )
+                row.created = True
+                new.append(session)
+            else:
+                if "policy4" in data:
+                    session.policy4_id = data["policy4"]
+
+                if "policy6" in data:
+                    session.policy6_id = data["policy6"]
+
+                if "peer_session_type" in data:
+                    session.peer_session_type = data["peer_session_type"]
+
+                if "meta4" in data:
+                    session.meta4 = data.get("meta4") or None
+
+                if "meta6" in data:
+                    session.meta6 = data.get("meta6") or None
+
+                session.peer_port = row.peer_port
+                session.status = "ok"
+                session.updated = now
+                changed.append(session)
+
+            # bulk operations skip the pre_save signal that syncs the
+            # device from the port
+
+            if row.port and row.port.device_id:
+                session.device = row.port.device_id
+
+        models.PeerSession.objects.bulk_create(new)
+        models.PeerSession.objects.bulk_update(
+            changed,
+            [
+                "port",
+                "device",
+                "peer_port",
+                "policy4",
+                "policy6",
+                "status",
+                "peer_session_type",
+                "meta4",
+                "meta6",
+                "updated",
+            ],
+        )
+
+    def validate_rows(self):
+        for row in self.rows:
+            if not isinstance(row.payload, dict):
+                row.errors = {"non_field_errors": ["Expected a peer session object"]}
+                continue
+
+            try:
+                row.payload = self.normalize(row.payload)
+                row.data = self.validate(row)
+            except serializers.ValidationError as exc:
+                row.errors = exc.detail
+
+        self.resolve_sessions()
+
+        # sessions that are updated are validated again with the
+        # instance, like the single session endpoint does
+
+        for row in self.valid_rows:
+            if not row.session:
+                continue
+            try:
+                row.data = self.validate(row, instance=row.session)
+            except serializers.ValidationError as exc:
+                row.errors = exc.detail
+
+        self.resolve_ports()
+
+    def run(self):
+        """
+        Validates and writes all rows
+
+        Returns:
+            - list<dict>: result for each row, in order
+                {"index", "status": "created" | "updated", "id"} or
+                {"index", "status": "error", "errors"}
+        """
+
+        self.validate_rows()
+
+        if self.valid_rows:
+            now = timezone.now()
+
+            with transaction.atomic(), reversion.create_revision():
+                if self.user:
+                    reversion.set_user(self.user)
+
+                md5_changed = self.write_peer_nets(now)
+                self.write_peer_port_infos(now)
+                self.write_port_infos()
+                self.sync_search_index()
+                self.write_peer_ports(now)
+                self.write_sessions(now)
+
+                # rows are written in bulk, which skips the signals
+                # that bump the data version and publish session events
+
+                models.NetworkDataVersion.bump([self.net.id])
+
+                for row in self.valid_rows:
+                    reversion.add_to_revision(row.session)
+                    events.publish(
+                        self.net.id,
+                        "peer_session",
+                        "created" if row.created else "updated",
+                        row.session.id,
+                        events.peer_session_event(row.session),
+                    )
+
+            for peer_net in md5_changed:
+                peer_net.sync_route_server_md5()
+
+        return [row.result for row in self.rows]
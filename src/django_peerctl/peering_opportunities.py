@@ -0,0 +1,140 @@
+"""
+Peering opportunity report
+
+Lists all networks that share at least one exchange with a network
+and have no active peer session with it yet, ranked by the number of
+mutual exchanges.
+
+The report is computed in a single pass:
+
+- our exchange memberships are loaded once
+- all members at exchanges mutual to us are loaded in one sot request
+- networks we already have active sessions with are removed by set
+  operations on asns
+- pdbctl network records are read from the local replica
+  (`PeeringDBNetwork`)
+
+Reports are cached for `PEERING_OPPORTUNITIES_CACHE_TTL` seconds,
+keyed by a fingerprint of our memberships and peer sessions, so a
+changed membership or a new session results in a new report.
+"""
+
+import hashlib
+
+import fullctl.service_bridge.sot as sot
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from django_peerctl.models import PeeringDBNetwork, PeerSession
+
+__all__ = [
+    "cache_key",
+    "compute",
+    "get_cached",
+    "update",
+]
+
+KEY_PREFIX = "peerctl:peering_opportunities"
+
+
+def fingerprint(net):
+    """
+    Returns a digest of the network's exchange memberships and peer
+    sessions, it changes whenever the report would change on our side
+    """
+
+    memberships = sorted(f"{member.source}:{member.id}" for member in net.memberships)
+
+    sessions = PeerSession.objects.filter(peer_port__peer_net__net=net).aggregate(
+        count=Count("id"), updated=Max("updated")
+    )
+
+    params = f"{memberships}:{sessions['count']}:{sessions['updated']}"
+    return hashlib.md5(params.encode("utf-8")).hexdigest()
+
+
+def cache_key(net):
+    return f"{KEY_PREFIX}:{net.asn}:{fingerprint(net)}"
+
+
+def compute(net):
+    """
+    Computes the peering opportunity report for a network
+
+    Returns:
+        - list<dict>: one entry per potential peer, ordered by
+          mutual exchange count (descending) and asn
+    """
+
+    exchanges = {
+        f"{member.source}:{member.ix_id}": getattr(member, "ix_name", None)
+        for member in net.memberships
+    }
+
+    existing = set(
+        PeerSession.objects.filter(
+            peer_port__peer_net__net=net, status="ok"
+        ).values_list("peer_port__peer_net__peer__asn", flat=True)
+    )
+    existing.add(net.asn)
+
+    candidates = {}
+
+    for member in sot.InternetExchangeMember().objects(mutual=net.asn):
+        ix_id = f"{member.source}:{member.ix_id}"
+
+        if ix_id not in exchanges or member.asn in existing:
+            continue
+
+        candidates.setdefault(member.asn, set()).add(ix_id)
+
+    networks = PeeringDBNetwork.refs(candidates.keys())
+
+    report = []
+
+    for asn, ix_ids in candidates.items():
+        other = networks.get(asn)
+        report.append(
+            {
+                "asn": asn,
+                "name": getattr(other, "name", None) or f"AS{asn}",
+                "mutual_exchanges": len(ix_ids),
+                "exchanges": sorted(ix_ids),
+                "policy_general": getattr(other, "policy_general", None),
+                "scope": getattr(other, "info_scope", None),
+                "traffic": getattr(other, "info_traffic", None),
+                "type": getattr(other, "info_type", None),
+            }
+        )
+
+    report.sort(key=lambda row: (-row["mutual_exchanges"], row["asn"]))
+
+    return report
+
+
+def update(net):
+    """
+    Computes the report for a network and stores it in the cache
+
+    Returns the cached report
+    """
+
+    key = cache_key(net)
+    result = {
+        "asn": net.asn,
+        "created": timezone.now().isoformat(),
+        "results": compute(net),
+    }
+    cache.set(key, result, settings.PEERING_OPPORTUNITIES_CACHE_TTL)
+    return result
+
+
+def get_cached(net):
+    """
+    Returns the cached report for a network or None if there is no
+    report for its current memberships and sessions
+    """
+
+    return cache.get(cache_key(net))
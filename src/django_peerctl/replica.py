@@ -0,0 +1,324 @@
+"""
+Local replicas of pdbctl and ixctl data
+
+`PeeringDBNetwork` mirrors the pdbctl network fields peerctl uses
+(see `PDB_NETWORK_FIELDS`). `Network.ref` and
+`PeerSession.load_references` read from it and only ask pdbctl for
+networks missing from it.
+
+`ExchangeMember` mirrors exchange members (pdbctl netixlans and
+ixctl members). Memberships, mutual locations and port references
+are read from it and only asns that have not been synced yet are
+requested from the bridge.
+
+`sync()` keeps the replicas up to date:
+
+- networks peerctl knows about that are not replicated yet are
+  requested in full
+- replicated networks are refreshed incrementally, only networks
+  updated in peeringdb since the most recent `pdb_updated` timestamp
+  in the replica are requested (pdbctl `since` filter)
+- exchange members of all networks peerctl knows about are requested
+  and compared to the replica, only the difference is written and
+  `exchange_members_changed` is sent with one event per change,
+  members are only removed after a complete fetch (see
+  `update_members`)
+
+It runs from the `task_sync_replica` task and the
+`peerctl_sync_replica` command.
+"""
+
+import fullctl.service_bridge.pdbctl as pdbctl
+import fullctl.service_bridge.sot as sot
+from django.db import transaction
+from django.db.models import Max
+from django.dispatch import Signal
+from django.utils import timezone
+from fullctl.service_bridge.client import ServiceBridgeError
+
+from django_peerctl.models import (
+    IX_MEMBER_FIELDS,
+    ExchangeMember,
+    ExchangeMemberSync,
+    Network,
+    PeeringDBNetwork,
+)
+from django_peerctl.search import host
+
+__all__ = [
+    "exchange_members_changed",
+    "sync",
+    "sync_members",
+    "sync_networks",
+    "update_members",
+]
+
+# number of asns to request pdbctl networks and exchange members
+# for per request
+BATCH_SIZE = 250
+
+# sent with `events` (list<dict>) when the exchange member replica
+# changes, see `update_members` for the event format
+exchange_members_changed = Signal()
+
+
+def fetch_networks(asns, **filters):
+    """
+    Requests pdbctl networks for the specified asns in batches of
+    `BATCH_SIZE`, bypassing the bridge cache
+
+    Returns:
+        - list<pdbctl.NetworkObject>
+    """
+
+    asns = sorted(asns)
+    refs = []
+
+    for i in range(0, len(asns), BATCH_SIZE):
+        refs.extend(pdbctl.Network().objects(asns=asns[i : i + BATCH_SIZE], **filters))
+
+    return refs
+
+
+def sync_networks(full=False):
+    """
+    Syncs the pdbctl network replica
+
+    Keyword Arguments:
+        - full <bool=False>: refresh all replicated networks instead
+          of only the ones updated since the last sync
+
+    Returns:
+        - <int> number of created or updated networks
+    """
+
+    known = set(Network.objects.values_list("asn", flat=True))
+    replicated = set(PeeringDBNetwork.objects.values_list("asn", flat=True))
+
+    refs = fetch_networks(known - replicated)
+
+    since = None
+    if not full:
+        since = PeeringDBNetwork.objects.aggregate(since=Max("pdb_updated"))["since"]
+
+    if since:
+        refs.extend(fetch_networks(replicated, since=int(since.timestamp())))
+    else:
+        refs.extend(fetch_networks(replicated))
+
+    return len(PeeringDBNetwork.upsert(refs))
+
+
+def fetch_members(asns):
+    """
+    Requests the exchange members of the specified asns from ixctl
+    and pdbctl in batches of `BATCH_SIZE`, bypassing the bridge cache
+
+    Sources are requested the way `sot.InternetExchangeMember` does,
+    except that a source answering with a 404 makes the fetch
+    incomplete instead of being skipped silently
+
+    Returns:
+        - tuple(list<DataObject>, <bool> complete)
+    """
+
+    asns = sorted(asns)
+    source_of_truth = sot.InternetExchangeMember()
+    members = []
+    complete = True
+
+    for i in range(0, len(asns), BATCH_SIZE):
+        for source, params in source_of_truth.sources:
+            client = source()
+
+            # source host not specified, source is not used
+
+            if not client.host:
+                continue
+
+            try:
+                members.extend(
+                    client.objects(asns=asns[i : i + BATCH_SIZE], join="ix", **params)
+                )
+            except ServiceBridgeError as exc:
+                if exc.status != 404:
+                    raise
+                complete = False
+
+    return source_of_truth.filter_source_of_truth(members), complete
+
+
+def member_values(row):
+    return tuple(
+        host(getattr(row, field)) if field.startswith("ipaddr") else getattr(row, field)
+        for field in IX_MEMBER_FIELDS
+    )
+
+
+def member_event(type, row, previous=None):
+    return {
+        "type": type,
+        "asn": row.asn,
+        "ix_id": row.ix_ref_id,
+        "ref_id": row.ref_id,
+        "ipaddr4": host(row.ipaddr4),
+        "ipaddr6": host(row.ipaddr6),
+        "previous_ref_id": previous.ref_id if previous else None,
+        "previous_ipaddr4": host(previous.ipaddr4) if previous else None,
+        "previous_ipaddr6": host(previous.ipaddr6) if previous else None,
+    }
+
+
+def update_members(asns, members, complete=True):
+    """
+    Writes the exchange members of the specified asns to the replica
+
+    Only the difference to the replica is written and one event per
+    change is sent through `exchange_members_changed`:
+
+    - "created": new member
+    - "deleted": member no longer exists
+    - "ip_changed": member ip addresses changed
+    - "moved": member was removed and a new member of the same
+      network was added at the same exchange (e.g., a netixlan that
+      was recreated with a new ip address), `previous_ref_id` is the
+      removed member
+
+    Members are only removed after a complete fetch, and never for
+    an asn that has replicated members but none in `members` (an
+    empty answer is more likely a failed request than a network
+    leaving all of its exchanges). Only complete fetches mark the
+    asns as synced (`ExchangeMemberSync`).
+
+    Arguments:
+        - asns <iterable<int>>: asns the members were requested for,
+          replicated members of these asns missing from `members`
+          are removed
+        - members <iterable<DataObject>>
+
+    Keyword Arguments:
+        - complete <bool=True>: whether `members` holds all members
+          of the asns, see `fetch_members`
+
+    Returns:
+        - list<dict>: events
+    """
+
+    asns = {int(asn) for asn in asns}
+    now = timezone.now()
+
+    current = {row.ref_id: row for row in ExchangeMember.objects.filter(asn__in=asns)}
+    incoming = {}
+
+    for member in members:
+        if member.asn in asns:
+            row = ExchangeMember.from_ref(member)
+            incoming[row.ref_id] = row
+
+    created = []
+    changed = []
+    events = []
+
+    for ref_id, row in incoming.items():
+        previous = current.get(ref_id)
+
+        if not previous:
+            created.append(row)
+            continue
+
+        if member_values(row) == member_values(previous):
+            continue
+
+        row.id = previous.id
+        row.updated = now
+        changed.append(row)
+
+        if (host(row.ipaddr4), host(row.ipaddr6)) != (
+            host(previous.ipaddr4),
+            host(previous.ipaddr6),
+        ):
+            events.append(member_event("ip_changed", row, previous))
+
+    if complete:
+        fetched_asns = {row.asn for row in incoming.values()}
+        removed = [
+            row
+            for ref_id, row in current.items()
+            if ref_id not in incoming and row.asn in fetched_asns
+        ]
+    else:
+        removed = []
+
+    added = list(created)
+
+    for previous in removed:
+        row = next(
+            (
+                row
+                for row in added
+                if (row.asn, row.ix_ref_id) == (previous.asn, previous.ix_ref_id)
+            ),
+            None,
+        )
+
+        if row:
+            added.remove(row)
+            events.append(member_event("moved", row, previous))
+        else:
+            events.append(member_event("deleted", previous))
+
+    events.extend(member_event("created", row) for row in added)
+
+    with transaction.atomic():
+        ExchangeMember.objects.filter(id__in=[row.id for row in removed]).delete()
+
+        # asns may be written through by concurrent requests
+
+        ExchangeMember.objects.bulk_create(created, ignore_conflicts=True)
+        ExchangeMember.objects.bulk_update(
+            changed, IX_MEMBER_FIELDS + ["updated"], batch_size=BATCH_SIZE
+        )
+
+        if complete:
+            ExchangeMemberSync.mark(asns, now)
+
+    if events:
+        exchange_members_changed.send(sender=ExchangeMember, events=events)
+
+    return events
+
+
+def sync_members(asns=None):
+    """
+    Syncs the exchange member replica
+
+    Keyword Arguments:
+        - asns <iterable<int>>: asns to sync, all networks if not specified
+
+    Returns:
+        - list<dict>: events, see `update_members`
+    """
+
+    if asns is None:
+        asns = Network.objects.values_list("asn", flat=True)
+
+    asns = sorted({int(asn) for asn in asns})
+    events = []
+
+    for i in range(0, len(asns), BATCH_SIZE):
+        batch = asns[i : i + BATCH_SIZE]
+        members, complete = fetch_members(batch)
+        events.extend(update_members(batch, members, complete=complete))
+
+    return events
+
+
+def sync(full=False):
+    """
+    Syncs all replicated pdbctl and ixctl data
+    """
+
+    return {
+        "networks": sync_networks(full=full),
+        "members": len(sync_members()),
+    }
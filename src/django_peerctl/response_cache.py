@@ -0,0 +1,142 @@
+"""
+Response cache and ETags for the polled network endpoints
+
+Responses are keyed by the network's data version
+(`NetworkDataVersion`), the endpoint and the request's path, query and
+organization. Any write to the network's sessions, peers, ports or
+policies bumps the version, so a request for unchanged data costs one
+version read and one cache read instead of rebuilding the response.
+
+Each cached response has an ETag, requests sending it back in
+`If-None-Match` get a 304 response.
+
+Port, device and peer details from the service bridge (devicectl,
+pdbctl, ixctl) are not versioned, entries expire after
+`RESPONSE_CACHE_TTL` seconds so these changes show up eventually.
+
+The ETag is a hash of the response data, so it is the same across
+workers and only changes when a rebuilt entry holds different data.
+
+Response headers in `CACHED_HEADERS` (e.g., the pagination `Link`
+header) are cached along with the data.
+"""
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+
+from django_peerctl.models import NetworkDataVersion
+
+__all__ = [
+    "CACHED_HEADERS",
+    "get",
+    "make_key",
+    "not_modified",
+    "store",
+]
+
+KEY_PREFIX = "peerctl:response_cache"
+
+# response headers that are cached with the data
+CACHED_HEADERS = ("Link",)
+
+
+def get_cache():
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+def get_ttl():
+    if not getattr(settings, "RESPONSE_CACHE_ENABLED", False):
+        return 0
+
+    return getattr(settings, "RESPONSE_CACHE_TTL", 0)
+
+
+def make_key(name, asn, request):
+    """
+    Returns the cache key for a request to a network endpoint
+
+    Reads the network's current data version, this needs to happen
+    before the response is built so data written while it is built
+    is never cached under the old version.
+
+    Arguments:
+        - name <str>: endpoint name
+        - asn <int>
+        - request <Request>
+    """
+
+    org = getattr(request, "org", None)
+
+    params = json.dumps(
+        [
+            request.path,
+            sorted(request.query_params.lists()),
+            getattr(org, "id", None),
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    digest = hashlib.md5(params.encode("utf-8")).hexdigest()
+
+    return f"{KEY_PREFIX}:{name}:{asn}:{NetworkDataVersion.get(asn)}:{digest}"
+
+
+def get(key):
+    """
+    Returns the cached entry for a key or None
+
+    Returns:
+        - dict: {"etag": <str>, "data": <list|dict>, "headers": <dict>}
+    """
+
+    if not get_ttl():
+        return None
+
+    return get_cache().get(key)
+
+
+def store(key, data, headers=None):
+    """
+    Caches response data and headers for a key, the ETag is the md5
+    hash of the json encoded data and headers
+
+    Keyword Arguments:
+        - headers <dict>: response headers, only `CACHED_HEADERS` are kept
+
+    Returns:
+        - dict: {"etag": <str>, "data": <list|dict>, "headers": <dict>}
+    """
+
+    headers = {
+        name: value for name, value in (headers or {}).items() if name in CACHED_HEADERS
+    }
+
+    content = json.dumps([data, headers], sort_keys=True, cls=DjangoJSONEncoder)
+    etag = hashlib.md5(content.encode("utf-8")).hexdigest()
+    entry = {"etag": f'"{etag}"', "data": data, "headers": headers}
+
+    ttl = get_ttl()
+
+    if ttl:
+        get_cache().set(key, entry, ttl)
+
+    return entry
+
+
+def not_modified(request, etag):
+    """
+    Returns whether the request's `If-None-Match` header matches the etag
+    """
+
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+
+    if not header:
+        return False
+
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+    return "*" in tags or etag in tags
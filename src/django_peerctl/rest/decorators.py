@@ -1,7 +1,11 @@
+import functools
+
 from fullctl.django.rest.decorators import base
 from fullctl.django.rest.decorators import grainy_endpoint as _grainy_endpoint
+from rest_framework.response import Response
 
 import django_peerctl.models as models
+from django_peerctl import response_cache
 
 
 def load_org_instance_from_asn(self, request, data):
@@ -41,3 +45,69 @@ class grainy_endpoint(_grainy_endpoint):
         )
         if "namespace" not in kwargs:
             self.namespace += ["peerctl"]
+
+
+class cached_response:
+    """
+    Serves a network list endpoint from the response cache and sets
+    the response ETag, see `django_peerctl.response_cache`
+
+    Response headers in `response_cache.CACHED_HEADERS` (e.g., the
+    session summary pagination `Link` header) are cached and sent
+    with the data
+
+    Needs to be applied below `grainy_endpoint` so permissions are
+    checked first
+
+    Arguments:
+        - name <str>: endpoint name, part of the cache key
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, fn):
+        name = self.name
+
+        @functools.wraps(fn)
+        def wrapper(viewset, request, *args, **kwargs):
+            key = response_cache.make_key(name, kwargs.get("asn"), request)
+            entry = response_cache.get(key)
+
+            if not entry:
+                response = fn(viewset, request, *args, **kwargs)
+
+                if response.status_code != 200:
+                    return response
+
+                entry = response_cache.store(
+                    key,
+                    plain(response.data),
+                    headers={
+                        name: response[name]
+                        for name in response_cache.CACHED_HEADERS
+                        if response.has_header(name)
+                    },
+                )
+
+            headers = dict(entry.get("headers") or {}, ETag=entry["etag"])
+
+            if response_cache.not_modified(request, entry["etag"]):
+                return Response(status=304, headers=headers)
+
+            return Response(entry["data"], headers=headers)
+
+        return wrapper
+
+
+def plain(data):
+    """
+    Returns serializer output as plain lists / dicts so it can be
+    cached (`ReturnList` / `ReturnDict` hold a serializer reference)
+    """
+
+    if isinstance(data, list):
+        return list(data)
+    if isinstance(data, dict):
+        return dict(data)
+    return data
@@ -0,0 +1,103 @@
+"""
+Sparse fieldsets for list endpoints
+
+Clients can limit the fields returned for each row:
+
+- `fields=a,b,c`: only return these fields
+- `omit=a,b`: return all fields except these
+
+Serializers using `SparseFieldsMixin` drop the fields that were not
+requested before serializing, so their getters never run. Views use
+`Fieldset.wants` to skip the reference loading that is only needed
+for fields that were not requested.
+"""
+
+__all__ = [
+    "Fieldset",
+    "SparseFieldsMixin",
+]
+
+
+def split(value):
+    if not value:
+        return None
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+class Fieldset:
+    """
+    Fields requested through the `fields` and `omit` query parameters
+    """
+
+    fields_query_param = "fields"
+    omit_query_param = "omit"
+
+    def __init__(self, fields=None, omit=None):
+        self.fields = set(fields) if fields is not None else None
+        self.omit = set(omit or [])
+
+    @classmethod
+    def from_request(cls, request):
+        return cls(
+            fields=split(request.query_params.get(cls.fields_query_param)),
+            omit=split(request.query_params.get(cls.omit_query_param)),
+        )
+
+    @property
+    def is_sparse(self):
+        return self.fields is not None or bool(self.omit)
+
+    def wants(self, *names):
+        """
+        Returns whether any of the specified fields is requested
+        """
+
+        for name in names:
+            if name in self.omit:
+                continue
+            if self.fields is None or name in self.fields:
+                return True
+        return False
+
+    def require(self, *names):
+        """
+        Returns a fieldset that also includes the specified fields
+
+        Use for fields a view needs itself (e.g., to order rows),
+        then strip them again with `apply`
+        """
+
+        fields = self.fields | set(names) if self.fields is not None else None
+        return Fieldset(fields=fields, omit=self.omit - set(names))
+
+    def apply(self, rows):
+        """
+        Removes the fields that were not requested from serialized rows
+        """
+
+        if not self.is_sparse:
+            return rows
+
+        return [
+            {name: value for name, value in row.items() if self.wants(name)}
+            for row in rows
+        ]
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin that drops the fields not requested by the
+    `fieldset` (`Fieldset`) in the serializer context
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        fieldset = self.context.get("fieldset")
+
+        if not fieldset or not fieldset.is_sparse:
+            return
+
+        for name in list(self.fields.keys()):
+            if not fieldset.wants(name):
+                self.fields.pop(name)
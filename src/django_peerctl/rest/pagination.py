@@ -0,0 +1,103 @@
+from django.conf import settings
+from django.db.models import F
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+__all__ = [
+    "SessionCursorPagination",
+]
+
+
+class SessionCursorPagination(CursorPagination):
+    """
+    Cursor pagination for peer session listings
+
+    Pagination is opt-in, it is only applied if the request
+    specifies a `cursor` or `page_size` parameter, so existing
+    clients keep receiving the full list.
+
+    The response body is the list of rows for the page, cursors
+    for the next and previous page are returned in a `Link` header
+    (rel="next" / rel="prev") so the rendered payload keeps
+    the same shape.
+
+    Ordering is specified with the `ordering` parameter (prefix
+    with "-" for descending order), see `ORDERING_FIELDS`
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    # ordering parameter -> queryset field, related fields are annotated
+    # since the cursor position is read from an attribute of the row
+
+    ORDERING_FIELDS = {
+        "peer_asn": "order_peer_asn",
+        "id": "id",
+        "status": "status",
+        "peer_session_type": "peer_session_type",
+        "created": "created",
+        "updated": "updated",
+    }
+
+    DEFAULT_ORDERING = ("order_peer_asn", "id")
+
+    @property
+    def page_size(self):
+        return settings.SESSIONS_SUMMARY_PAGE_SIZE
+
+    @property
+    def max_page_size(self):
+        return settings.SESSIONS_SUMMARY_PAGE_SIZE_MAX
+
+    def is_requested(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        )
+
+    def prepare(self, queryset):
+        """
+        Annotates the fields the queryset can be ordered by
+        """
+
+        return queryset.annotate(order_peer_asn=F("peer_port__peer_net__peer__asn"))
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get("ordering")
+
+        if not ordering:
+            return self.DEFAULT_ORDERING
+
+        descending = ordering.startswith("-")
+        field = self.ORDERING_FIELDS.get(ordering.lstrip("-"))
+
+        if not field:
+            return self.DEFAULT_ORDERING
+
+        # id breaks ties so rows with the same value keep a stable order
+
+        if descending:
+            return (f"-{field}", "-id") if field != "id" else ("-id",)
+        return (field, "id") if field != "id" else ("id",)
+
+    def order(self, request, queryset):
+        """
+        Orders an unpaginated queryset the same way a page would be
+        """
+
+        return queryset.order_by(*self.get_ordering(request, queryset, None))
+
+    def get_paginated_response(self, data):
+        links = []
+
+        for rel, url in (
+            ("next", self.get_next_link()),
+            ("prev", self.get_previous_link()),
+        ):
+            if url:
+                links.append(f'<{url}>; rel="{rel}"')
+
+        headers = {"Link": ", ".join(links)} if links else None
+
+        return Response(data, headers=headers)
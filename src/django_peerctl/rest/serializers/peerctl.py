@@ -3,7 +3,6 @@ import re
 
 import fullctl.service_bridge.ixctl as ixctl
 import fullctl.service_bridge.pdbctl as pdbctl
-import fullctl.service_bridge.sot as sot
 from django.db.models import Count, Q
 from django.utils.translation import ugettext_lazy as _
 from fullctl.django.models.concrete.tasks import TaskLimitError
@@ -11,11 +10,14 @@ from fullctl.django.rest.decorators import serializer_registry
 from fullctl.django.rest.serializers import ModelSerializer
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError  # noqa
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
 
 import django_peerctl.autopeer.tasks as autopeer_tasks
 import django_peerctl.models as models
 from django_peerctl.autopeer import autopeer_url
 from django_peerctl.helpers import get_best_policy
+from django_peerctl.rest.fieldsets import SparseFieldsMixin
 
 Serializers, register = serializer_registry()
 
@@ -102,32 +104,25 @@ class Policy(ModelSerializer):
             "count_peers",
         ]
 
-    def peer_sessions(self, obj):
+    def peer_counts(self, obj):
         """
-        Returns a queryset of all peer sessions that are using this policy
+        Returns the number of peers using each policy of the policy's
+        network
 
-        Will cache and return the same queryset on subsequent calls
+        Will cache and return the same counts on subsequent calls so
+        serializing a list of policies only counts once
         """
 
-        if hasattr(self, "_peer_sessions"):
-            return self._peer_sessions
-        self._peer_sessions = (
-            obj.net.peer_session_at_ix(ix_id=None)
-            .select_related(
-                "policy4",
-                "policy6",
-                "peer_port",
-                "peer_port__peer_net",
-                "peer_port__peer_net__policy4",
-                "peer_port__peer_net__policy6",
-            )
-            .filter(status="ok")
-        )
-        models.Port.load_references(self._peer_sessions, load_policies=True)
-        return self._peer_sessions
+        if not hasattr(self, "_peer_counts"):
+            self._peer_counts = {}
+
+        if obj.net_id not in self._peer_counts:
+            self._peer_counts[obj.net_id] = models.Policy.count_peers_for_net(obj.net)
+
+        return self._peer_counts[obj.net_id]
 
     def get_count_peers(self, obj):
-        return obj.count_peers(peer_sessions=self.peer_sessions(obj))
+        return self.peer_counts(obj).get(obj.id, 0)
 
 
 @register
@@ -164,7 +159,7 @@ class AvailablePort(serializers.Serializer):
 
 
 @register
-class Port(serializers.Serializer):
+class Port(SparseFieldsMixin, serializers.Serializer):
     ref_tag = "port"
 
     id = serializers.IntegerField(source="pk")
@@ -451,7 +446,7 @@ class PortUpdate(serializers.Serializer):
 
 
 @register
-class Peer(serializers.Serializer):
+class Peer(SparseFieldsMixin, serializers.Serializer):
     scope = serializers.SerializerMethodField()
     type = serializers.SerializerMethodField()
     policy_ratio = serializers.SerializerMethodField()
@@ -570,12 +565,19 @@ class Peer(serializers.Serializer):
             [self.instance] if not isinstance(self.instance, list) else self.instance
         )
 
-        for member in sot.InternetExchangeMember().objects(
-            mutual=net.asn, asns=[peer.asn for peer in peers]
-        ):
-            location_id = f"{member.source}:{member.ix_id}"
-            mutual_locations.setdefault(member.asn, set())
-            mutual_locations[member.asn].add(location_id)
+        members = models.ExchangeMember.refs([net.asn] + [peer.asn for peer in peers])
+
+        our_locations = {
+            f"{member.source}:{member.ix_id}" for member in members.pop(net.asn, [])
+        }
+
+        for asn, peer_members in members.items():
+            for member in peer_members:
+                location_id = f"{member.source}:{member.ix_id}"
+                if location_id not in our_locations:
+                    continue
+                mutual_locations.setdefault(member.asn, set())
+                mutual_locations[member.asn].add(location_id)
 
         self._mutual_locations = mutual_locations
 
@@ -595,6 +597,45 @@ class Peer(serializers.Serializer):
 
         return self._peer_sessions
 
+    @property
+    def members_by_asn(self):
+        """
+        Members to list ip addresses for, grouped by asn
+
+        When serializing a list of members they are grouped once,
+        for a single member its member rows at the exchange are
+        requested
+        """
+
+        if hasattr(self, "_members_by_asn"):
+            return self._members_by_asn
+
+        if not isinstance(self.instance, list):
+            members = models.PortInfo.ref_bridge(self.instance.source).objects(
+                ix=self.instance.ix_id, asn=self.instance.asn
+            )
+        else:
+            members = self.instance
+
+        self._members_by_asn = {}
+
+        for member in members:
+            self._members_by_asn.setdefault(member.asn, []).append(member)
+
+        return self._members_by_asn
+
+    @property
+    def policy_resolver(self):
+        """
+        Resolves policies for all peer sessions at the port at once
+        """
+
+        if not hasattr(self, "_policy_resolver"):
+            self._policy_resolver = models.PolicyResolver(
+                list(set(self.port.peer_session_ips.values()))
+            )
+        return self._policy_resolver
+
     @property
     def peer_requests(self):
         """
@@ -664,16 +705,7 @@ class Peer(serializers.Serializer):
     def get_ipaddr(self, obj):
         result = []
 
-        if not isinstance(self.instance, list):
-            qset = models.PortInfo.ref_bridge(obj.source).objects(
-                ix=obj.ix_id, asn=obj.asn
-            )
-        else:
-            qset = self.instance
-
-        for member in qset:
-            if member.asn != obj.asn:
-                continue
+        for member in self.members_by_asn.get(obj.asn, []):
             if self.context.get("ipaddr", "all") != "all":
                 if member.id != obj.id:
                     continue
@@ -697,7 +729,9 @@ class Peer(serializers.Serializer):
     def get_policy(self, obj, version):
         peer_session = getattr(obj, "peer_session", None)
         if peer_session:
-            policy = get_best_policy(obj.peer_session, version, raise_error=False)
+            policy = self.policy_resolver.get_best_policy(
+                peer_session, version, raise_error=False
+            )
             if policy:
                 return {
                     "id": policy.id,
@@ -982,11 +1016,47 @@ class UpdatePeerSession(serializers.Serializer):
             raise serializers.ValidationError("Cannot be negative")
         return value
 
+    def get_port(self, net, **filters):
+        """
+        Returns the first devicectl port matching the filters
+
+        Uses the `ports` lookup (`peer_session_bulk.PortLookup`) from the
+        serializer context if it is set
+        """
+        if self.context.get("ports"):
+            return self.context["ports"].first(**filters)
+        return models.Port().first(org_slug=net.org.slug, **filters)
+
+    def policy_exists(self, net, policy_id):
+        if self.context.get("policy_ids") is not None:
+            return policy_id in self.context["policy_ids"]
+        return models.Policy.objects.filter(id=policy_id, net=net).exists()
+
+    def validate_peer_ip(self, value, version):
+        if not value:
+            return value
+
+        try:
+            interface = ipaddress.ip_interface(value)
+        except ValueError:
+            raise serializers.ValidationError(f"Invalid IPv{version} address")
+
+        if interface.version != version:
+            raise serializers.ValidationError(f"Invalid IPv{version} address")
+
+        return value
+
+    def validate_peer_ip4(self, value):
+        return self.validate_peer_ip(value, 4)
+
+    def validate_peer_ip6(self, value):
+        return self.validate_peer_ip(value, 6)
+
     def validate(self, data):
         port = data.get("port")
         ip = None
         asn = self.context.get("asn")
-        net = models.Network.objects.get(asn=asn)
+        net = self.context.get("net") or models.Network.objects.get(asn=asn)
 
         peer_ip4 = data.get("peer_ip4")
         peer_ip6 = data.get("peer_ip6")
@@ -1008,7 +1078,7 @@ class UpdatePeerSession(serializers.Serializer):
 
         if ip:
             # no port specified, find by ip
-            port = models.Port().first(org_slug=net.org.slug, ip=str(ip))
+            port = self.get_port(net, ip=str(ip))
             if not port:
                 # TODO: create dummy port?
                 raise serializers.ValidationError(f"Could not find port by IP: {ip}")
@@ -1019,7 +1089,11 @@ class UpdatePeerSession(serializers.Serializer):
             raise serializers.ValidationError("Must provide port or device")
 
         if not data.get("device"):
-            port = models.Port().first(id=data["port"], org_slug=net.org.slug)
+            port = self.get_port(net, id=data["port"])
+            if not port:
+                raise serializers.ValidationError(
+                    {"port": f"Could not find port: {data['port']}"}
+                )
             data["device"] = port.device_id
 
         # if updating session and port is not specified, use the port from the session
@@ -1030,25 +1104,21 @@ class UpdatePeerSession(serializers.Serializer):
             and self.instance.port
             and data.get("device")
         ):
-            if (
-                self.instance.port.object
-                and self.instance.port.object.device_id == int(data.get("device"))
-            ):
+            if self.context.get("ports"):
+                instance_port = self.context["ports"].first(id=int(self.instance.port))
+            else:
+                instance_port = self.instance.port.object
+
+            if instance_port and instance_port.device_id == int(data.get("device")):
                 data["port"] = int(self.instance.port)
 
         # validate policies exist
 
-        if data.get("policy4"):
-            try:
-                models.Policy.objects.get(id=data["policy4"], net=net)
-            except models.Policy.DoesNotExist:
-                raise serializers.ValidationError({"policy4": "Invalid policy4"})
+        if data.get("policy4") and not self.policy_exists(net, data["policy4"]):
+            raise serializers.ValidationError({"policy4": "Invalid policy4"})
 
-        if data.get("policy6"):
-            try:
-                models.Policy.objects.get(id=data["policy6"], net=net)
-            except models.Policy.DoesNotExist:
-                raise serializers.ValidationError({"policy6": "Invalid policy6"})
+        if data.get("policy6") and not self.policy_exists(net, data["policy6"]):
+            raise serializers.ValidationError({"policy6": "Invalid policy6"})
 
         return data
 
@@ -1379,7 +1449,7 @@ class UpdatePeerSessionMeta(ModelSerializer):
 
 
 @register
-class PeerSession(ModelSerializer):
+class PeerSession(SparseFieldsMixin, ModelSerializer):
     policy4_id = serializers.SerializerMethodField()
     policy4_name = serializers.SerializerMethodField()
     policy4_inherited = serializers.SerializerMethodField()
@@ -1440,6 +1510,83 @@ class PeerSession(ModelSerializer):
 
     ref_tag = "peer_session"
 
+    # policy field suffix -> `get_policy` key
+
+    POLICY_FIELDS = {
+        "id": "id",
+        "name": "name",
+        "inherited": "inherited",
+        "import": "import_policy",
+        "export": "export_policy",
+        "peer_group": "peer_group",
+        "afi": "afi",
+        "max_prefixes": "max_prefixes",
+        "enforce_first_asn": "enforce_first_asn",
+        "soft_reconfig": "soft_reconfig",
+        "allow_asn_in": "allow_asn_in",
+        "multipath": "multipath",
+        "import_policy_managed": "import_policy_managed",
+        "export_policy_managed": "export_policy_managed",
+        "peer_group_managed": "peer_group_managed",
+    }
+
+    # fields that need the session's port / devices
+
+    PORT_FIELDS = {
+        "port_interface",
+        "port_display_name",
+        "port_is_ix",
+        "device_name",
+        "device_id",
+        "facility_slug",
+    }
+
+    DEVICE_FIELDS = {"device_name", "device_id", "facility_slug"}
+
+    # field name -> value of the remaining method fields, called
+    # with the serializer, the session, its peer network, port and
+    # first device
+
+    ROW_VALUES = {
+        "peer_asn": lambda self, obj, peer_net, port, device: peer_net.peer.asn,
+        "peer_name": lambda self, obj, peer_net, port, device: peer_net.peer.name,
+        "peer_type": lambda self, obj, peer_net, port, device: self.get_peer_type(obj),
+        "peer_interface": lambda self, obj, peer_net, port, device: (
+            self.get_peer_interface(obj)
+        ),
+        "peer_maxprefix4": lambda self, obj, peer_net, port, device: (
+            peer_net.info_prefixes(4)
+        ),
+        "peer_maxprefix6": lambda self, obj, peer_net, port, device: (
+            peer_net.info_prefixes(6)
+        ),
+        "md5": lambda self, obj, peer_net, port, device: peer_net.md5,
+        "meta4": lambda self, obj, peer_net, port, device: obj.meta4,
+        "meta6": lambda self, obj, peer_net, port, device: obj.meta6,
+        "device_name": lambda self, obj, peer_net, port, device: (
+            device.display_name if device else None
+        ),
+        "device_id": lambda self, obj, peer_net, port, device: (
+            device.id if device else None
+        ),
+        "facility_slug": lambda self, obj, peer_net, port, device: (
+            device.facility_slug if port and device else None
+        ),
+        "port_interface": lambda self, obj, peer_net, port, device: (
+            port.virtual_port_name if port else None
+        ),
+        "port_is_ix": lambda self, obj, peer_net, port, device: (
+            self.resolve_port_is_ix(port)
+        ),
+        "port_display_name": lambda self, obj, peer_net, port, device: (
+            self.resolve_port_display_name(port)
+        ),
+    }
+
+    # fields `resolve_status` reads from the row
+
+    STATUS_FIELDS = {"policy4_id", "policy6_id", "peer_type", "peer_asn", "device_id"}
+
     class Meta:
         model = models.PeerSession
         fields = [
@@ -1500,18 +1647,144 @@ class PeerSession(ModelSerializer):
             "status",
         ]
 
-    def get_meta4(self, obj):
-        # TODO: fill in defaults?
-        return obj.meta4
+    def to_representation(self, instance):
+        """
+        Emits the method fields from the session's row (see
+        `session_row`) instead of calling each field's getter, the
+        remaining fields are serialized as usual
+        """
 
-    def get_meta6(self, obj):
-        # TODO: full in defaults?
-        return obj.meta6
+        row = self.session_row(instance)
+        data = {}
 
-    def get_status(self, obj):
+        for field in self._readable_fields:
+            if field.field_name in row:
+                data[field.field_name] = row[field.field_name]
+                continue
+
+            try:
+                attribute = field.get_attribute(instance)
+            except SkipField:
+                continue
+
+            # related fields using the pk only optimization resolve
+            # to a PKOnlyObject
+
+            if isinstance(attribute, PKOnlyObject):
+                check_for_none = attribute.pk
+            else:
+                check_for_none = attribute
+
+            if check_for_none is None:
+                data[field.field_name] = None
+            else:
+                data[field.field_name] = field.to_representation(attribute)
+
+        return data
+
+    def session_row(self, obj):
+        """
+        Computes the values of the method fields of a session in a
+        single pass
+
+        The policy dict of each ip version, the session's port and
+        devices, and the peer are resolved once and every field is
+        read from them
+
+        Only the serializer's fields are computed, see
+        `SparseFieldsMixin`
+
+        Returns:
+            - dict: field name -> value
+        """
+
+        fields, policy_fields, value_fields = self.row_fields()
+
+        row = {}
+
+        for version, names in policy_fields.items():
+            if not names:
+                continue
+
+            policy = self.get_policy(obj, version)
+            for name, key in names.items():
+                row[name] = policy.get(key)
+
+        peer_net = obj.peer_port.peer_net
+
+        if not fields.isdisjoint(self.PORT_FIELDS):
+            port = obj.port.object if obj.port else None
+        else:
+            port = None
+
+        if not fields.isdisjoint(self.DEVICE_FIELDS) and (port or obj.device):
+            devices = obj.devices
+        else:
+            devices = []
+
+        device = devices[0] if devices else None
+
+        for name in value_fields:
+            row[name] = self.ROW_VALUES[name](self, obj, peer_net, port, device)
+
+        if "status" in fields:
+            row["status"] = self.resolve_status(obj, row)
+
+        return row
+
+    def row_fields(self):
+        """
+        Returns the fields computed by `session_row`, the policy
+        fields of each ip version (field name -> `get_policy` key) and
+        the requested `ROW_VALUES` fields
+
+        Worked out once per serializer, since the fields do not change
+        between rows
+        """
+
+        if not hasattr(self, "_row_fields"):
+            fields = set(self.fields.keys())
+
+            if "status" in fields:
+                fields |= self.STATUS_FIELDS
+
+            policy_fields = {
+                version: {
+                    f"policy{version}_{field}": key
+                    for field, key in self.POLICY_FIELDS.items()
+                    if f"policy{version}_{field}" in fields
+                }
+                for version in (4, 6)
+            }
+
+            value_fields = [name for name in self.ROW_VALUES if name in fields]
+
+            self._row_fields = (fields, policy_fields, value_fields)
+
+        return self._row_fields
+
+    def resolve_port_is_ix(self, port):
+        if not port:
+            return False
+
+        ix_id = port.port_info_object.ref_ix_id
+        return ix_id is not None and ix_id != 0
+
+    def resolve_port_display_name(self, port):
+        if not port:
+            return "No port assigned"
+
+        return port.port_info_object.ix_name or port.virtual_port_name or ""
+
+    def resolve_status(self, obj, row):
         """
         returns peer-session, but will return `partial` if minimum amount
         of information is missing
+
+        Arguments:
+            - obj <PeerSession>
+            - row <dict>: needs to hold the `policy4_id`, `policy6_id`,
+              `peer_type`, `peer_asn` and `device_id` values
         """
 
         # if the session status is anything but `ok` we can just return
@@ -1522,12 +1795,12 @@ class PeerSession(ModelSerializer):
 
         # neither ipv4 nor ipv6 policy is set, partial config
 
-        if not self.get_policy4_id(obj) and not self.get_policy6_id(obj):
+        if not row["policy4_id"] and not row["policy6_id"]:
             return "partial"
 
         # no peer type is specified, partial config
 
-        if not self.get_peer_type(obj):
+        if not row["peer_type"]:
             return "partial"
 
         # neither peer ipv4 nor peer ipv6 address is set, partial config
@@ -1537,16 +1810,44 @@ class PeerSession(ModelSerializer):
 
         # peer asn not specified, partial config
 
-        if not self.get_peer_asn(obj):
+        if not row["peer_asn"]:
             return "partial"
 
         # device and port not specified, partial config
 
-        if not self.get_device_id(obj):
+        if not row["device_id"]:
             return "partial"
 
         return "ok"
 
+    def get_meta4(self, obj):
+        # TODO: fill in defaults?
+        return obj.meta4
+
+    def get_meta6(self, obj):
+        # TODO: full in defaults?
+        return obj.meta6
+
+    def get_status(self, obj):
+        """
+        returns peer-session, but will return `partial` if minimum amount
+        of information is missing
+        """
+
+        if obj.status != "ok":
+            return obj.status
+
+        return self.resolve_status(
+            obj,
+            {
+                "policy4_id": self.get_policy4_id(obj),
+                "policy6_id": self.get_policy6_id(obj),
+                "peer_type": self.get_peer_type(obj),
+                "peer_asn": self.get_peer_asn(obj),
+                "device_id": self.get_device_id(obj),
+            },
+        )
+
     def get_policy(self, obj, version):
         if obj and obj.status in ["ok"]:
             if hasattr(obj, f"_policy{version}"):
@@ -1742,11 +2043,7 @@ class PeerSession(ModelSerializer):
         return obj.devices[0].facility_slug
 
     def get_port_is_ix(self, obj):
-        if not obj.port or not obj.port.object:
-            return False
-
-        ix_id = obj.port.object.port_info_object.ref_ix_id
-        return ix_id is not None and ix_id != 0
+        return self.resolve_port_is_ix(obj.port.object if obj.port else None)
 
     def get_port_interface(self, obj):
         if obj.port and obj.port.object:
@@ -1754,15 +2051,7 @@ class PeerSession(ModelSerializer):
         return None
 
     def get_port_display_name(self, obj):
-        if not obj.port or not obj.port.object:
-            return "No port assigned"
-
-        if obj.port.object.port_info_object.ix_name:
-            return obj.port.object.port_info_object.ix_name
-        elif obj.port.object.virtual_port_name:
-            return obj.port.object.virtual_port_name
-
-        return ""
+        return self.resolve_port_display_name(obj.port.object if obj.port else None)
 
 
 @register
@@ -1873,6 +2162,77 @@ class NetworkSearch(serializers.Serializer):
         ]
 
 
+@register
+class PeeringOpportunity(serializers.Serializer):
+
+    """
+    Network that shares at least one exchange with us and has no
+    active peer session with us yet
+    """
+
+    asn = serializers.IntegerField()
+    name = serializers.CharField()
+    mutual_exchanges = serializers.IntegerField()
+    exchanges = serializers.ListField(child=serializers.CharField())
+    policy_general = serializers.CharField(allow_null=True)
+    scope = serializers.CharField(allow_null=True)
+    traffic = serializers.CharField(allow_null=True)
+    type = serializers.CharField(allow_null=True)
+
+    ref_tag = "peering_opportunities"
+
+    class Meta:
+        fields = [
+            "asn",
+            "name",
+            "mutual_exchanges",
+            "exchanges",
+            "policy_general",
+            "scope",
+            "traffic",
+            "type",
+        ]
+
+
+@register
+class Search(serializers.Serializer):
+
+    """
+    Search result, a peer, peer session or port
+    """
+
+    type = serializers.CharField()
+    id = serializers.IntegerField()
+    asn = serializers.IntegerField()
+    label = serializers.CharField()
+    score = serializers.FloatField()
+
+    ref_tag = "search"
+
+    class Meta:
+        fields = ["type", "id", "asn", "label", "score"]
+
+
+@register
+class Event(serializers.Serializer):
+
+    """
+    Change event of a network's peer session or peer request
+    """
+
+    id = serializers.IntegerField()
+    type = serializers.CharField()
+    action = serializers.CharField()
+    object_id = serializers.IntegerField()
+    data = serializers.JSONField()
+    created = serializers.DateTimeField()
+
+    ref_tag = "event"
+
+    class Meta:
+        fields = ["id", "type", "action", "object_id", "data", "created"]
+
+
 @register
 class PeeringDBRelationship(serializers.Serializer):
 
@@ -2069,6 +2429,16 @@ class AutopeerRequest(serializers.Serializer):
             asn = net.asn
             peer_asn = self.validated_data["asn"]
 
+            # the request task finishes once sessions have been requested,
+            # the request stays pending while its status is being polled
+
+            if models.PeerRequest.objects.filter(
+                net=net, peer_asn=peer_asn, type="autopeer", status="pending"
+            ).exists():
+                raise serializers.ValidationError(
+                    "You already have a pending autopeer request towards this ASN."
+                )
+
             peer_request = models.PeerRequest.objects.create(
                 net=net, peer_asn=peer_asn, type="autopeer"
             )
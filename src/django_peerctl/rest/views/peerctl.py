@@ -1,12 +1,15 @@
 import ipaddress
+import tempfile
 
 import fullctl.service_bridge.ixctl as ixctl
 import fullctl.service_bridge.pdbctl as pdbctl
 import fullctl.service_bridge.sot as sot
 from django.conf import settings
+from django.db.models import Q
 from django.db.models.functions import Lower
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from fullctl.django.auth import permissions
+from fullctl.django.models.concrete.tasks import TaskLimitError
 from fullctl.django.rest.core import BadRequest
 from fullctl.django.rest.decorators import load_object
 from fullctl.django.rest.mixins import CachedObjectMixin
@@ -15,14 +18,24 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 
 import django_peerctl.models as models
+from django_peerctl import (
+    device_config,
+    events,
+    peering_opportunities,
+    search,
+    session_export,
+)
 from django_peerctl.const import DEVICE_TEMPLATE_TYPES, DEVICE_TYPES
 from django_peerctl.exceptions import TemplateRenderError, UsageLimitError
-from django_peerctl.models.tasks import SyncASSet
+from django_peerctl.models.tasks import SyncASSet, UpdatePeeringOpportunities
+from django_peerctl.peer_session_bulk import PeerSessionBulkUpsert
 from django_peerctl.peer_session_workflow import (
     PeerRequestToAsnWorkflow,
     PeerSessionEmailWorkflow,
 )
-from django_peerctl.rest.decorators import grainy_endpoint
+from django_peerctl.rest.decorators import cached_response, grainy_endpoint
+from django_peerctl.rest.fieldsets import Fieldset
+from django_peerctl.rest.pagination import SessionCursorPagination
 from django_peerctl.rest.route.peerctl import route
 from django_peerctl.rest.serializers.peerctl import Serializers, ValidationError
 from django_peerctl.utils import load_exchanges
@@ -207,6 +220,7 @@ class Policy(CachedObjectMixin, viewsets.ModelViewSet):
     require_asn = True
 
     @grainy_endpoint(namespace="verified.asn.{asn}.?")
+    @cached_response("policy")
     def list(self, request, asn, *args, **kwargs):
         instances = (
             models.Policy.objects.filter(net__asn=asn, status="ok")
@@ -297,10 +311,12 @@ class Port(CachedObjectMixin, viewsets.GenericViewSet):
         return super().get_serializer_class()
 
     @grainy_endpoint(namespace="verified.asn.{asn}.?")
+    @cached_response("port")
     def list(self, request, asn, *args, **kwargs):
         filter_device = request.GET.get("device")
         ixi = request.GET.get("ixi")
         load_md5 = request.GET.get("load_md5", False)
+        fieldset = Fieldset.from_request(request)
 
         qset = models.PortInfo.objects.filter(
             net__org=request.org, net__asn=asn, port__gt=0
@@ -324,28 +340,32 @@ class Port(CachedObjectMixin, viewsets.GenericViewSet):
             asn,
             port_ids,
             filter_device=filter_device,
-            load_policies=True,
+            load_policies=fieldset.wants("policy4", "policy6"),
             port_infos=port_infos,
         )
 
         if ixi:
             models.Port.augment_ix(instances, asn)
 
+        # ordering data based on order param
+        order = request.GET.get("ordering")
+        order_field = (
+            "ix_simple_name"
+            if order in ["ix_simple_name", "-ix_simple_name"]
+            else "ix_name"
+        )
+
         serializer = self.serializer_class(
-            instances, many=True, context={"load_md5": load_md5}
+            instances,
+            many=True,
+            context={"load_md5": load_md5, "fieldset": fieldset.require(order_field)},
         )
 
-        data = serializer.data
-        # ordering data based on order param
-        order = request.GET.get("ordering")
-        if order == "ix_simple_name":
-            data = sorted(data, key=lambda x: x["ix_simple_name"])
-        elif order == "-ix_simple_name":
-            data = sorted(data, key=lambda x: x["ix_simple_name"])[::-1]
-        else:
-            data = sorted(data, key=lambda x: x["ix_name"])
+        data = sorted(serializer.data, key=lambda x: x[order_field])
+        if order == "-ix_simple_name":
+            data = data[::-1]
 
-        return Response(data)
+        return Response(fieldset.apply(data))
 
     @grainy_endpoint(namespace="verified.asn.{asn}.?")
     def retrieve(self, request, asn, pk, *args, **kwargs):
@@ -560,9 +580,9 @@ class NetworkSearch(viewsets.GenericViewSet):
 
         # get their exchanges, our exchanges, and also summarize mutual exchanges
 
-        for netixlan in sot.InternetExchangeMember().objects(
-            asns=[asn, other_asn], join="ix_name"
-        ):
+        members = models.ExchangeMember.refs([asn, other_asn])
+
+        for netixlan in members[int(asn)] + members[int(other_asn)]:
             ix_id = f"{netixlan.source}:{netixlan.ix_id}"
             if netixlan.asn == int(asn):
                 locations_us[ix_id] = netixlan.ix_name
@@ -648,74 +668,302 @@ class NetworkSearch(viewsets.GenericViewSet):
 
 
 @route
-class SessionsSummary(CachedObjectMixin, viewsets.GenericViewSet):
-    serializer_class = Serializers.peer_session
+class PeeringOpportunities(viewsets.GenericViewSet):
+
+    """
+    Lists networks that share at least one exchange with us and have
+    no active peer session with us yet, ranked by number of mutual
+    exchanges
+
+    The report is computed in a background task, if no report exists
+    for the current memberships and sessions yet, the task is queued
+    and an empty list is returned with status 202
+    """
+
+    serializer_class = Serializers.peering_opportunities
     require_asn = True
-    optional_port = True
-    ref_tag = "sessions_summary"
 
-    def _filter_peer(self, sessions, peer):
-        if not peer:
-            return sessions
+    @load_object("net", models.Network, asn="asn")
+    @grainy_endpoint(namespace="verified.asn.{asn}.?")
+    def list(self, request, asn, net, *args, **kwargs):
+        report = peering_opportunities.get_cached(net)
+
+        if report is None:
+            try:
+                UpdatePeeringOpportunities.create_task(net.asn, org=net.org)
+            except TaskLimitError:
+                # report is already being computed
+                pass
+            return Response(self.serializer_class([], many=True).data, status=202)
+
+        serializer = self.serializer_class(report["results"], many=True)
+        return Response(serializer.data)
+
+
+@route
+class Search(viewsets.GenericViewSet):
+
+    """
+    Searches the peers, peer sessions and ports of a network using
+    the local search index
+
+    Query parameters:
+
+    - q: peer name, asn, exchange name, ip address or prefix
+    - limit: max number of results per type
+    """
+
+    serializer_class = Serializers.search
+    require_asn = True
+
+    @load_object("net", models.Network, asn="asn")
+    @grainy_endpoint(namespace="verified.asn.{asn}.?")
+    def list(self, request, asn, net, *args, **kwargs):
+        q = request.GET.get("q", "")
+
         try:
-            peer = str(ipaddress.ip_interface(peer))
+            limit = int(request.GET.get("limit", 0)) or None
         except ValueError:
-            pass
+            return BadRequest({"limit": ["Needs to be an integer"]})
 
-        r = []
-        for session in sessions:
-            if session.peer_ip4 == peer or session.peer_ip6 == peer:
-                r.append(session)
-            elif session.peer_port.peer_net.peer.name.lower().find(peer.lower()) > -1:
-                r.append(session)
-            elif str(session.peer_port.peer_net.peer.asn) == peer:
-                r.append(session)
+        serializer = self.serializer_class(
+            search.search(net, q, limit=limit), many=True
+        )
+        return Response(serializer.data)
 
-        return r
 
-    def prefetch_relations(self, sessions):
-        return models.PeerSession.load_references(sessions)
+@route
+class Events(viewsets.GenericViewSet):
+
+    """
+    Polls the peer session and peer request changes of a network,
+    see `django_peerctl.events`
+
+    - since: id of the last event received, returns the events after
+      it, if not specified only returns the id to poll from
+
+    Returns the events and the `last_id` to pass as `since` on the
+    next poll
+    """
+
+    serializer_class = Serializers.event
+    ref_tag = "events"
+    require_asn = True
 
     @load_object("net", models.Network, asn="asn")
     @grainy_endpoint(namespace="verified.asn.{asn}.?")
     def list(self, request, asn, net, *args, **kwargs):
-        instances = list(net.peer_session_set.filter(status__in=["ok", "configured"]))
+        since = request.GET.get("since")
 
-        self.prefetch_relations(instances)
+        try:
+            since = int(since) if since else None
+        except ValueError:
+            return BadRequest({"since": ["Needs to be an integer"]})
 
-        instances = list(self._filter_peer(instances, request.GET.get("peer")))
+        result = events.poll(net, since=since)
+        serializer = self.serializer_class(result["events"], many=True)
 
-        serializer = self.serializer_class(instances, many=True)
-        data = sorted(serializer.data, key=lambda x: (x["peer_asn"], x["id"]))
+        return Response({"last_id": result["last_id"], "events": serializer.data})
+
+
+@route
+class SessionsSummary(CachedObjectMixin, viewsets.GenericViewSet):
+    serializer_class = Serializers.peer_session
+    require_asn = True
+    optional_port = True
+    ref_tag = "sessions_summary"
+
+    def _filter_peer_ip(self, sessions, prefix):
+        """
+        Filters sessions to those where the peer ip address is
+        within the specified prefix (or matches the address)
+
+        Uses the peer ip addresses of the local search index, see
+        `search.sync_sessions` for rows that are not synced yet
+        """
+
+        network = ipaddress.ip_network(prefix, strict=False)
+        return sessions.filter(search.ip_query("peer_port__port_info__", network))
+
+    def _filter_peer_name(self, sessions, name):
+        """
+        Filters sessions to those where the peer name contains `name`
+
+        Uses the peer names of the local search index, see
+        `search.sync_sessions` for rows that are not synced yet
+        """
+
+        return sessions.filter(
+            peer_port__peer_net__peer__search_name__trigram_icontains=name
+        )
+
+    def _filter_sessions(self, sessions, request):
+        """
+        Applies the filters specified in the request query
+        to a peer session queryset
+
+        - peer: peer ip address, peer name or peer asn
+        - peer_asn
+        - peer_name: peer name contains
+        - ip: peer ip address or prefix
+        - status
+        - peer_session_type
+        - device: devicectl device id
+        - port: devicectl port id
+        """
+
+        params = request.query_params
+
+        peer = params.get("peer")
+
+        if peer or params.get("peer_name") or params.get("ip"):
+            # peers and peer ip addresses that are not in the search
+            # index yet are synced from their references first
+
+            search.sync_sessions(sessions)
 
-        return Response(data)
+        if peer:
+            try:
+                sessions = self._filter_peer_ip(
+                    sessions, str(ipaddress.ip_interface(peer))
+                )
+            except ValueError:
+                query = Q(
+                    peer_port__peer_net__peer__search_name__trigram_icontains=peer
+                )
+                if peer.isdigit():
+                    query |= Q(peer_port__peer_net__peer__asn=int(peer))
+                sessions = sessions.filter(query)
+
+        if params.get("peer_name"):
+            sessions = self._filter_peer_name(sessions, params["peer_name"])
+
+        if params.get("ip"):
+            try:
+                sessions = self._filter_peer_ip(sessions, params["ip"])
+            except ValueError:
+                raise ValidationError({"ip": ["Invalid ip address or prefix"]})
+
+        for param, field in (
+            ("peer_asn", "peer_port__peer_net__peer__asn"),
+            ("device", "device"),
+            ("port", "port"),
+        ):
+            if params.get(param):
+                try:
+                    sessions = sessions.filter(**{field: int(params[param])})
+                except ValueError:
+                    raise ValidationError({param: ["Needs to be an integer"]})
+
+        for param in ("status", "peer_session_type"):
+            if params.get(param):
+                sessions = sessions.filter(**{param: params[param]})
+
+        return sessions
+
+    # serializer fields -> `PeerSession.load_references` argument
+    # that loads the references needed for them
+
+    REFERENCE_FIELDS = {
+        "networks": ["peer_name", "peer_maxprefix4", "peer_maxprefix6"],
+        "ports": [
+            "ip4",
+            "ip6",
+            "peer_ip4",
+            "peer_ip6",
+            "peer_interface",
+            "port_interface",
+            "port_display_name",
+            "port_is_ix",
+            "device_name",
+            "device_id",
+            "facility_slug",
+            "status",
+        ],
+        "devices": ["device_name", "device_id", "facility_slug", "status"],
+        "policies": [
+            f"policy{version}_{field}"
+            for version in (4, 6)
+            for field in Serializers.peer_session.POLICY_FIELDS
+        ]
+        + ["status"],
+    }
+
+    def prefetch_relations(self, sessions, fieldset=None):
+        """
+        Loads the references of the sessions, references only needed
+        for fields that were not requested are skipped
+        """
+
+        fieldset = fieldset or Fieldset()
+
+        return models.PeerSession.load_references(
+            sessions,
+            **{
+                name: fieldset.wants(*fields)
+                for name, fields in self.REFERENCE_FIELDS.items()
+            },
+        )
+
+    def _list(self, request, sessions):
+        """
+        Filters, orders and (optionally) paginates a peer session
+        queryset and returns the serialized response
+
+        References are only loaded for the sessions being returned
+        and only for the requested fields (see `Fieldset`)
+        """
+
+        paginator = SessionCursorPagination()
+        fieldset = Fieldset.from_request(request)
+
+        sessions = self._filter_sessions(sessions, request)
+        sessions = paginator.prepare(
+            sessions.select_related(
+                "peer_port",
+                "peer_port__port_info",
+                "peer_port__peer_net",
+                "peer_port__peer_net__peer",
+            )
+        )
+
+        if paginator.is_requested(request):
+            instances = paginator.paginate_queryset(sessions, request, view=self)
+        else:
+            instances = list(paginator.order(request, sessions))
+
+        self.prefetch_relations(instances, fieldset)
+
+        serializer = self.serializer_class(
+            instances, many=True, context={"fieldset": fieldset}
+        )
+
+        if paginator.is_requested(request):
+            return paginator.get_paginated_response(serializer.data)
+
+        return Response(serializer.data)
+
+    @load_object("net", models.Network, asn="asn")
+    @grainy_endpoint(namespace="verified.asn.{asn}.?")
+    @cached_response("sessions_summary")
+    def list(self, request, asn, net, *args, **kwargs):
+        return self._list(
+            request, net.peer_session_set.filter(status__in=["ok", "configured"])
+        )
 
     @action(detail=False, methods=["get"], url_path="port/(?P<port_pk>[^/]+)")
     @load_object("net", models.Network, asn="asn")
     @grainy_endpoint(namespace="verified.asn.{asn}.?")
     def list_by_port(self, request, asn, net, port_pk, *args, **kwargs):
         port = models.Port().object(id=port_pk)
-        instances = list(port.peer_session_qs_prefetched.filter(status="ok"))
-
-        self.prefetch_relations(instances)
-
-        instances = self._filter_peer(instances, request.GET.get("peer"))
-
-        serializer = self.serializer_class(instances, many=True)
-        data = sorted(serializer.data, key=lambda x: (x["peer_asn"], x["id"]))
-        return Response(data)
+        return self._list(request, port.peer_session_qs_prefetched.filter(status="ok"))
 
     @action(detail=False, methods=["get"], url_path="device/(?P<device_pk>[^/]+)")
     @load_object("net", models.Network, asn="asn")
     @grainy_endpoint(namespace="verified.asn.{asn}.?")
     def list_by_device(self, request, asn, net, device_pk, *args, **kwargs):
         device = models.Device().object(id=device_pk)
-        instances = list(device.peer_session_qs.filter(status="ok"))
-        self.prefetch_relations(instances)
-        instances = self._filter_peer(instances, request.GET.get("peer"))
-        serializer = self.serializer_class(instances, many=True)
-        data = sorted(serializer.data, key=lambda x: (x["peer_asn"], x["id"]))
-        return Response(data)
+        return self._list(request, device.peer_session_qs.filter(status="ok"))
 
     @action(detail=False, methods=["get"], url_path="facility/(?P<facility_tag>[^/]+)")
     @load_object("net", models.Network, asn="asn")
@@ -723,19 +971,43 @@ class SessionsSummary(CachedObjectMixin, viewsets.GenericViewSet):
     def list_by_facility(self, request, asn, net, facility_tag, *args, **kwargs):
         devices = list(models.Device().objects(facility_slug=facility_tag))
 
-        instances = []
-
         models.Device.load_references(devices, org=net.org.slug)
 
+        query = Q(pk__in=[])
+
         for device in devices:
-            instances.extend(list(device.peer_session_qs.filter(status="ok")))
+            query |= Q(port__in=[port.id for port in device.ports]) | Q(
+                device=device.id
+            )
 
-        self.prefetch_relations(instances)
+        return self._list(
+            request, models.PeerSession.objects.filter(query, status="ok")
+        )
 
-        instances = self._filter_peer(instances, request.GET.get("peer"))
-        serializer = self.serializer_class(instances, many=True)
-        data = sorted(serializer.data, key=lambda x: (x["peer_asn"], x["id"]))
-        return Response(data)
+    @action(detail=False, methods=["get"], url_path="export/(?P<export_format>[^/]+)")
+    @load_object("net", models.Network, asn="asn")
+    @grainy_endpoint(namespace="verified.asn.{asn}.?")
+    def export(self, request, asn, net, export_format, *args, **kwargs):
+        """
+        Streams all sessions of the network as ndjson or csv
+
+        Accepts the same filters as the session list, sessions are
+        read and serialized in chunks (see `session_export`)
+        """
+
+        if export_format not in session_export.FORMATS:
+            return BadRequest({"format": [f"Invalid format: {export_format}"]})
+
+        sessions = self._filter_sessions(session_export.get_sessions(net), request)
+
+        response = StreamingHttpResponse(
+            session_export.export(sessions, export_format),
+            content_type=session_export.CONTENT_TYPES[export_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="AS{asn}-sessions.{export_format}"'
+        )
+        return response
 
     @action(
         detail=False,
@@ -749,15 +1021,18 @@ class SessionsSummary(CachedObjectMixin, viewsets.GenericViewSet):
     ):
         port = models.Port().object(id=port_pk)
         instances = port.peer_session_qs_prefetched.filter(status="ok")
+        fieldset = Fieldset.from_request(request)
 
-        serializer = self.serializer_class(instances, many=True)
+        serializer = self.serializer_class(
+            instances, many=True, context={"fieldset": fieldset.require("device_id")}
+        )
 
         intersection = []
         for row in serializer.data:
             if str(row["device_id"]) == device_pk:
                 intersection.append(row)
 
-        return Response(intersection)
+        return Response(fieldset.apply(intersection))
 
     @load_object("net", models.Network, asn="asn")
     @grainy_endpoint(namespace="verified.asn.{asn}.?")
@@ -793,6 +1068,7 @@ class Peer(CachedObjectMixin, viewsets.GenericViewSet):
 
     @load_object("net", models.Network, asn="asn")
     @grainy_endpoint(namespace="verified.asn.{asn}.?")
+    @cached_response("peer")
     def list(self, request, asn, net, port_pk, *args, **kwargs):
         port = models.Port().first(id=port_pk)
 
@@ -801,8 +1077,17 @@ class Peer(CachedObjectMixin, viewsets.GenericViewSet):
         instances = port.get_available_peers()
         instances = list(self._filter_peer(instances, request.GET.get("peer")))
 
+        fieldset = Fieldset.from_request(request)
+
         serializer = self.serializer_class(
-            instances, many=True, context={"port": port, "net": net, "device": device}
+            instances,
+            many=True,
+            context={
+                "port": port,
+                "net": net,
+                "device": device,
+                "fieldset": fieldset.require("asn", "name"),
+            },
         )
 
         unified = {}
@@ -829,10 +1114,12 @@ class Peer(CachedObjectMixin, viewsets.GenericViewSet):
             ordering = "name"
 
         return Response(
-            sorted(
-                list(unified.values()),
-                key=lambda x: x[ordering].lower(),
-                reverse=ordering_reverse,
+            fieldset.apply(
+                sorted(
+                    list(unified.values()),
+                    key=lambda x: x[ordering].lower(),
+                    reverse=ordering_reverse,
+                )
             )
         )
 
@@ -1345,6 +1632,36 @@ class UpdatePeerSession(CachedObjectMixin, viewsets.ModelViewSet):
 
         return Response(Serializers.update_peer_session(instance=session).data)
 
+    @action(detail=False, methods=["post"])
+    @load_object("net", models.Network, asn="asn")
+    @grainy_endpoint(namespace="verified.asn.{asn}.?")
+    def bulk(self, request, asn, net, *args, **kwargs):
+        """
+        Creates or updates multiple peer sessions at once
+
+        Expects a list of payloads as accepted by `create`, returns a result
+        for each of them: `status` is `created`, `updated` or `error` (with
+        `errors`). Rows with errors are skipped, all other rows are written.
+        """
+
+        rows = request.data
+
+        if not isinstance(rows, list):
+            return BadRequest({"non_field_errors": ["Expected a list of sessions"]})
+
+        if len(rows) > settings.PEER_SESSION_BULK_MAX:
+            return BadRequest(
+                {
+                    "non_field_errors": [
+                        f"Too many sessions, max is {settings.PEER_SESSION_BULK_MAX}"
+                    ]
+                }
+            )
+
+        results = PeerSessionBulkUpsert(net, rows, user=request.user).run()
+
+        return Response(results)
+
     @load_object("net", models.Network, asn="asn")
     @grainy_endpoint(namespace="verified.asn.{asn}.?")
     def destroy(self, request, asn, net, *args, **kwargs):
@@ -1639,15 +1956,92 @@ class DeviceTemplate(CachedObjectMixin, viewsets.ModelViewSet):
         return self._preview(request, asn, net, pk, *args, **kwargs)
 
     def _preview(self, request, asn, net, pk, *args, **kwargs):
-        device = models.Device().object(request.data["device"])
+        device_template = self._device_template(request.data, net, pk)
+        serializer = Serializers.tmplpreview(instance=device_template)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=["get"])
+    @load_object("net", models.Network, asn="asn")
+    @grainy_endpoint(namespace="verified.asn.{asn}.?")
+    def config(self, request, asn, net, pk, *args, **kwargs):
+        """
+        Streams the rendered device configuration as a file download
+
+        expects `device` in the query, pk 0 renders the default
+        template for the `type` specified in the query
+        """
+
+        device_template = self._device_template(request.GET, net, pk)
+        device = device_template.context["device"]
+
+        response = StreamingHttpResponse(
+            device_template.render_stream(), content_type="text/plain"
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{device.name}-{device_template.type}.txt"'
+        )
+        return response
+
+    @action(detail=False, methods=["get"])
+    @load_object("net", models.Network, asn="asn")
+    @grainy_endpoint(namespace="verified.asn.{asn}.?")
+    def bulk_config(self, request, asn, net, *args, **kwargs):
+        """
+        Renders the configurations of all devices of the organization
+        and returns them as a tar or zip archive
+
+        optional query parameters: `facility`, `template` (id),
+        `type` and `format` (tar or zip)
+        """
+
+        archive_format = request.GET.get("format") or "tar"
+
+        if archive_format not in device_config.ARCHIVE_FORMATS:
+            return BadRequest({"format": [f"Invalid format: {archive_format}"]})
+
+        template = None
+        if request.GET.get("template"):
+            template = models.DeviceTemplate.objects.get(
+                id=request.GET["template"], net=net
+            )
+
+        devices = device_config.get_devices(net, facility=request.GET.get("facility"))
+
+        fileobj = tempfile.SpooledTemporaryFile()
+        device_config.write_archive(
+            fileobj,
+            device_config.render_configs(
+                net,
+                devices,
+                template=template,
+                template_type=request.GET.get("type"),
+                processes=settings.DEVICE_CONFIG_BULK_PROCESSES,
+            ),
+            archive_format,
+        )
+        fileobj.seek(0)
+
+        extension = "tar.gz" if archive_format == "tar" else "zip"
+
+        return FileResponse(
+            fileobj, as_attachment=True, filename=f"AS{asn}-device-configs.{extension}"
+        )
+
+    def _device_template(self, data, net, pk):
+        """
+        Returns the device template for `pk` with the render context
+        (device, port, net, member) set up from `data`
+        """
+
+        device = models.Device().object(data["device"])
 
         if not pk or pk == "0":
             device_template = models.DeviceTemplate(
                 name="Preview",
                 net=net,
-                body=request.data.get("body"),
+                body=data.get("body"),
                 # TODO: defaulting to junos ok?
-                type=request.data.get("type") or "junos-bgp-neighbors",
+                type=data.get("type") or "junos-bgp-neighbors",
             )
         else:
             device_template = models.DeviceTemplate.objects.get(id=pk)
@@ -1658,10 +2052,9 @@ class DeviceTemplate(CachedObjectMixin, viewsets.ModelViewSet):
         device_template.context["net"] = net
         # FIXME: support more than one physical port in templates (expose multiple devices?)
         device_template.context["device"] = device
-        device_template.context["member"] = request.data.get("member")
+        device_template.context["member"] = data.get("member")
 
-        serializer = Serializers.tmplpreview(instance=device_template)
-        return Response(serializer.data)
+        return device_template
 
     @action(detail=False)
     @grainy_endpoint(namespace="verified.asn.{asn}.?")
@@ -0,0 +1,499 @@
+"""
+Local search index over peers, peer sessions and ports
+
+Peer names, member ip addresses and exchange names live in pdbctl and
+ixctl, so they are denormalized onto local columns:
+
+- `Network.search_name`: peeringdb network name
+- `PortInfo.search_ipaddr4` / `PortInfo.search_ipaddr6`: ip addresses
+- `PortInfo.search_ix_name`: exchange name
+
+Names are indexed with trigram GIN indexes and ip addresses with GiST
+inet indexes, so searches never need to ask the service bridge.
+
+Name candidates are selected with operators the trigram indexes
+support, the `%` similarity operator (`trigram_similar`) and `ILIKE`
+(`trigram_icontains`, Django's `icontains` compiles to
+`UPPER(...) LIKE`, which can not use them). The trigram similarity
+is only computed to rank the candidates.
+
+The columns are filled from the local pdbctl network and exchange
+member replicas when networks and port infos are saved (see
+`django_peerctl.signals`) and by the bulk session upsert, without
+service bridge requests (`fill_network_names`, `fill_port_infos`).
+They are kept up to date by `sync()`, which runs from the
+`task_sync_search_index` task and the `peerctl_sync_search_index`
+command and requests what is not replicated yet.
+
+Rows that have not been synced yet (e.g. written before the columns
+existed) are synced from their references by `sync_sessions` before
+sessions are filtered on the columns.
+"""
+
+import ipaddress
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import connection
+from django.db.models import CharField, Lookup, Q
+
+from django_peerctl.models import (
+    ExchangeMember,
+    Network,
+    PeeringDBNetwork,
+    PeerNetwork,
+    PeerSession,
+    PortInfo,
+)
+
+__all__ = [
+    "fill_network_names",
+    "fill_port_infos",
+    "ip_query",
+    "search",
+    "sync",
+    "sync_network_names",
+    "sync_port_infos",
+    "sync_sessions",
+    "text_query",
+]
+
+# number of objects to load references for per batch
+BATCH_SIZE = 250
+
+
+@CharField.register_lookup
+class TrigramIContains(Lookup):
+    """
+    Case insensitive contains as `ILIKE`, which trigram indexes
+    (`gin_trgm_ops`) support
+    """
+
+    lookup_name = "trigram_icontains"
+
+    def process_rhs(self, compiler, connection):
+        rhs, params = super().process_rhs(compiler, connection)
+        params = [f"%{connection.ops.prep_for_like_query(param)}%" for param in params]
+        return rhs, params
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} ILIKE {rhs}", lhs_params + rhs_params
+
+
+def host(ip):
+    if not ip:
+        return None
+    return str(ipaddress.ip_interface(str(ip)).ip)
+
+
+def sync_network_names(networks=None):
+    """
+    Syncs `Network.search_name` from the pdbctl network replica
+
+    Keyword Arguments:
+        - networks <QuerySet>: networks to sync, all if not specified
+
+    Returns:
+        - <int> number of updated networks
+    """
+
+    if networks is None:
+        networks = Network.objects.all()
+
+    networks = list(networks.only("id", "asn", "search_name"))
+    changed = []
+
+    for i in range(0, len(networks), BATCH_SIZE):
+        batch = networks[i : i + BATCH_SIZE]
+        names = {
+            asn: other.name or ""
+            for asn, other in PeeringDBNetwork.refs([net.asn for net in batch]).items()
+        }
+
+        for net in batch:
+            name = names.get(net.asn)
+            if name is not None and name != net.search_name:
+                net.search_name = name[:255]
+                changed.append(net)
+
+    Network.objects.bulk_update(changed, ["search_name"], batch_size=BATCH_SIZE)
+    return len(changed)
+
+
+def fill_network_names(networks):
+    """
+    Fills `Network.search_name` from the pdbctl network replica only,
+    networks that are not replicated yet are left to `sync()`
+
+    Does not make service bridge requests, so it is safe to call
+    while saving
+
+    Arguments:
+        - networks <QuerySet>
+
+    Returns:
+        - <int> number of updated networks
+    """
+
+    networks = list(networks.only("id", "asn", "search_name"))
+    names = dict(
+        PeeringDBNetwork.objects.filter(
+            asn__in=[net.asn for net in networks]
+        ).values_list("asn", "name")
+    )
+    changed = []
+
+    for net in networks:
+        name = (names.get(net.asn) or "")[:255]
+        if name and name != net.search_name:
+            net.search_name = name
+            changed.append(net)
+
+    Network.objects.bulk_update(changed, ["search_name"], batch_size=BATCH_SIZE)
+    return len(changed)
+
+
+def fill_port_infos(port_infos):
+    """
+    Fills the search ip addresses and exchange name of port infos
+    from their own ip addresses and the exchange member replica only,
+    references that are not replicated yet are left to `sync()`
+
+    Does not make service bridge requests, so it is safe to call
+    while saving
+
+    Arguments:
+        - port_infos <iterable<PortInfo>>
+
+    Returns:
+        - <int> number of updated port infos
+    """
+
+    port_infos = list(port_infos)
+    members = {
+        member.ref_id: member
+        for member in ExchangeMember.objects.filter(
+            ref_id__in=[pi.ref_id for pi in port_infos if pi.ref_id]
+        ).only("ref_id", "ipaddr4", "ipaddr6", "ix_name")
+    }
+    changed = []
+
+    for port_info in port_infos:
+        member = members.get(port_info.ref_id)
+
+        if port_info.ref_id and not member:
+            # reference not replicated yet
+            continue
+
+        ip4 = host(port_info.ip_address_4 or getattr(member, "ipaddr4", None))
+        ip6 = host(port_info.ip_address_6 or getattr(member, "ipaddr6", None))
+        ix_name = member.ix_name[:255] if member else ""
+
+        current = (
+            host(port_info.search_ipaddr4),
+            host(port_info.search_ipaddr6),
+            port_info.search_ix_name,
+        )
+
+        if current != (ip4, ip6, ix_name):
+            port_info.search_ipaddr4 = ip4
+            port_info.search_ipaddr6 = ip6
+            port_info.search_ix_name = ix_name
+            changed.append(port_info)
+
+    PortInfo.objects.bulk_update(
+        changed,
+        ["search_ipaddr4", "search_ipaddr6", "search_ix_name"],
+        batch_size=BATCH_SIZE,
+    )
+    return len(changed)
+
+
+def sync_port_infos(port_infos=None):
+    """
+    Syncs the search ip addresses and exchange name of port infos
+    from their ixctl / pdbctl references
+
+    Manually set ip addresses take precedence over the reference
+
+    Keyword Arguments:
+        - port_infos <QuerySet>: port infos to sync, all if not specified
+
+    Returns:
+        - <int> number of updated port infos
+    """
+
+    if port_infos is None:
+        port_infos = PortInfo.objects.all()
+
+    port_infos = list(port_infos)
+    changed = []
+
+    for i in range(0, len(port_infos), BATCH_SIZE):
+        batch = port_infos[i : i + BATCH_SIZE]
+        PortInfo.load_references([pi for pi in batch if pi.ref_id])
+
+        for port_info in batch:
+            ref = port_info.ref if port_info.ref_id else None
+
+            ip4 = host(port_info.ip_address_4 or getattr(ref, "ipaddr4", None))
+            ip6 = host(port_info.ip_address_6 or getattr(ref, "ipaddr6", None))
+
+            ix_name = ""
+            if ref:
+                try:
+                    ix_name = port_info.ix_name or ""
+                except Exception:
+                    # exchange could not be retrieved, keep the name empty
+                    ix_name = ""
+
+            current = (
+                host(port_info.search_ipaddr4),
+                host(port_info.search_ipaddr6),
+                port_info.search_ix_name,
+            )
+
+            if current != (ip4, ip6, ix_name[:255]):
+                port_info.search_ipaddr4 = ip4
+                port_info.search_ipaddr6 = ip6
+                port_info.search_ix_name = ix_name[:255]
+                changed.append(port_info)
+
+    PortInfo.objects.bulk_update(
+        changed,
+        ["search_ipaddr4", "search_ipaddr6", "search_ix_name"],
+        batch_size=BATCH_SIZE,
+    )
+    return len(changed)
+
+
+def sync_sessions(sessions):
+    """
+    Syncs the search columns of the peers and peer port infos of
+    sessions that have not been synced yet
+
+    Peers without a search name and peer port infos without search ip
+    addresses are synced from their pdbctl / ixctl references, synced
+    rows are skipped, so this is cheap once the columns are filled.
+
+    Arguments:
+        - sessions <QuerySet>: peer sessions
+    """
+
+    sync_network_names(
+        Network.objects.filter(
+            search_name="",
+            id__in=sessions.values("peer_port__peer_net__peer"),
+        )
+    )
+
+    sync_port_infos(
+        PortInfo.objects.filter(
+            id__in=sessions.values("peer_port__port_info"),
+            search_ipaddr4__isnull=True,
+            search_ipaddr6__isnull=True,
+        ).filter(
+            Q(ref_id__isnull=False)
+            | Q(ip_address_4__isnull=False)
+            | Q(ip_address_6__isnull=False)
+        )
+    )
+
+
+def sync():
+    """
+    Syncs the search columns for all networks and port infos
+    """
+
+    return {
+        "networks": sync_network_names(),
+        "port_infos": sync_port_infos(),
+    }
+
+
+def parse_query(q):
+    """
+    Parses a search query
+
+    Returns:
+        - tuple(<str> text, <int> asn or None, <IPv4Network|IPv6Network> or None)
+    """
+
+    q = q.strip()
+    asn = None
+    network = None
+
+    digits = q.upper().removeprefix("AS")
+    if digits.isdigit():
+        asn = int(digits)
+
+    try:
+        network = ipaddress.ip_network(q, strict=False)
+    except ValueError:
+        pass
+
+    return q, asn, network
+
+
+def ip_query(prefix, network):
+    """
+    Returns a Q object matching port infos (prefixed with `prefix`)
+    whose search ip address is within the network
+    """
+
+    field = f"{prefix}search_ipaddr{network.version}__net_contained_or_equal"
+    return Q(**{field: str(network)})
+
+
+def set_similarity_threshold(threshold):
+    """
+    Sets the similarity threshold of the `%` operator
+    (`trigram_similar`) for the current database session
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('pg_trgm.similarity_threshold', %s, false)",
+            [str(threshold)],
+        )
+
+
+def text_query(field, text):
+    """
+    Returns a Q object matching rows whose `field` is similar to
+    or contains the text, both can use the field's trigram index
+    """
+
+    return Q(**{f"{field}__trigram_similar": text}) | Q(
+        **{f"{field}__trigram_icontains": text}
+    )
+
+
+def search(net, q, limit=None):
+    """
+    Searches the peers, peer sessions and ports of a network
+
+    Peers and sessions match on peer name (trigram similarity), peer
+    asn and peer ip address (or prefix), ports match on ip address
+    (or prefix) and exchange name
+
+    Arguments:
+        - net <Network>
+        - q <str>: search query
+
+    Keyword Arguments:
+        - limit <int>: max number of results per type
+
+    Returns:
+        - list<dict>: results ordered by descending score, exact
+          asn and ip matches score 1.0
+    """
+
+    text, asn, network = parse_query(q)
+    limit = limit or settings.SEARCH_LIMIT
+
+    if not text:
+        return []
+
+    set_similarity_threshold(settings.SEARCH_SIMILARITY_THRESHOLD)
+
+    results = []
+
+    # peers
+
+    peer_nets = (
+        PeerNetwork.objects.filter(net=net)
+        .select_related("peer")
+        .annotate(score=TrigramSimilarity("peer__search_name", text))
+    )
+
+    if asn:
+        peer_nets = peer_nets.filter(peer__asn=asn)
+    elif network:
+        peer_nets = peer_nets.filter(
+            id__in=PeerSession.objects.filter(
+                ip_query("peer_port__port_info__", network)
+            ).values("peer_port__peer_net")
+        )
+    else:
+        peer_nets = peer_nets.filter(text_query("peer__search_name", text))
+
+    for peer_net in peer_nets.order_by("-score")[:limit]:
+        results.append(
+            {
+                "type": "peer",
+                "id": peer_net.id,
+                "asn": peer_net.peer.asn,
+                "label": peer_net.peer.search_name or f"AS{peer_net.peer.asn}",
+                "score": 1.0 if asn or network else peer_net.score,
+            }
+        )
+
+    # peer sessions
+
+    sessions = (
+        PeerSession.objects.filter(peer_port__peer_net__net=net)
+        .exclude(status="deleted")
+        .select_related("peer_port__port_info", "peer_port__peer_net__peer")
+        .annotate(
+            score=TrigramSimilarity("peer_port__peer_net__peer__search_name", text)
+        )
+    )
+
+    if asn:
+        sessions = sessions.filter(peer_port__peer_net__peer__asn=asn)
+    elif network:
+        sessions = sessions.filter(ip_query("peer_port__port_info__", network))
+    else:
+        sessions = sessions.filter(
+            text_query("peer_port__peer_net__peer__search_name", text)
+        )
+
+    for session in sessions.order_by("-score", "id")[:limit]:
+        port_info = session.peer_port.port_info
+        peer = session.peer_port.peer_net.peer
+        ips = [
+            str(ip) for ip in (port_info.search_ipaddr4, port_info.search_ipaddr6) if ip
+        ]
+        results.append(
+            {
+                "type": "peer_session",
+                "id": session.id,
+                "asn": peer.asn,
+                "label": " ".join([peer.search_name or f"AS{peer.asn}"] + ips),
+                "score": 1.0 if asn or network else session.score,
+            }
+        )
+
+    # ports
+
+    port_infos = (
+        PortInfo.objects.filter(net=net, port__gt=0)
+        .exclude(ref_id__isnull=True)
+        .annotate(score=TrigramSimilarity("search_ix_name", text))
+    )
+
+    if network:
+        port_infos = port_infos.filter(ip_query("", network))
+    else:
+        port_infos = port_infos.filter(text_query("search_ix_name", text))
+
+    for port_info in port_infos.order_by("-score", "id")[:limit]:
+        ips = [
+            str(ip) for ip in (port_info.search_ipaddr4, port_info.search_ipaddr6) if ip
+        ]
+        results.append(
+            {
+                "type": "port",
+                "id": int(port_info.port),
+                "asn": net.asn,
+                "label": " ".join([port_info.search_ix_name] + ips).strip(),
+                "score": 1.0 if network else port_info.score,
+            }
+        )
+
+    results.sort(key=lambda result: -result["score"])
+
+    return results
@@ -0,0 +1,195 @@
+"""
+Streaming export of the peer sessions of a network
+
+Sessions are read through a server-side cursor
+(`QuerySet.iterator`) and their references (peer networks, ports,
+devices and policies) are loaded one chunk at a time, so memory use
+is bounded by the chunk size and not by the number of sessions.
+
+Rows are rendered as NDJSON (one json object per line) or CSV and
+yielded as they are produced, so the export starts streaming right
+away. Used by the `sessions_summary/export` endpoint and the
+`peerctl_export_sessions` command.
+"""
+
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from django_peerctl.models import PeerSession
+from django_peerctl.rest.fieldsets import Fieldset
+from django_peerctl.rest.serializers.peerctl import Serializers
+
+__all__ = [
+    "CHUNK_SIZE",
+    "CONTENT_TYPES",
+    "EXPORT_FIELDS",
+    "FORMATS",
+    "export",
+    "get_sessions",
+    "iter_rows",
+]
+
+FORMATS = ("ndjson", "csv")
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# number of sessions to fetch and load references for at a time
+CHUNK_SIZE = 500
+
+# peer session serializer fields that are exported, in column order
+
+EXPORT_FIELDS = [
+    "id",
+    "status",
+    "peer_session_type",
+    "peer_asn",
+    "peer_name",
+    "peer_type",
+    "port_display_name",
+    "port_is_ix",
+    "port_interface",
+    "device_name",
+    "facility_slug",
+    "ip4",
+    "ip6",
+    "peer_ip4",
+    "peer_ip6",
+    "policy4_name",
+    "policy4_inherited",
+    "policy4_import",
+    "policy4_export",
+    "policy4_peer_group",
+    "policy4_max_prefixes",
+    "policy6_name",
+    "policy6_inherited",
+    "policy6_import",
+    "policy6_export",
+    "policy6_peer_group",
+    "policy6_max_prefixes",
+    "meta4",
+    "meta6",
+]
+
+
+def get_sessions(net):
+    """
+    Returns a queryset of the exportable peer sessions of a network
+    ordered by id
+    """
+
+    return (
+        net.peer_session_set.filter(status__in=["ok", "configured"])
+        .select_related(
+            "peer_port",
+            "peer_port__port_info",
+            "peer_port__peer_net",
+            "peer_port__peer_net__peer",
+        )
+        .order_by("id")
+    )
+
+
+def iter_chunks(sessions, chunk_size):
+    chunk = []
+
+    for session in sessions.iterator(chunk_size=chunk_size):
+        chunk.append(session)
+
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def iter_rows(sessions, chunk_size=CHUNK_SIZE):
+    """
+    Yields the serialized export rows of the sessions
+
+    Arguments:
+        - sessions <QuerySet>: see `get_sessions`
+
+    Keyword Arguments:
+        - chunk_size <int>: number of sessions to fetch and load
+          references for at a time
+
+    Yields:
+        - dict: `EXPORT_FIELDS` -> value
+    """
+
+    serializer = Serializers.peer_session(
+        context={"fieldset": Fieldset(fields=EXPORT_FIELDS)}
+    )
+
+    for chunk in iter_chunks(sessions, chunk_size):
+        PeerSession.load_references(chunk)
+
+        for session in chunk:
+            row = serializer.to_representation(session)
+            yield {field: row.get(field) for field in EXPORT_FIELDS}
+
+
+def render_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+def render_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(EXPORT_FIELDS)
+    yield flush()
+
+    for row in rows:
+        writer.writerow(
+            [
+                (
+                    json.dumps(value, cls=DjangoJSONEncoder)
+                    if isinstance(value, (dict, list))
+                    else value
+                )
+                for value in row.values()
+            ]
+        )
+        yield flush()
+
+
+def export(sessions, export_format="ndjson", chunk_size=CHUNK_SIZE):
+    """
+    Yields the sessions rendered in the specified format
+
+    Arguments:
+        - sessions <QuerySet>: see `get_sessions`
+
+    Keyword Arguments:
+        - export_format <str>: "ndjson" or "csv", meta4 and meta6 are
+          json encoded in csv
+        - chunk_size <int>: see `iter_rows`
+
+    Yields:
+        - str: one line per session (csv has a header line)
+    """
+
+    if export_format not in FORMATS:
+        raise ValueError(f"Invalid export format: {export_format}")
+
+    rows = iter_rows(sessions, chunk_size=chunk_size)
+
+    if export_format == "csv":
+        return render_csv(rows)
+
+    return render_ndjson(rows)
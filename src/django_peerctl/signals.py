@@ -1,13 +1,29 @@
+import fullctl.service_bridge.ixctl as ixctl
+import fullctl.service_bridge.pdbctl as pdbctl
+import reversion
 from django.contrib.auth.signals import user_logged_in, user_logged_out
-from django.db.models.signals import pre_save
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
+from django_peerctl import bridge_cache, events, subnet_index
 from django_peerctl.models import (
     DeviceTemplate,
     EmailTemplate,
+    Network,
+    NetworkDataVersion,
+    PeerNetwork,
+    PeerPort,
+    PeerRequest,
     PeerSession,
+    Policy,
+    PolicyPeerGroup,
+    PortInfo,
+    PortPolicy,
     UserSession,
 )
+from django_peerctl.replica import exchange_members_changed
+from django_peerctl.search import fill_network_names, fill_port_infos, sync_port_infos
 
 
 @receiver(user_logged_in)
@@ -61,6 +77,27 @@ def set_session_device(sender, **kwargs):
     session.device = session.port.object.device_id
 
 
+@receiver(pre_save, sender=PeerSession)
+def set_session_created_by(sender, **kwargs):
+    """
+    When a PeerSession is created inside a revision block we
+    record the revision user as its creator
+    """
+
+    session = kwargs.get("instance")
+
+    if not session or session.pk or session.created_by_id:
+        return
+
+    if not reversion.is_active():
+        return
+
+    user = reversion.get_user()
+
+    if user and user.is_authenticated:
+        session.created_by = user
+
+
 @receiver(pre_save, sender=EmailTemplate)
 def change_default_email_template(sender, **kwargs):
     """
@@ -97,3 +134,178 @@ def change_default_device_template(sender, **kwargs):
         DeviceTemplate.objects.filter(type=device_template.type).exclude(
             pk=device_template.pk
         ).update(default=False)
+
+
+def data_version_net_ids(instance):
+    """
+    Returns the ids of the networks whose data version a change to
+    the instance affects
+    """
+
+    try:
+        if isinstance(instance, Network):
+            return [instance.id]
+        if isinstance(instance, (PeerNetwork, PortInfo, Policy, PolicyPeerGroup)):
+            return [instance.net_id]
+        if isinstance(instance, PeerPort):
+            return [instance.peer_net.net_id]
+        if isinstance(instance, PeerSession):
+            return [instance.peer_port.peer_net.net_id]
+        if isinstance(instance, PortPolicy):
+            return PortInfo.objects.filter(port=instance.port).values_list(
+                "net_id", flat=True
+            )
+    except ObjectDoesNotExist:
+        # parent was deleted in the same cascade, it bumps the
+        # version itself
+        pass
+
+    return []
+
+
+@receiver(post_save, sender=Network)
+@receiver(post_save, sender=PeerNetwork)
+@receiver(post_save, sender=PeerPort)
+@receiver(post_save, sender=PeerSession)
+@receiver(post_save, sender=Policy)
+@receiver(post_save, sender=PolicyPeerGroup)
+@receiver(post_save, sender=PortInfo)
+@receiver(post_save, sender=PortPolicy)
+@receiver(post_delete, sender=PeerNetwork)
+@receiver(post_delete, sender=PeerPort)
+@receiver(post_delete, sender=PeerSession)
+@receiver(post_delete, sender=Policy)
+@receiver(post_delete, sender=PolicyPeerGroup)
+@receiver(post_delete, sender=PortInfo)
+@receiver(post_delete, sender=PortPolicy)
+def bump_data_version(sender, instance, **kwargs):
+    """
+    When the sessions, peers, ports or policies of a network change
+    we bump its data version, invalidating its cached responses
+    """
+
+    NetworkDataVersion.bump(data_version_net_ids(instance))
+
+
+@receiver(post_save, sender=Network)
+def sync_network_search_name(sender, instance, **kwargs):
+    """
+    When a Network without a search name is saved we fill it from
+    the pdbctl network replica (networks that are not replicated yet
+    are filled by `task_sync_search_index`)
+    """
+
+    if not instance.search_name:
+        fill_network_names(Network.objects.filter(id=instance.id))
+
+
+@receiver(post_save, sender=PortInfo)
+def sync_port_info_search_index(sender, instance, **kwargs):
+    """
+    When a PortInfo is saved we fill its search ip addresses and
+    exchange name from its own ip addresses and the exchange member
+    replica (written with a bulk update, which does not trigger this
+    signal again)
+
+    No service bridge requests are made here, references that are
+    not replicated yet are filled by `task_sync_search_index`
+    """
+
+    fill_port_infos([instance])
+
+
+def event_action(created, signal=None, **kwargs):
+    if signal is post_delete:
+        return "deleted"
+    return "created" if created else "updated"
+
+
+@receiver(post_save, sender=PeerSession)
+@receiver(post_delete, sender=PeerSession)
+def publish_peer_session_event(sender, instance, created=False, **kwargs):
+    """
+    When a PeerSession changes we publish an event to the owning
+    network's events
+    """
+
+    try:
+        net_id = instance.peer_port.peer_net.net_id
+        data = events.peer_session_event(instance)
+    except ObjectDoesNotExist:
+        # deleted along with its peer port, nothing to publish
+        return
+
+    action = event_action(created, **kwargs)
+
+    events.publish(net_id, "peer_session", action, instance.id, data)
+
+
+@receiver(post_save, sender=PeerRequest)
+@receiver(post_delete, sender=PeerRequest)
+def publish_peer_request_event(sender, instance, created=False, **kwargs):
+    """
+    When a PeerRequest changes we publish an event to the requesting
+    network's events
+    """
+
+    action = event_action(created, **kwargs)
+
+    events.publish(
+        instance.net_id,
+        "peer_request",
+        action,
+        instance.id,
+        events.peer_request_event(instance),
+    )
+
+
+@receiver(exchange_members_changed)
+def reconcile_exchange_members(sender, events, **kwargs):
+    """
+    When exchange members move or their ip addresses change we
+    point the port infos of moved members at the new member and
+    re-sync the search columns of the affected port infos
+
+    Sessions resolve their peer ip addresses through the port info,
+    so they follow along.
+    """
+
+    ref_ids = set()
+
+    for event in events:
+        if event["type"] == "moved":
+            # skip networks that already have a port info for the new member
+
+            PortInfo.objects.filter(ref_id=event["previous_ref_id"]).exclude(
+                net__in=PortInfo.objects.filter(ref_id=event["ref_id"]).values("net")
+            ).update(ref_id=event["ref_id"])
+
+            ref_ids.add(event["ref_id"])
+
+        elif event["type"] == "ip_changed":
+            ref_ids.add(event["ref_id"])
+
+    if not ref_ids:
+        return
+
+    bridge_cache.invalidate(ixctl.InternetExchangeMember, pdbctl.NetworkIXLan)
+
+    # ports are created from member ip addresses (`devicectl_create_devices`)
+
+    subnet_index.invalidate()
+
+    sync_port_infos(PortInfo.objects.filter(ref_id__in=ref_ids))
+
+    # port infos were updated in bulk, bump the networks that own
+    # them or peer through them
+
+    NetworkDataVersion.bump(
+        set(
+            PortInfo.objects.filter(ref_id__in=ref_ids).values_list("net_id", flat=True)
+        )
+        | set(
+            PeerPort.objects.filter(port_info__ref_id__in=ref_ids).values_list(
+                "peer_net__net_id", flat=True
+            )
+        )
+    )
@@ -1,7 +1,16 @@
+import fullctl.service_bridge.pdbctl as pdbctl
 from django.contrib.auth import get_user_model
 
-from django_peerctl.exceptions import ReferenceNotFoundError
-from django_peerctl.models import InternetExchange, PeerNetwork, PeerSession
+from django_peerctl import bridge_cache
+from django_peerctl.models import InternetExchange, PeerNetwork, PeerSession, SiteStats
+
+# number of objects to load references for per batch
+BATCH_SIZE = 500
+
+
+def batched(items, size=BATCH_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
 
 
 def count_peer_session():
@@ -12,27 +21,33 @@ def count_peer_session():
         - ip4: peer sessions where both sides have ip4 set
         - ip6: peer sessions where both sides have ip6 set
 
+    The ip4 and ip6 counts depend on devicectl and ixctl / pdbctl data,
+    references are loaded in batches of `BATCH_SIZE` sessions
     """
 
-    qset = PeerSession.objects.filter(status="ok").select_related(
-        "peer_port__port_info", "port__port_info"
-    )
-    count = 0
+    qset = PeerSession.objects.filter(status="ok")
+    ids = list(qset.values_list("id", flat=True))
+
     count_ip4 = 0
     count_ip6 = 0
-    for peer_session in qset:
-        if (
-            peer_session.peer_port.port_info.ipaddr6
-            and peer_session.port.port_info.ipaddr6
-        ):
-            count_ip6 += 1
-        if (
-            peer_session.peer_port.port_info.ipaddr4
-            and peer_session.port.port_info.ipaddr4
-        ):
-            count_ip4 += 1
-        count += 1
-    return {"all": count, "ip4": count_ip4, "ip6": count_ip6}
+
+    for batch in batched(ids):
+        sessions = list(
+            PeerSession.objects.filter(id__in=batch).select_related(
+                "peer_port__port_info", "peer_port__peer_net__peer"
+            )
+        )
+        PeerSession.load_references(sessions)
+
+        for peer_session in sessions:
+            if not peer_session.port or not peer_session.port.id:
+                continue
+            if peer_session.peer_ip6 and peer_session.ip6:
+                count_ip6 += 1
+            if peer_session.peer_ip4 and peer_session.ip4:
+                count_ip4 += 1
+
+    return {"all": len(ids), "ip4": count_ip4, "ip6": count_ip6}
 
 
 def count_peers():
@@ -40,46 +55,108 @@ def count_peers():
     count peer networks and return a map with the following statistics
 
         - all: all peer networks
-        - scope: counts per scope
-        - type: counts per type
+        - scope: unique peer asns per scope
+        - type: unique peer asns per type
+
+    The scope and type breakdowns depend on pdbctl data, networks
+    are requested in batches of `BATCH_SIZE` asns
     """
 
+    qset = PeerNetwork.objects.filter(status="ok")
+    asns = sorted(set(qset.values_list("peer__asn", flat=True)))
+
     peers_by_scope = {}
     peers_by_type = {}
-    qset = PeerNetwork.objects.filter(status="ok")
 
-    for peer_net in qset:
-        try:
-            scope = peer_net.net.pdb.info_scope
-            typ = peer_net.net.pdb.info_type
-            if scope not in peers_by_scope:
-                peers_by_scope[scope] = []
-            if typ not in peers_by_type:
-                peers_by_type[typ] = []
-            peers_by_scope[scope].append(peer_net.net.asn)
-            peers_by_type[typ].append(peer_net.net.asn)
-        except ReferenceNotFoundError:
-            pass
+    for batch in batched(asns):
+        for net in bridge_cache.cached_objects(pdbctl.Network(), asns=batch):
+            peers_by_scope[net.info_scope] = peers_by_scope.get(net.info_scope, 0) + 1
+            peers_by_type[net.info_type] = peers_by_type.get(net.info_type, 0) + 1
 
     def sort(x):
-        return x[0]
+        return x[0] or ""
 
     return {
         "all": qset.count(),
-        "scope": sorted(
-            ((scope, len(set(asns))) for scope, asns in peers_by_scope.items()),
-            key=sort,
-        ),
-        "type": sorted(
-            ((typ, len(set(asns))) for typ, asns in peers_by_type.items()), key=sort
-        ),
+        "scope": sorted(peers_by_scope.items(), key=sort),
+        "type": sorted(peers_by_type.items(), key=sort),
     }
 
 
-def site_stats():
+def count_totals():
+    """
+    Returns the counts that can be aggregated in the database
+    """
+
     return {
         "user": get_user_model().objects.filter(is_active=True).count(),
         "ix": InternetExchange.objects.filter(status="ok").count(),
-        "peers": count_peers(),
-        "peer_session": count_peer_session(),
+        "peers": PeerNetwork.objects.filter(status="ok").count(),
+        "peer_session": PeerSession.objects.filter(status="ok").count(),
+    }
+
+
+def create_snapshot():
+    """
+    Collects all site statistics and stores them as a SiteStats
+    snapshot
+
+    This is expensive as it loads service bridge references
+    for all peer sessions and peer networks and should be called
+    from the `task_update_site_stats` task
+    """
+
+    totals = count_totals()
+    peers = count_peers()
+    peer_sessions = count_peer_session()
+
+    return SiteStats.objects.create(
+        users=totals["user"],
+        ix=totals["ix"],
+        peers=peers["all"],
+        peer_sessions=peer_sessions["all"],
+        peer_sessions_ip4=peer_sessions["ip4"],
+        peer_sessions_ip6=peer_sessions["ip6"],
+        peers_by_scope=peers["scope"],
+        peers_by_type=peers["type"],
+    )
+
+
+def site_stats():
+    """
+    Returns the most recent site stats snapshot
+
+    If no snapshot exists yet only the database aggregated counts are
+    returned and the breakdowns are empty
+    """
+
+    snapshot = SiteStats.latest()
+
+    if snapshot:
+        return snapshot.data
+
+    totals = count_totals()
+
+    return {
+        "user": totals["user"],
+        "ix": totals["ix"],
+        "peers": {"all": totals["peers"], "scope": [], "type": []},
+        "peer_session": {"all": totals["peer_session"], "ip4": 0, "ip6": 0},
+        "created": None,
     }
+
+
+def history(since=None):
+    """
+    Returns site stats snapshots ordered by creation date
+
+    Keyword Arguments:
+        - since <datetime>: only return snapshots created after this
+    """
+
+    qset = SiteStats.objects.order_by("id")
+
+    if since:
+        qset = qset.filter(created__gt=since)
+
+    return [snapshot.data for snapshot in qset]
@@ -0,0 +1,153 @@
+"""
+Prefix index to look up the ports of a device that cover an ip address
+
+The networks of a device's port interfaces are stored in a binary
+prefix trie per ip version, so a lookup walks at most prefix length
+nodes instead of parsing every port's interface.
+
+Indexes are cached per process for `SUBNET_INDEX_TTL` seconds and keyed
+by the `devicectl.Port` service bridge cache generation. `invalidate()`
+bumps the generation, which invalidates the indexes of all processes,
+and is called wherever peerctl changes ports or the member ip
+addresses ports are created from. Port changes made directly in
+devicectl are only picked up once the index expires, so the ttl is
+kept short.
+"""
+
+import collections
+import ipaddress
+import threading
+import time
+
+from django.conf import settings
+
+from django_peerctl import bridge_cache
+
+__all__ = [
+    "PrefixTrie",
+    "SubnetIndex",
+    "get_index",
+    "clear",
+    "invalidate",
+]
+
+# max number of device indexes kept in memory
+MAX_INDEXES = 1024
+
+_lock = threading.Lock()
+_indexes = collections.OrderedDict()
+
+
+class PrefixTrie:
+    """
+    Binary trie of ip networks for one ip version
+    """
+
+    def __init__(self, bits):
+        self.bits = bits
+        self.root = {}
+
+    def insert(self, network, value):
+        node = self.root
+        address = int(network.network_address)
+
+        for i in range(network.prefixlen):
+            bit = (address >> (self.bits - 1 - i)) & 1
+            node = node.setdefault(bit, {})
+
+        node.setdefault("values", []).append(value)
+
+    def lookup(self, ip):
+        """
+        Returns the values of all networks that contain `ip`, least
+        specific first
+        """
+
+        node = self.root
+        address = int(ip)
+        values = list(node.get("values", []))
+
+        for i in range(self.bits):
+            node = node.get((address >> (self.bits - 1 - i)) & 1)
+            if node is None:
+                break
+            values.extend(node.get("values", []))
+
+        return values
+
+
+class SubnetIndex:
+    """
+    Prefix index over the interface networks of a set of ports
+    """
+
+    def __init__(self, ports):
+        self.tries = {4: PrefixTrie(32), 6: PrefixTrie(128)}
+        self.created = time.time()
+
+        for position, port in enumerate(ports):
+            for version, address in ((4, port.ip_address_4), (6, port.ip_address_6)):
+                if not address:
+                    continue
+                network = ipaddress.ip_interface(address).network
+                self.tries[version].insert(network, (position, port))
+
+    def ports_for(self, ip):
+        """
+        Returns all ports whose interface network contains `ip`, in
+        the order the ports were indexed
+
+        Arguments:
+            - ip <str>: ip address, prefix length is ignored if present
+        """
+
+        ip = ipaddress.ip_address(str(ip).split("/")[0])
+        matches = self.tries[ip.version].lookup(ip)
+        return [port for _, port in sorted(matches, key=lambda match: match[0])]
+
+
+def get_index(org, device, load_ports):
+    """
+    Returns the (cached) subnet index for the ports of a device
+
+    Arguments:
+        - org <Organization>
+        - device <int>: devicectl device id
+        - load_ports <callable>: returns the ports of the device, called
+            when the index needs to be (re)built
+    """
+
+    ttl = getattr(settings, "SUBNET_INDEX_TTL", 0)
+    key = (org.slug, int(device), bridge_cache.generation("devicectl.Port"))
+
+    if ttl:
+        with _lock:
+            index = _indexes.get(key)
+            if index and time.time() - index.created < ttl:
+                _indexes.move_to_end(key)
+                return index
+
+    index = SubnetIndex(list(load_ports()))
+
+    if ttl:
+        with _lock:
+            _indexes[key] = index
+            while len(_indexes) > MAX_INDEXES:
+                _indexes.popitem(last=False)
+
+    return index
+
+
+def clear():
+    with _lock:
+        _indexes.clear()
+
+
+def invalidate():
+    """
+    Invalidates the subnet indexes of all processes (and the cached
+    devicectl port lookups)
+    """
+
+    bridge_cache.invalidate("devicectl.Port")
+    clear()
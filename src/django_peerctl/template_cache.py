@@ -0,0 +1,154 @@
+"""
+Process-wide cache for compiled jinja templates
+
+Compiled templates are kept in an LRU cache of `TEMPLATE_CACHE_SIZE`
+entries. Keys should contain everything that affects the compiled
+template (template id, body hash, template path and netom version),
+so edited templates or a netom upgrade simply result in new keys and
+stale entries fall out of the cache.
+
+Additionally jinja environments can use a bytecode cache on disk so
+compilation is also skipped for templates that are not in memory yet,
+e.g., after a process restart. Bytecode is loaded and executed from
+there, so the directory is jinja's private per-user directory unless
+`TEMPLATE_BYTECODE_CACHE_DIR` points to a directory only the service
+user can access.
+"""
+
+import collections
+import hashlib
+import logging
+import os
+import stat
+import threading
+
+from django.conf import settings
+from jinja2 import FileSystemBytecodeCache
+
+__all__ = [
+    "body_hash",
+    "bytecode_cache",
+    "clear",
+    "get_template",
+    "netom_version",
+    "stats",
+]
+
+_lock = threading.Lock()
+_templates = collections.OrderedDict()
+_stats = {"hit": 0, "miss": 0}
+_bytecode_cache = {}
+
+log = logging.getLogger(__name__)
+
+
+def netom_version():
+    """
+    Returns the version of the installed netom package
+    """
+
+    import netom
+
+    return getattr(netom, "__version__", "")
+
+
+def body_hash(body):
+    return hashlib.sha1((body or "").encode("utf-8")).hexdigest()
+
+
+def is_private_directory(directory):
+    """
+    Creates the directory (mode 0700) if it does not exist and returns
+    whether it is a directory owned by the current user that nobody
+    else can access
+    """
+
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+
+    return (
+        stat.S_ISDIR(info.st_mode)
+        and info.st_uid == os.getuid()
+        and not info.st_mode & 0o077
+    )
+
+
+def bytecode_cache():
+    """
+    Returns the jinja bytecode cache to use for template environments
+
+    Uses jinja's private per-user cache directory unless
+    `TEMPLATE_BYTECODE_CACHE_DIR` is set
+
+    Returns None if `TEMPLATE_BYTECODE_CACHE_ENABLED` is not set or
+    `TEMPLATE_BYTECODE_CACHE_DIR` is not private to the current user
+    """
+
+    if not getattr(settings, "TEMPLATE_BYTECODE_CACHE_ENABLED", False):
+        return None
+
+    directory = getattr(settings, "TEMPLATE_BYTECODE_CACHE_DIR", None) or None
+
+    if directory not in _bytecode_cache:
+        if directory and not is_private_directory(directory):
+            log.warning(
+                f"bytecode cache disabled, {directory} is not a directory "
+                "private to the service user"
+            )
+            _bytecode_cache[directory] = None
+        else:
+            _bytecode_cache[directory] = FileSystemBytecodeCache(directory)
+
+    return _bytecode_cache[directory]
+
+
+def get_template(key, build):
+    """
+    Returns the compiled template for `key`, calling `build` to
+    compile it on a miss
+
+    Arguments:
+        - key <tuple>
+        - build <callable>: returns a jinja template
+    """
+
+    size = getattr(settings, "TEMPLATE_CACHE_SIZE", 0)
+
+    if not size:
+        return build()
+
+    with _lock:
+        template = _templates.get(key)
+        if template is not None:
+            _templates.move_to_end(key)
+            _stats["hit"] += 1
+            return template
+        _stats["miss"] += 1
+
+    # compile outside of the lock, concurrent misses for the same
+    # key just compile the template twice
+    template = build()
+
+    with _lock:
+        _templates[key] = template
+        _templates.move_to_end(key)
+        while len(_templates) > size:
+            _templates.popitem(last=False)
+
+    return template
+
+
+def clear():
+    with _lock:
+        _templates.clear()
+        _stats.update(hit=0, miss=0)
+
+
+def stats():
+    """
+    Returns hit and miss counters and the number of cached templates
+    for the current process
+    """
+
+    with _lock:
+        return dict(_stats, size=len(_templates))
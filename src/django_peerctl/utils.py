@@ -3,12 +3,12 @@ import ipaddress
 import fullctl.service_bridge.devicectl as devicectl
 import fullctl.service_bridge.ixctl as ixctl
 import fullctl.service_bridge.pdbctl as pdbctl
-import fullctl.service_bridge.sot as sot
 from django.db import IntegrityError
 from grainy.const import PERM_READ
 
+from django_peerctl import bridge_cache, subnet_index
 from django_peerctl.exceptions import ASNClaimed
-from django_peerctl.models import Network, PortInfo
+from django_peerctl.models import ExchangeMember, Network, PortInfo
 
 
 def get_network(asn, org):
@@ -92,7 +92,13 @@ def devicectl_create_devices(org, verified_asns):
     required_port_infos = {}
     networks = {}
 
-    for member in sot.InternetExchangeMember().objects(asns=verified_asns, join="ix"):
+    members = [
+        member
+        for asn_members in ExchangeMember.refs(verified_asns).values()
+        for member in asn_members
+    ]
+
+    for member in members:
         if member.asn not in networks:
             try:
                 networks[member.asn] = get_network(member.asn, org)
@@ -118,6 +124,12 @@ def devicectl_create_devices(org, verified_asns):
     _ports = devicectl.Port().request_dummy_ports(
         org.slug, required_ports, "peerctl", device_type="junos"
     )
+
+    # devices and ports may have been created, drop cached device and
+    # port lookups and port subnet indexes
+
+    bridge_cache.invalidate(devicectl.Device)
+    subnet_index.invalidate()
     ports = {}
 
     # re-arrange ports by ip address, using ip4 if its set and
@@ -43,6 +43,7 @@ INSTALLED_APPS += (
     "fullctl.django.apps.DjangoFullctlConfig",
     "django_peerctl.apps.DjangoPeerctlConfig",
     "netfields",
+    "django.contrib.postgres",
 )
 
 TEMPLATES[0]["OPTIONS"]["context_processors"] += [
@@ -130,6 +131,40 @@ settings_manager.set_option(
     "NETOM_TEMPLATE_DIR", os.path.join(NETOM_DIR, "templates", "netom0")
 )
 
+# number of compiled templates kept in memory per process (0 disables)
+settings_manager.set_option("TEMPLATE_CACHE_SIZE", 256)
+
+# jinja bytecode cache, stored in jinja's private per-user directory
+# unless TEMPLATE_BYTECODE_CACHE_DIR is set, which needs to be owned by
+# the service user and not accessible to anyone else
+settings_manager.set_bool("TEMPLATE_BYTECODE_CACHE_ENABLED", True)
+settings_manager.set_option("TEMPLATE_BYTECODE_CACHE_DIR", "")
+
+# size of the process pool used by the bulk device config api,
+# renders in the request process if 1
+settings_manager.set_option("DEVICE_CONFIG_BULK_PROCESSES", 1)
+
+# seconds a device's port subnet index is cached per process (0 disables),
+# indexes are invalidated when peerctl changes ports, this bounds how long
+# port changes made directly in devicectl take to show up
+settings_manager.set_option("SUBNET_INDEX_TTL", 60)
+
+# max number of sessions per bulk peer session update request
+settings_manager.set_option("PEER_SESSION_BULK_MAX", 5000)
+
+# default and max page size for paginated session summary requests
+settings_manager.set_option("SESSIONS_SUMMARY_PAGE_SIZE", 100)
+settings_manager.set_option("SESSIONS_SUMMARY_PAGE_SIZE_MAX", 1000)
+
+# max number of search results per type and the min trigram similarity
+# for a name to match
+settings_manager.set_option("SEARCH_LIMIT", 25)
+settings_manager.set_option("SEARCH_SIMILARITY_THRESHOLD", 0.3)
+
+# seconds a peering opportunity report is cached, reports are also
+# recomputed when our memberships or peer sessions change
+settings_manager.set_option("PEERING_OPPORTUNITIES_CACHE_TTL", 86400)
+
 # EMAIL SETTINGS
 
 settings_manager.set_option("PEER_REQUEST_FROM_EMAIL", NO_REPLY_EMAIL)
@@ -143,6 +178,66 @@ AUTOPEER_ENABLED_NETWORKS = {
 
 settings_manager.set_option("AUTOPEER_ENABLED", False)
 
+# autopeer request status is polled from a rescheduled task, starting
+# at AUTOPEER_POLL_INTERVAL seconds and backing off up to
+# AUTOPEER_POLL_INTERVAL_MAX seconds between polls
+
+settings_manager.set_option("AUTOPEER_POLL_INTERVAL", 3)
+settings_manager.set_option("AUTOPEER_POLL_INTERVAL_MAX", 60)
+
+# fail an autopeer request if its sessions are not ready after this
+# many seconds
+
+settings_manager.set_option("AUTOPEER_POLL_TIMEOUT", 900)
+
+# autopeer api http client timeouts (seconds) and retries on
+# connection errors and 5xx responses
+
+settings_manager.set_option("AUTOPEER_CONNECT_TIMEOUT", 5)
+settings_manager.set_option("AUTOPEER_READ_TIMEOUT", 30)
+settings_manager.set_option("AUTOPEER_RETRIES", 3)
+settings_manager.set_option("AUTOPEER_RETRY_BACKOFF", 0.5)
+
+# SERVICE BRIDGE CACHE
+
+# cache pdbctl / ixctl / devicectl lookups in the django cache
+settings_manager.set_bool("BRIDGE_CACHE_ENABLED", True)
+settings_manager.set_option("BRIDGE_CACHE_ALIAS", "default")
+
+# ttl (seconds) for bridges not listed in BRIDGE_CACHE_TTL
+settings_manager.set_option("BRIDGE_CACHE_TTL_DEFAULT", 300)
+
+# ttl (seconds) per bridge class
+BRIDGE_CACHE_TTL = {
+    "pdbctl.Network": 3600,
+    "pdbctl.NetworkContact": 3600,
+    "pdbctl.InternetExchange": 3600,
+    "ixctl.InternetExchange": 900,
+    "devicectl.Device": 300,
+}
+
+# RESPONSE CACHE
+
+# cache the port, session summary, policy and peer list responses,
+# keyed by the network's data version
+settings_manager.set_bool("RESPONSE_CACHE_ENABLED", True)
+settings_manager.set_option("RESPONSE_CACHE_ALIAS", "default")
+
+# ttl (seconds) of cached responses, bounds how long changes to
+# devicectl / pdbctl / ixctl data can take to show up
+settings_manager.set_option("RESPONSE_CACHE_TTL", 60)
+
+# EVENTS
+
+# seconds before an event is returned to clients polling the events
+# endpoint, needs to cover the time between an event getting its id
+# and its commit (and clock differences between app hosts) so a
+# client advancing past an id never skips a late committing event
+settings_manager.set_option("EVENTS_COMMIT_LAG", 5)
+
+# seconds events are kept for clients to resume from
+settings_manager.set_option("EVENTS_TTL", 3600)
+
 # FINALIZE
 settings_manager.set_default_append()
 
@@ -0,0 +1,118 @@
+"""
+Local stand-in for a remote autopeer api
+
+Serves `list_locations`, `add_sessions` and `get_status` from memory
+on a random local port, records every request and can inject faults
+(error responses, slow responses) to test `AutopeerClient` against.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+class AutopeerServer:
+    def __init__(self):
+        self.requests = []
+        self.sessions = []
+        self.faults = []
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.handler_class())
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/v0"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def fail(self, status=None, delay=None, count=1):
+        """
+        Queues faults for the next `count` requests
+
+        Keyword Arguments:
+            - status <int>: respond with this status without processing
+              the request
+            - delay <float>: process the request, then wait this many
+              seconds before responding (e.g., to cause a read timeout
+              after the remote side already acted on the request)
+        """
+
+        with self.lock:
+            self.faults.extend([{"status": status, "delay": delay}] * count)
+
+    def endpoint_count(self, method, endpoint):
+        return len(
+            [
+                request
+                for request in self.requests
+                if request[0] == method and request[1].endswith(f"/{endpoint}")
+            ]
+        )
+
+    def handle(self, method, path, body):
+        with self.lock:
+            self.requests.append((method, path, body))
+            fault = self.faults.pop(0) if self.faults else {}
+
+        if fault.get("status"):
+            return fault["status"], {"error": "injected fault"}
+
+        endpoint = path.rstrip("/").split("/")[-1]
+
+        if method == "GET" and endpoint == "list_locations":
+            status, data = 200, {"items": []}
+        elif method == "POST" and endpoint == "add_sessions":
+            with self.lock:
+                self.sessions.extend(body.get("sessions", []))
+            status, data = 200, {"request_id": "standin", "sessions": body["sessions"]}
+        elif method == "GET" and endpoint == "get_status":
+            status, data = 200, {"request_id": "standin", "sessions": self.sessions}
+        else:
+            status, data = 404, {"error": "not found"}
+
+        if fault.get("delay"):
+            time.sleep(fault["delay"])
+
+        return status, data
+
+    def handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def respond(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else {}
+                status, data = server.handle(method, urlparse(self.path).path, body)
+
+                payload = json.dumps(data).encode("utf-8")
+
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    # client gave up (timeout)
+                    pass
+
+            def do_GET(self):
+                self.respond("GET")
+
+            def do_POST(self):
+                self.respond("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
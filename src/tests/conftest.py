@@ -1 +1,13 @@
-import pytest  # noqa: F401
+import pytest
+
+from .autopeer_server import AutopeerServer
+
+
+@pytest.fixture
+def autopeer_server():
+    """
+    Local stand-in for an autopeer api, see `AutopeerServer`
+    """
+
+    with AutopeerServer() as server:
+        yield server
@@ -0,0 +1,86 @@
+import socket
+
+import pytest
+
+from django_peerctl.autopeer import client
+from django_peerctl.autopeer.client import AutopeerClient, AutopeerError
+
+SESSIONS = {"sessions": [{"local_asn": 63311, "peer_asn": 13335}]}
+
+
+@pytest.fixture(autouse=True)
+def clear_stats():
+    client.clear()
+    yield
+    client.clear()
+
+
+def make_client(url, read_timeout=2):
+    return AutopeerClient(url, timeout=(1, read_timeout), retries=2, backoff=0)
+
+
+def test_get(autopeer_server):
+    assert make_client(autopeer_server.url).get("list_locations") == {"items": []}
+
+
+def test_get_retried_on_5xx(autopeer_server):
+    autopeer_server.fail(status=503)
+
+    assert make_client(autopeer_server.url).get("list_locations") == {"items": []}
+    assert autopeer_server.endpoint_count("GET", "list_locations") == 2
+
+
+def test_get_retried_on_read_timeout(autopeer_server):
+    autopeer_server.fail(delay=0.5)
+
+    make_client(autopeer_server.url, read_timeout=0.2).get("list_locations")
+    assert autopeer_server.endpoint_count("GET", "list_locations") == 2
+
+
+def test_get_fails_after_retries(autopeer_server):
+    autopeer_server.fail(status=503, count=3)
+
+    with pytest.raises(AutopeerError) as exc:
+        make_client(autopeer_server.url).get("list_locations")
+
+    assert exc.value.response.status_code == 503
+    assert autopeer_server.endpoint_count("GET", "list_locations") == 3
+
+
+def test_post_not_retried_on_5xx(autopeer_server):
+    autopeer_server.fail(status=503)
+
+    with pytest.raises(AutopeerError):
+        make_client(autopeer_server.url).post("add_sessions", json=SESSIONS)
+
+    assert autopeer_server.endpoint_count("POST", "add_sessions") == 1
+
+
+def test_post_not_retried_on_read_timeout(autopeer_server):
+    # the remote side creates the sessions, but responds too late
+
+    autopeer_server.fail(delay=0.5)
+
+    with pytest.raises(AutopeerError):
+        make_client(autopeer_server.url, read_timeout=0.2).post(
+            "add_sessions", json=SESSIONS
+        )
+
+    assert autopeer_server.endpoint_count("POST", "add_sessions") == 1
+    assert autopeer_server.sessions == SESSIONS["sessions"]
+
+
+def test_post_retried_on_connection_refused():
+    # reserve a free port, then close it so connections are refused
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    with pytest.raises(AutopeerError):
+        make_client(f"http://127.0.0.1:{port}/v0").post("add_sessions", json=SESSIONS)
+
+    stats = client.stats()["add_sessions"]
+    assert stats["count"] == 3
+    assert stats["errors"] == 3
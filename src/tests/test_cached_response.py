@@ -0,0 +1,73 @@
+import pytest
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from django_peerctl.rest.decorators import cached_response
+
+ASN = 63311
+
+ROWS = [{"id": i} for i in range(1, 5)]
+
+
+@pytest.fixture(autouse=True)
+def response_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    settings.RESPONSE_CACHE_ENABLED = True
+    settings.RESPONSE_CACHE_ALIAS = "default"
+    settings.RESPONSE_CACHE_TTL = 60
+
+
+class Viewset:
+    """
+    Paginates `ROWS` two at a time, cursors are returned in a `Link`
+    header like `SessionCursorPagination` does
+    """
+
+    calls = 0
+
+    @cached_response("test")
+    def list(self, request, asn=None):
+        Viewset.calls += 1
+
+        page = int(request.query_params.get("cursor", 1))
+        links = []
+
+        if page < 2:
+            links.append(f'<http://testserver/?cursor={page + 1}>; rel="next"')
+        if page > 1:
+            links.append(f'<http://testserver/?cursor={page - 1}>; rel="prev"')
+
+        return Response(
+            ROWS[(page - 1) * 2 : page * 2], headers={"Link": ", ".join(links)}
+        )
+
+
+def get(query):
+    request = Request(APIRequestFactory().get("/", query))
+    return Viewset().list(request, asn=ASN)
+
+
+@pytest.mark.django_db
+def test_pages_keep_link_header():
+    Viewset.calls = 0
+
+    first = get({"page_size": 2})
+    assert first.data == ROWS[:2]
+    assert first["Link"] == '<http://testserver/?cursor=2>; rel="next"'
+
+    second = get({"page_size": 2, "cursor": 2})
+    assert second.data == ROWS[2:]
+    assert second["Link"] == '<http://testserver/?cursor=1>; rel="prev"'
+
+    assert first["ETag"] != second["ETag"]
+
+    # served from the cache with the link header
+
+    cached = get({"page_size": 2})
+    assert Viewset.calls == 2
+    assert cached.data == ROWS[:2]
+    assert cached["Link"] == first["Link"]
+    assert cached["ETag"] == first["ETag"]
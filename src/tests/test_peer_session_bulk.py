@@ -0,0 +1,80 @@
+import pytest
+
+from django_peerctl.models import (
+    Network,
+    Organization,
+    PeerSession,
+    Port,
+    PortObject,
+)
+from django_peerctl.peer_session_bulk import PeerSessionBulkUpsert
+
+ASN = 63311
+
+
+@pytest.fixture
+def net(monkeypatch):
+    org = Organization.objects.create(name="Test", slug="test", remote_id=1)
+    net = Network.objects.create(asn=ASN, org=org, status="ok")
+
+    ports = [
+        PortObject(
+            id=1,
+            name="port1",
+            device_id=10,
+            device=None,
+            ip_address_4="192.0.2.1/24",
+            ip_address_6=None,
+        )
+    ]
+
+    monkeypatch.setattr(Port, "objects", lambda bridge, **filters: ports)
+
+    return net
+
+
+def row(**kwargs):
+    return dict(
+        {"peer_asn": 64500, "peer_session_type": "transit", "port": 1}, **kwargs
+    )
+
+
+@pytest.mark.django_db
+def test_bulk_mixed_rows(net):
+    results = PeerSessionBulkUpsert(
+        net,
+        [
+            row(peer_ip4="192.0.2.10"),
+            row(peer_ip4="192.0.2.300"),
+            row(peer_ip4=None),
+            row(peer_ip4="192.0.2.11", port=999),
+            "not a session",
+            row(peer_ip4="2001:db8::1"),
+            row(peer_ip4="192.0.2.12"),
+        ],
+    ).run()
+
+    assert [result["index"] for result in results] == list(range(7))
+    assert [result["status"] for result in results] == [
+        "created",
+        "error",
+        "error",
+        "error",
+        "error",
+        "error",
+        "created",
+    ]
+
+    assert "peer_ip4" in results[1]["errors"]
+    assert "non_field_errors" in results[2]["errors"]
+    assert "port" in results[3]["errors"]
+    assert "non_field_errors" in results[4]["errors"]
+    assert "peer_ip4" in results[5]["errors"]
+
+    sessions = PeerSession.objects.filter(peer_port__peer_net__net=net)
+
+    assert {session.id for session in sessions} == {
+        results[0]["id"],
+        results[6]["id"],
+    }
+    assert {int(session.device) for session in sessions} == {10}
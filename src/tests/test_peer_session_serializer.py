@@ -0,0 +1,203 @@
+import time
+import types
+
+import fullctl.service_bridge.ixctl as ixctl
+import fullctl.service_bridge.pdbctl as pdbctl
+import pytest
+from rest_framework import serializers
+
+from django_peerctl import bridge_cache
+from django_peerctl.models import (
+    Network,
+    PeerNetwork,
+    PeerPort,
+    PeerSession,
+    Policy,
+    PortInfo,
+    PortObject,
+)
+from django_peerctl.rest.fieldsets import Fieldset
+from django_peerctl.rest.serializers.peerctl import Serializers
+
+ASN = 63311
+
+SESSION_COUNT = 10000
+
+
+def generate(count):
+    """
+    Returns `count` unsaved peer sessions with their references (peer
+    networks, ports, devices, exchange members and policies) stubbed
+    the way `PeerSession.load_references` and `SessionPolicies.apply`
+    leave them, so serializing them never queries the database or a
+    service bridge
+    """
+
+    net_cls = pdbctl.Network.Meta.data_object_cls
+    member_cls = ixctl.InternetExchangeMember.Meta.data_object_cls
+
+    net = Network(id=1, asn=ASN)
+    policy = Policy(
+        id=1,
+        net=net,
+        name="default",
+        import_policy="AS63311-IN",
+        export_policy="AS63311-OUT",
+        peer_group="peers",
+    )
+
+    sessions = []
+
+    for i in range(1, count + 1):
+        peer = Network(id=i + 1, asn=64500 + i % 500)
+        peer._ref = net_cls(
+            id=i, asn=peer.asn, name=f"Peer {peer.asn}", info_prefixes4=100
+        )
+
+        port_info = PortInfo(id=i, net=net, port=i, ref_id=f"ixctl:{i}")
+        port_info._ref = member_cls(
+            id=i, asn=ASN, ix_id=(i % 100) + 1, ipaddr4=None, ipaddr6=None
+        )
+
+        peer_port_info = PortInfo(
+            id=count + i, net=peer, port=0, ref_id=f"ixctl:{count + i}"
+        )
+        peer_port_info._ref = member_cls(
+            id=count + i,
+            asn=peer.asn,
+            ix_id=(i % 100) + 1,
+            ipaddr4=f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+            ipaddr6=None,
+        )
+
+        port = PortObject(
+            id=i,
+            name=f"port{i}",
+            virtual_port_name=f"et-0/0/{i % 48}",
+            ip_address_4="10.255.0.1/16",
+            ip_address_6=None,
+            device_id=(i % 50) + 1,
+            device=types.SimpleNamespace(
+                id=(i % 50) + 1,
+                display_name=f"device{(i % 50) + 1}",
+                facility_slug="fac1",
+            ),
+        )
+        port._port_info = port_info
+
+        session = PeerSession(
+            id=i,
+            port=i,
+            peer_port=PeerPort(
+                id=i,
+                peer_net=PeerNetwork(
+                    id=i, net=net, peer=peer, md5="secret", info_prefixes6=10
+                ),
+                port_info=peer_port_info,
+                interface_name=f"ae{i % 8}",
+            ),
+            peer_session_type="ixp",
+            status="ok" if i % 10 else "disabled",
+        )
+        session.port._object = port
+        session._policy4 = policy
+        session._policy6 = None
+
+        sessions.append(session)
+
+    return net, sessions
+
+
+@pytest.fixture
+def stub_exchanges(monkeypatch):
+    monkeypatch.setattr(
+        bridge_cache,
+        "cached_object",
+        lambda bridge, id: types.SimpleNamespace(id=id, name=f"IX {id}"),
+    )
+
+
+def per_field(serializer, obj):
+    """
+    Serializes through each field's getter, the path taken before
+    `PeerSession.session_row`
+    """
+
+    return serializers.Serializer.to_representation(serializer, obj)
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        None,
+        ["id", "peer_asn", "policy4_name", "device_name"],
+        ["id", "status"],
+        ["id", "port_is_ix", "port_display_name"],
+    ],
+)
+def test_session_row_matches_getters(stub_exchanges, fields):
+    net, sessions = generate(20)
+
+    context = {"net": net}
+    if fields:
+        context["fieldset"] = Fieldset(fields=fields)
+
+    serializer = Serializers.peer_session(context=context)
+
+    if fields:
+        assert set(serializer.fields) == set(fields)
+
+    for session in sessions:
+        assert serializer.to_representation(session) == per_field(serializer, session)
+
+
+@pytest.mark.parametrize(
+    "fields,ratio",
+    [
+        # full rows rebuild the policy dict once per field on the
+        # per field path
+        (None, 0.8),
+        # sparse rows only compute the requested fields on either path
+        (["id", "peer_asn", "peer_name", "status"], 1.25),
+    ],
+)
+def test_serialization_cost(stub_exchanges, fields, ratio):
+    """
+    Per row cost of the per field getters and of the single pass
+    serializer at 10k sessions, best of three runs each
+    """
+
+    net, sessions = generate(SESSION_COUNT)
+
+    context = {"net": net}
+    if fields:
+        context["fieldset"] = Fieldset(fields=fields)
+
+    serializer = Serializers.peer_session(context=context)
+
+    timings = {}
+
+    for label, render in (
+        ("per field", lambda obj: per_field(serializer, obj)),
+        ("single pass", serializer.to_representation),
+    ):
+        runs = []
+
+        for _ in range(3):
+            start = time.perf_counter()
+
+            for session in sessions:
+                render(session)
+
+            runs.append(time.perf_counter() - start)
+
+        timings[label] = min(runs) / SESSION_COUNT
+
+    print(
+        ", ".join(
+            f"{label}: {elapsed * 1000000:.0f}us per row"
+            for label, elapsed in timings.items()
+        )
+    )
+
+    assert timings["single pass"] < timings["per field"] * ratio
@@ -0,0 +1,77 @@
+import time
+import types
+
+import fullctl.service_bridge.ixctl as ixctl
+import pytest
+
+from django_peerctl.models import ExchangeMember, Port, PortInfo, PortObject
+
+ASN = 63311
+
+
+def generate(count):
+    """
+    Returns devicectl ports, exchange members (one per port) and
+    unsaved port infos for `count` synthetic ports
+    """
+
+    member_cls = ixctl.InternetExchangeMember.Meta.data_object_cls
+
+    ports = []
+    members = []
+    port_infos = {}
+
+    for i in range(1, count + 1):
+        ports.append(
+            PortObject(id=i, name=f"port{i}", device_id=(i % 50) + 1, device=None)
+        )
+        member = member_cls(
+            id=i,
+            asn=ASN,
+            ix_id=(i % 100) + 1,
+            ipaddr4=f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+            ipaddr6=None,
+            speed=10000,
+            is_rs_peer=False,
+        )
+        members.append(member)
+        port_infos[i] = PortInfo(port=i, ref_id=member.ref_id, net_id=0)
+
+    return ports, members, port_infos
+
+
+def preload_time(monkeypatch, count):
+    """
+    Returns the best of three `Port.preload` runs over `count` ports
+    in seconds, devicectl ports and exchange members are stubbed
+    """
+
+    ports, members, port_infos = generate(count)
+    org = types.SimpleNamespace(remote_id=0)
+    port_ids = [port.id for port in ports]
+
+    monkeypatch.setattr(Port, "objects", lambda bridge, **filters: ports)
+    monkeypatch.setattr(ExchangeMember, "refs", lambda asns: {ASN: members})
+
+    timings = []
+
+    for _ in range(3):
+        start = time.perf_counter()
+        instances = Port.preload(org, ASN, port_ids, port_infos=port_infos)
+        timings.append(time.perf_counter() - start)
+
+    assert len(instances) == count
+    assert all(port.port_info_object._ref for port in instances)
+
+    return min(timings)
+
+
+@pytest.mark.django_db
+def test_preload_scales_linearly(monkeypatch):
+    small = preload_time(monkeypatch, 1000) / 1000
+    large = preload_time(monkeypatch, 10000) / 10000
+
+    # per port cost stays flat, a list scan per port would make it
+    # grow tenfold
+
+    assert large < small * 3
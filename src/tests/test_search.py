@@ -0,0 +1,75 @@
+import re
+
+import pytest
+from django.db import connection
+
+from django_peerctl import search
+from django_peerctl.models import Network
+
+NETWORK_COUNT = 20000
+
+
+@pytest.fixture
+def networks():
+    Network.objects.bulk_create(
+        [
+            Network(asn=asn, search_name=f"Example Network {asn}")
+            for asn in range(1, NETWORK_COUNT + 1)
+        ]
+        + [Network(asn=13335, search_name="Cloudflare, Inc.")],
+        batch_size=1000,
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE peerctl_net")
+
+    search.set_similarity_threshold(0.3)
+
+
+def explain(queryset):
+    return queryset.explain(analyze=True)
+
+
+@pytest.mark.django_db
+def test_trigram_icontains():
+    Network.objects.bulk_create(
+        [
+            Network(asn=13335, search_name="Cloudflare, Inc."),
+            Network(asn=15169, search_name="Google 100% LLC"),
+        ]
+    )
+
+    def asns(text):
+        return set(
+            Network.objects.filter(search_name__trigram_icontains=text).values_list(
+                "asn", flat=True
+            )
+        )
+
+    assert asns("cloudFLARE") == {13335}
+    assert asns("100%") == {15169}
+    assert asns("%") == {15169}
+    assert asns("_") == set()
+
+
+@pytest.mark.django_db
+def test_text_query_uses_trigram_index(networks):
+    queryset = Network.objects.filter(search.text_query("search_name", "cloudflare"))
+
+    assert list(queryset.values_list("asn", flat=True)) == [13335]
+
+    plan = explain(queryset)
+
+    assert "peerctl_net_search_name_trgm" in plan
+
+    # search budget at tens of thousands of rows
+
+    execution_time = float(re.search(r"Execution Time: ([\d.]+) ms", plan).group(1))
+    assert execution_time < 50
+
+
+@pytest.mark.django_db
+def test_peer_name_filter_uses_trigram_index(networks):
+    queryset = Network.objects.filter(search_name__trigram_icontains="cloudflare")
+
+    assert "peerctl_net_search_name_trgm" in explain(queryset)